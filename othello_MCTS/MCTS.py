@@ -1,7 +1,9 @@
-import copy
 from othello_MCTS.bitboard import Bitboard
+from othello_MCTS.transposition import TranspositionTable
+from othello_MCTS.node_store import NodeStore
 import random
 import time
+import os
 from math import *
 
 
@@ -25,6 +27,10 @@ class Node:
         Exploration parameter for UCT calculation.
     children : dict
         A dictionary of child nodes indexed by their moves.
+    proven : int or None
+        The winner of the node's position with perfect play (1, -1, or 0 for a tie) once it is known.
+    turn : int or None
+        The player to move at the node, set when the node is expanded.
     """
     def __init__(self, move, parent, C = 10):
         self.parent = parent
@@ -34,6 +40,8 @@ class Node:
         self.n_visits = 0
         self.c = C
         self.children = {}
+        self.proven = None
+        self.turn = None
 
 
     def set_uct(self):
@@ -46,6 +54,43 @@ class Node:
         self.uct = self.value/self.n_visits + self.c*sqrt(log(self.parent.n_visits)/self.n_visits)
 
 
+class SharedNode(Node):
+    """
+    A node whose visit count and value live in a transposition table entry, so that they are
+    shared with every other node of the same position.
+
+    Attributes:
+    -----------
+    entry : list
+        The [n_visits, value] entry of the transposition table.
+    """
+    def __init__(self, move, parent, entry, C = 10):
+        self.parent = parent
+        self.move = move
+        self.entry = entry
+        self.uct = 0
+        self.c = C
+        self.children = {}
+        self.proven = None
+        self.turn = None
+
+    @property
+    def n_visits(self):
+        return self.entry[0]
+
+    @n_visits.setter
+    def n_visits(self, n_visits):
+        self.entry[0] = n_visits
+
+    @property
+    def value(self):
+        return self.entry[1]
+
+    @value.setter
+    def value(self, value):
+        self.entry[1] = value
+
+
 
 class MCTS:
     """
@@ -67,18 +112,92 @@ class MCTS:
         Maximum allowed runtime for the algorithm.
     cap_method : str
         Termination criteria ('time' or 'iter').
+    rollout_backend : str
+        Engine used for the rollouts ('python' plays them one by one on the bitboard, 'numpy'
+        plays all the rollouts of a simulation at once with BatchRollout).
+    rollout_policy : RolloutPolicy or None
+        The policy choosing the moves of the python rollouts, None for uniformly random moves.
+        Built from a policy name ('uniform', 'corner', 'mobility') or a RolloutPolicy, mixed with
+        random moves when policy_epsilon is not 0.
+    batch_rollout : BatchRollout or None
+        The batched rollout engine, only set when rollout_backend is 'numpy'.
+    tt : TranspositionTable or None
+        Table sharing node statistics across transpositions, kept between searches (None when tt_size is 0).
     root_state : tuple
         The state of the game at the root node.
+    undo_token : tuple
+        Undo token of the root position, used to rewind the bitboard after each iteration.
     main_player : int
         The player for whom the MCTS is being run.
-    root : Node
-        The root node of the search tree.
+    tree_backend : str
+        Storage of the search tree ('object' for Node objects, 'array' for a NodeStore).
+    random : random.Random
+        The generator used for selection and tie-breaking, seeded by the seed option.
+    parallel : str or None
+        Parallel search mode: None, 'root' (independent trees in worker processes, root statistics
+        merged), 'leaf' (one tree, simulations of batches of leaves run by the workers) or 'tree'
+        (all the workers search one tree in shared memory, spread by virtual loss).
+    n_workers : int
+        Number of worker processes used by the parallel modes.
+    leaf_batch : int
+        Number of leaves per worker in each batch of the 'leaf' mode.
+    virtual_loss : int
+        Number of virtual visits without value added to the nodes of a path in the 'tree' mode.
+    tree_capacity : int
+        Number of nodes of the shared tree of the 'tree' mode.
+    shared_tree : SharedNodeStore or None
+        The shared tree of the 'tree' mode, created on the first search.
+    tree_locks : list or None
+        The locks given to the workers of the 'tree' mode.
+    executor : ProcessPoolExecutor or None
+        The worker pool of the parallel modes, started on the first parallel search.
+    root_stats : dict
+        Merged (n_visits, value) of the root children after a 'root' parallel search.
+    endgame_threshold : int
+        Number of empty squares from which positions are solved exactly by the endgame solver
+        instead of estimated by rollouts (0 to never solve).
+    endgame : EndgameSolver or None
+        The endgame solver, only set when endgame_threshold is not 0.
+    merge_symmetries : bool
+        Whether the moves that lead to symmetric positions are merged into one child at expansion,
+        and transposition table entries are keyed by the canonical key of the position, shared by
+        its 8 symmetric images.
+    book : OpeningBook or None
+        The opening book looked up before searching, only set when book_path is given.
+    stats : SearchStats or None
+        Phase times and tree measurements of the last search, only set when instrument is True.
+    profile_path : str or None
+        File where the next search writes its cProfile profile, set by profile_next.
+    stop_event : threading.Event or None
+        When set, the search returns its best move so far after the current iteration.
+    early_stop : bool
+        Whether run_mcts stops as soon as the rest of its budget cannot change the best move.
+    time_manager : TimeManager or None
+        The game clock that plans the time of every search instead of cap_method and runtime,
+        only set when time_control (total time, increment) is given.
+    config : dict
+        The constructor arguments, used to build identical instances in worker processes.
+    tree : NodeStore or None
+        The array-backed tree, only set when tree_backend is 'array'.
+    root : Node or int
+        The root node of the search tree (index 0 of tree with the 'array' backend).
     run_time : float
         Time spent running the algorithm.
     node_count : int
-        Number of nodes generated during the search.
+        Number of nodes of the search tree, including those of a reused subtree.
     num_rollouts : int
         Total number of rollouts performed.
+    reuse_tree : bool
+        Whether the subtree of the position reached since the last search is kept as the new root
+        (by default, except with parallel='tree', whose shared tree does not support it).
+    reused_visits : int
+        Number of visits carried over from the previous search by the reused root.
+    reused_nodes : int
+        Number of nodes carried over from the previous search by the reused root.
+    tt_hits : int
+        Number of expanded children that found their position in the transposition table.
+    tt_misses : int
+        Number of expanded children that added their position to the transposition table.
     bitboard : Bitboard
         The bitboard representing the game state.
 
@@ -87,29 +206,81 @@ class MCTS:
     run_mcts(state):
         Executes the MCTS algorithm to determine the best move.
 
+    quick_move(state):
+        Returns the move of a state that needs no search, if any.
+
+    set_root(state, main_player):
+        Makes a state the root of the search.
+
+    iterate():
+        Runs one iteration of the search.
+
+    search_done(remaining):
+        Returns True when the search should stop before its budget.
+
+    root_lead():
+        Returns the leading root child and its lead over the runner-up.
+
+    search(state, interval, token, deadline, early_stop):
+        Runs an anytime search yielding snapshots.
+
+    ponder(state, stop_event):
+        Searches during the opponent's turn until stop_event is set.
+
+    root_statistics():
+        Lists the visits and mean values of the root children.
+
+    reuse_root(state, main_player):
+        Promotes the node of the given state to root if it is in the current tree.
+
     select():
         Selects a node to expand based on the selection strategy.
 
     expand(parent):
         Expands a node by generating its children.
 
-    run_simulation():
+    run_simulation(winner):
         Runs a simulation from the current state and returns the resulting value.
 
     back_propagate(node, value):
-        Propagates simulation results up the tree.
+        Propagates simulation results and proven results up the tree.
+
+    prove(node):
+        Returns the winner of a node with perfect play if its children prove it.
 
     best_move():
         Determines the best move based on child node values.
 
     reset():
         Resets the MCTS instance to its initial state.
+
+    worker_config():
+        Returns the constructor arguments of the single-process instances run by the workers.
+
+    get_executor():
+        Returns the worker pool of the parallel modes, starting it if needed.
+
+    close():
+        Shuts down the worker pool and frees the shared tree.
+
+    profile_next(path):
+        Profiles the next search with cProfile.
+
+    solve_endgame():
+        Returns the winner of the bitboard position with perfect play if it is close enough to the end.
     """
 
     def __init__(self, max_iter = 100, C = 10, selection_method = 'random', player_type = 'MCTS', 
-                 iterations_per_simulation = 1, runtime = 5, cap_method = 'iter'):
+                 iterations_per_simulation = 1, runtime = 5, cap_method = 'iter', rollout_backend = 'python',
+                 tt_size = 0, tt_replacement = 'lru', reuse_tree = None,
+                 tree_backend = 'object', seed = None, parallel = None, n_workers = None, leaf_batch = 4,
+                 virtual_loss = 1, tree_capacity = 2**18, instrument = False,
+                 book_path = None, merge_symmetries = False, endgame_threshold = 0,
+                 rollout_policy = None, policy_epsilon = 0, early_stop = False, time_control = None):
 
+        self.config = {name: value for name, value in locals().items() if name != 'self'}
         self.root_state = None
+        self.undo_token = None
         self.main_player = None
         self.c = C
         self.root = Node(None, None, C = self.c)
@@ -117,12 +288,91 @@ class MCTS:
         self.max_runtime = runtime
         self.node_count = 1
         self.num_rollouts = 0
+        self.reused_visits = 0
+        self.reused_nodes = 0
+        self.tt_hits = 0
+        self.tt_misses = 0
         self.bitboard = Bitboard()
         self.max_iter = max_iter
         self.selection_method = selection_method
         self.player_type = player_type
         self.iterations_per_simulation = iterations_per_simulation
         self.cap_method = cap_method
+        self.rollout_backend = rollout_backend
+        self.batch_rollout = None
+
+        if rollout_backend == 'numpy':
+            from othello_MCTS.batch_rollout import BatchRollout
+            self.batch_rollout = BatchRollout()
+        elif rollout_backend != 'python':
+            raise ValueError(f"unknown rollout_backend {rollout_backend!r}, expected 'python' or 'numpy'")
+
+        self.rollout_policy = None
+        if rollout_policy is not None:
+            if rollout_backend != 'python':
+                raise ValueError("rollout policies need rollout_backend='python'")
+            from othello_MCTS.policy import make_policy
+            self.rollout_policy = make_policy(rollout_policy, policy_epsilon)
+
+        self.tt = None
+        if tt_size:
+            self.tt = TranspositionTable(tt_size, tt_replacement)
+            self.bitboard.set_hashing(True)
+
+        self.random = random.Random(seed)
+        self.tree_backend = tree_backend
+        self.tree = None
+        if tree_backend == 'array':
+            if self.tt is not None:
+                raise ValueError("the transposition table needs tree_backend='object'")
+            self.tree = NodeStore(seed = seed)
+            # one generator for every tie, so that both backends search alike with the same seed
+            self.tree.random = self.random
+            self.root = 0
+        elif tree_backend != 'object':
+            raise ValueError(f"unknown tree_backend {tree_backend!r}, expected 'object' or 'array'")
+
+        if parallel not in (None, 'root', 'leaf', 'tree'):
+            raise ValueError(f"unknown parallel mode {parallel!r}, expected None, 'root', 'leaf' or 'tree'")
+        self.parallel = parallel
+        if reuse_tree is None:
+            reuse_tree = parallel != 'tree'
+        elif reuse_tree and parallel == 'tree':
+            raise ValueError("reuse_tree is not supported with parallel='tree', whose shared tree is rebuilt every search")
+        self.reuse_tree = reuse_tree
+        self.n_workers = n_workers or os.cpu_count()
+        self.leaf_batch = leaf_batch
+        self.virtual_loss = virtual_loss
+        self.tree_capacity = tree_capacity
+        self.shared_tree = None
+        self.tree_locks = None
+        self.executor = None
+        self.root_stats = {}
+
+        self.merge_symmetries = merge_symmetries
+        self.endgame_threshold = endgame_threshold
+        self.endgame = None
+        if endgame_threshold:
+            if tree_backend == 'array':
+                raise ValueError("the endgame solver needs tree_backend='object'")
+            from othello_MCTS.endgame import EndgameSolver
+            self.endgame = EndgameSolver()
+        self.book = None
+        if book_path is not None:
+            from othello_MCTS.book import OpeningBook
+            self.book = OpeningBook(book_path)
+
+        self.stop_event = None
+        self.early_stop = early_stop
+        self.time_manager = None
+        if time_control is not None:
+            from othello_MCTS.timemanager import TimeManager
+            self.time_manager = TimeManager(*time_control)
+        self.stats = None
+        self.profile_path = None
+        if instrument:
+            from othello_MCTS.instrumentation import instrument as instrument_search
+            instrument_search(self)
 
     def run_mcts(self, state):
         """
@@ -138,79 +388,376 @@ class MCTS:
         int
             The best move determined by the MCTS algorithm.
         """
-        
-        if self.player_type =='random':
-            _,_,moves = self.bitboard.get_moves()
-            moves = [i for i in range(moves.bit_length()) if (moves >> i) & 1]
-            return random.choice(moves)
+        if self.profile_path is not None:
+            from othello_MCTS.instrumentation import profile_search
+            path, self.profile_path = self.profile_path, None
+            return profile_search(self, state, path)
 
+        if self.time_manager is not None:
+            return self.time_manager.choose(self, state)
 
-        self.reset()
-        self.root_state = copy.deepcopy(state)
-        self.bitboard.set_state(state)
-        self.main_player = state[1]
+        move = self.quick_move(state)
+        if move is not None:
+            return move
+
+        if self.parallel == 'root':
+            from othello_MCTS.parallel import root_parallel_search
+            return root_parallel_search(self, state)
+
+        if self.parallel == 'tree':
+            from othello_MCTS.parallel import tree_parallel_search
+            return tree_parallel_search(self, state)
+
+        self.set_root(state, state[2])
+
+        if self.parallel == 'leaf':
+            from othello_MCTS.parallel import leaf_parallel_search
+            return leaf_parallel_search(self, state)
 
         start_time = time.time()
 
         if self.cap_method == 'time':
         
+            iterations = 0
             while time.time() - start_time < self.max_runtime:
-                node = self.select()
-                value = self.run_simulation()
-                self.back_propagate(node,value)
-                self.num_rollouts += self.iterations_per_simulation
+                self.iterate()
+                iterations += 1
+                elapsed = time.time() - start_time
+                if self.search_done(iterations*(self.max_runtime - elapsed)/elapsed if elapsed else None):
+                    break
         
             self.run_time = time.time() - start_time
             return self.best_move()
 
         if self.cap_method == 'iter':
 
-            for _ in range(self.max_iter):
-                node = self.select()
-                value = self.run_simulation()
-                self.back_propagate(node,value)
-                self.num_rollouts += self.iterations_per_simulation
+            for i in range(self.max_iter):
+                self.iterate()
+                if self.search_done(self.max_iter - i - 1):
+                    break
         
             self.run_time = time.time() - start_time
             return self.best_move()
 
+    def quick_move(self, state):
+        """
+        Returns the move of a state that needs no search: a random player's move, a book move,
+        or the solved move of a root within endgame_threshold.
+
+        Parameters:
+        -----------
+        state : tuple
+            The game state.
+
+        Returns:
+        --------
+        int or None
+            The move, None if the state has to be searched.
+        """
+        if self.player_type =='random':
+            self.bitboard.set_state(state)
+            moves = self.bitboard.get_move_mask()
+            moves = [i for i in range(moves.bit_length()) if (moves >> i) & 1]
+            return self.random.choice(moves)
+
+        if self.book is not None:
+            move = self.book.lookup(state)
+            if move is not None:
+                return move
+
+        if self.endgame is not None:
+            start_time = time.time()
+            self.bitboard.set_state(state)
+            bitboard = self.bitboard
+            player, opponent = bitboard.player_bitboards[bitboard.turn], bitboard.player_bitboards[-bitboard.turn]
+            if bin(bitboard.in_board_mask & ~(player | opponent)).count('1') <= self.endgame_threshold:
+                move, _ = self.endgame.best_move(player, opponent, -1, 1)
+                self.num_rollouts = 0
+                self.run_time = time.time() - start_time
+                return move
+
+        return None
+
+    def set_root(self, state, main_player):
+        """
+        Makes a state the root of the search, keeping the matching subtree of the previous search
+        when tree reuse is on.
+
+        Parameters:
+        -----------
+        state : tuple
+            The game state to search from.
+        main_player : int
+            The player whose results are maximized, usually the player to move.
+        """
+        if not (self.reuse_tree and self.reuse_root(state, main_player)):
+            self.reset()
+        self.root_state = state
+        self.bitboard.set_state(state)
+        self.main_player = main_player
+
+        if self.tt is not None and self.tt.main_player != self.main_player:
+            self.tt.clear()
+            self.tt.main_player = self.main_player
+
+    def iterate(self):
+        """
+        Runs one iteration of the search: selection, expansion, simulation and backpropagation.
+        """
+        node = self.select()
+        # select already solved the object leaves within the endgame threshold
+        value = self.run_simulation(node.proven if self.tree is None else None)
+        self.back_propagate(node,value)
+        self.bitboard.unmake(self.undo_token)
+        self.num_rollouts += self.iterations_per_simulation
+
+    def search_done(self, remaining = None):
+        """
+        Returns True when the search should stop before its budget: the root is proven,
+        stop_event is set, or with early_stop the remaining iterations cannot change the best move.
+
+        Parameters:
+        -----------
+        remaining : float, optional
+            Number of iterations left in the budget, None if unknown.
+        """
+        if self.tree is None and self.root.proven is not None:
+            return True
+        if self.stop_event is not None and self.stop_event.is_set():
+            return True
+        return self.early_stop and remaining is not None and self.root_lead()[1] > remaining*self.iterations_per_simulation
+
+    def root_lead(self):
+        """
+        Returns the root child that best_move would play and its lead in accumulated value over
+        the runner-up. Each iteration adds at most iterations_per_simulation to the value of one
+        child, so a lead larger than that times the remaining iterations decides the move.
+
+        Returns:
+        --------
+        tuple:
+            - move (int or None): The leading move, None before the root is expanded.
+            - lead (float): Its lead, infinite when it is the only candidate or a proven win.
+        """
+        if self.tree is not None:
+            values = [(self.tree.value[child], move) for move, child in self.children_of(self.root)]
+        else:
+            children = list(self.root.children.items())
+            for move, child in children:
+                if child.proven == self.main_player:
+                    return move, float('inf')
+            values = ([(child.value, move) for move, child in children if child.proven != -self.main_player]
+                      or [(child.value, move) for move, child in children])
+        if not values:
+            return None, 0
+        values.sort(reverse = True)
+        return values[0][1], values[0][0] - values[1][0] if len(values) > 1 else float('inf')
+
+    def search(self, state, interval = 0.1, token = None, deadline = None, early_stop = True):
+        """
+        Searches a state as an anytime search, yielding snapshots of the root (see anytime.anytime_search).
+
+        Returns:
+        --------
+        generator of Snapshot
+            Snapshots every interval seconds, the last one with done set and the move to play.
+        """
+        from othello_MCTS.anytime import anytime_search
+        return anytime_search(self, state, interval, token, deadline, early_stop)
+
+    def ponder(self, state, stop_event):
+        """
+        Searches the position where the opponent is to move, for the player to move after it,
+        until stop_event is set. The next run_mcts from the position reached by the opponent's
+        move keeps the pondered subtree.
+
+        Only single-process MCTS players ponder; the others just wait for stop_event.
+
+        Parameters:
+        -----------
+        state : tuple
+            The game state, with the opponent to move.
+        stop_event : threading.Event
+            Set by the caller to end the search, typically from another thread.
+        """
+        if self.player_type != 'MCTS' or self.parallel is not None:
+            stop_event.wait()
+            return
+
+        self.set_root(state, -state[2])
+        previous, self.stop_event = self.stop_event, stop_event
+        try:
+            while not self.search_done():
+                self.iterate()
+        finally:
+            self.stop_event = previous
+
+    def root_statistics(self):
+        """
+        Lists the visit count and mean value of the root children, for progress reports. Can be
+        called from another thread while the search is running.
+
+        Returns:
+        --------
+        list of tuple
+            (move, n_visits, mean value for the main player) of every child, most visited first.
+        """
+        if self.tree is not None:
+            tree = self.tree
+            stats = [(int(move), int(tree.n_visits[child]), float(tree.value[child]))
+                     for move, child in self.children_of(self.root)]
+        else:
+            stats = [(move, child.n_visits, child.value) for move, child in list(self.root.children.items())]
+        stats = [(move, n_visits, value/n_visits if n_visits else 0.0) for move, n_visits, value in stats]
+        stats.sort(key = lambda stat: -stat[1])
+        return stats
+
+
+    def reuse_root(self, state, main_player = None):
+        """
+        Looks for the given state among the children and grandchildren of the root, that is after
+        the move played from the previous root and the opponent's reply (or pass), and promotes
+        the matching node to root.
+
+        The moves are played from root_state, whatever position the bitboard was left in.
+
+        Parameters:
+        -----------
+        state : tuple
+            The new game state.
+        main_player : int, optional
+            The player of the new search (default is the player to move). The tree is only kept
+            for the same player.
+
+        Returns:
+        --------
+        bool
+            True if the node was found and promoted, False if a fresh tree is needed.
+        """
+        if main_player is None:
+            main_player = state[2]
+        if self.root_state is None or main_player != self.main_player:
+            return False
+
+        self.bitboard.set_state(self.root_state)
+        node = None
+        for move, child in self.children_of(self.root):
+            child_token = self.bitboard.make_move(move)
+            if self.bitboard.get_state()[:3] == state[:3]:
+                node = child
+            for grandmove, grandchild in self.children_of(child):
+                if node is not None:
+                    break
+                undo_token = self.bitboard.make_move(grandmove)
+                if self.bitboard.get_state()[:3] == state[:3]:
+                    node = grandchild
+                self.bitboard.unmake(undo_token)
+            self.bitboard.unmake(child_token)
+            if node is not None:
+                break
+
+        if node is None:
+            return False
+
+        if self.tree is not None:
+            self.tree = self.tree.reroot(node)
+            self.reused_visits = int(self.tree.n_visits[0])
+            self.reused_nodes = self.tree.size
+        else:
+            node.parent = None
+            self.root = node
+            self.reused_visits = node.n_visits
+            self.reused_nodes = 0
+            nodes = [node]
+            while nodes:
+                self.reused_nodes += 1
+                nodes.extend(nodes.pop().children.values())
+        self.run_time = 0
+        self.node_count = self.reused_nodes
+        self.num_rollouts = 0
+        self.tt_hits = 0
+        self.tt_misses = 0
+        return True
+
+    def children_of(self, node):
+        """
+        Lists the children of a node with either tree backend.
+
+        Parameters:
+        -----------
+        node : Node or int
+            The parent node.
+
+        Returns:
+        --------
+        list of tuple
+            (move, child) pairs.
+        """
+        if self.tree is not None:
+            return [(self.tree.move[child], child) for child in self.tree.children(node)]
+        return list(node.children.items())
 
     def select(self):
         """
         Traverses the tree to select a promising node based on the chosen selection strategy.
 
+        The moves are played on the bitboard from the root position, and `undo_token` is set so
+        that the caller can rewind the bitboard once the iteration is done.
+
         Returns:
         --------
-        Node
+        Node or int
             The selected node for expansion or simulation.
         """
-        self.bitboard.reset()
-        self.bitboard.set_state(self.root_state)
+        self.undo_token = self.bitboard.get_undo_token()
+
+        if self.tree is not None:
+            tree = self.tree
+            node = self.root
+
+            while tree.n_children[node] != 0:
+                node = tree.select_child(node, self.selection_method, self.c)
+                self.bitboard.play(tree.move[node])
+
+                if tree.n_visits[node] == 0:
+                    return node
+
+            if self.expand(node):
+                node = self.random.choice(tree.children(node))
+                self.bitboard.play(tree.move[node])
+
+            return node
 
         node = self.root
 
         while len(node.children) != 0:
 
-            if self.selection_method == 'uct':
-                children = node.children.values()
-                list(map(lambda x: x.set_uct(),children))
-                max_value = max([child.uct for child in children])
-                max_nodes = [child for child in children if child.uct == max_value]
+            children = [child for child in node.children.values() if child.proven is None] or list(node.children.values())
 
-                node = random.choice(max_nodes)
+            if self.selection_method == 'uct':
+                unvisited = [child for child in children if child.n_visits == 0]
+                if unvisited:
+                    node = self.random.choice(unvisited)
+                else:
+                    log_visits = log(node.n_visits)
+                    ucts = [child.value/child.n_visits + self.c*sqrt(log_visits/child.n_visits) for child in children]
+                    max_value = max(ucts)
+                    node = self.random.choice([child for child, uct in zip(children, ucts) if uct == max_value])
 
             if self.selection_method == 'random':
-                node = random.choice(list(node.children.values()))
+                node = self.random.choice(children)
 
             self.bitboard.play(node.move)
 
             if node.n_visits == 0:
-                return node
-
-        if self.expand(node):
-            node = random.choice(list(node.children.values()))
-            self.bitboard.play(node.move)
+                break
+        else:
+            if node.proven is None and self.expand(node):
+                node = self.random.choice(list(node.children.values()))
+                self.bitboard.play(node.move)
 
+        if node.proven is None:
+            node.proven = self.solve_endgame()
         return node
 
 
@@ -220,7 +767,7 @@ class MCTS:
 
         Parameters:
         -----------
-        parent : Node
+        parent : Node or int
             The parent node to expand.
 
         Returns:
@@ -231,37 +778,78 @@ class MCTS:
         if self.bitboard.winner != None:
             return False
 
-        _,_,moves = self.bitboard.get_moves()
+        moves = self.bitboard.get_distinct_moves() if self.merge_symmetries else self.bitboard.get_move_mask()
         moves = [i for i in range(moves.bit_length()) if (moves >> i) & 1]
-        parent.children = {move: Node(move, parent, C = self.c) for move in moves}
+        if self.tree is not None:
+            self.tree.add_children(parent, moves)
+            self.node_count += len(moves)
+            return True
+
+        parent.turn = self.bitboard.turn
+        if self.tt is None:
+            parent.children = {move: Node(move, parent, C = self.c) for move in moves}
+        else:
+            parent.children = {}
+            for move in moves:
+                undo_token = self.bitboard.make_move(move)
+                key = self.bitboard.get_canonical_key()[0] if self.merge_symmetries else self.bitboard.hash
+                entry, hit = self.tt.lookup(key)
+                self.bitboard.unmake(undo_token)
+                parent.children[move] = SharedNode(move, parent, entry, C = self.c)
+                if hit:
+                    self.tt_hits += 1
+                else:
+                    self.tt_misses += 1
         self.node_count += len(parent.children)
 
         return True
 
-    def run_simulation(self):
+    def run_simulation(self, winner = None):
         """
         Runs a simulated game from the current state to estimate the value of a node.
 
+        Parameters:
+        -----------
+        winner : int or None, optional
+            The winner of the current state with perfect play if it is already known (see
+            select), in which case the state is neither solved again nor played out.
+
         Returns:
         --------
         float
             The accumulated value from the simulation.
         """
         value = 0
-        state = self.bitboard.get_state()
 
-        if self.bitboard.winner != None:
-            value = self.iterations_per_simulation*((self.main_player*self.bitboard.winner + 1)/2)**3
+        if winner == None:
+            winner = self.bitboard.winner
+        if winner == None and self.endgame is not None:
+            winner = self.solve_endgame()
+        if winner != None:
+            value = self.iterations_per_simulation*((self.main_player*winner + 1)/2)**3
             return value
 
+        if self.batch_rollout is not None:
+            wins, draws, _ = self.batch_rollout.rollout(self.bitboard.get_state(), self.iterations_per_simulation, self.main_player)
+            return float(wins.sum() + draws.sum()/8)
+
+        undo_token = self.bitboard.get_undo_token()
+        hashing = self.bitboard.hashing
+        self.bitboard.hashing = False
+
+        policy = self.rollout_policy
         for _ in range(self.iterations_per_simulation):
 
-            self.bitboard.reset()
-            self.bitboard.set_state(state)
+            if policy is None:
+                while self.bitboard.winner == None:
+                    self.bitboard.play(72)
+            else:
+                while self.bitboard.winner == None:
+                    self.bitboard.play(policy.choose(self.bitboard))
+            value += ((self.main_player*self.bitboard.winner + 1)/2)**3
+            self.bitboard.unmake(undo_token)
 
-            while self.bitboard.winner == None:
-                self.bitboard.play(72)
-            value += ((self.main_player*self.bitboard.winner + 1)/2)**3            
+        self.bitboard.hashing = hashing
 
         return value
 
@@ -269,41 +857,176 @@ class MCTS:
         """
         Propagates the simulation results up the tree, updating values and visit counts.
 
+        With the object backend, a proven result also moves up (MCTS-Solver): a parent is won by
+        its player to move if one child is, and once all its children are proven it gets the best
+        of their results for that player.
+
         Parameters:
         -----------
-        node : Node
+        node : Node or int
             The node from which backpropagation starts.
         value : float
             The value to propagate up the tree.
         """
+        if self.tree is not None:
+            self.tree.back_propagate(node, value, self.iterations_per_simulation)
+            return
+
+        proven = node.proven is not None
         while True:
             node.n_visits += self.iterations_per_simulation
             node.value += value
             if node.parent == None:
                 break
             node = node.parent
+            if proven:
+                if node.proven is None:
+                    node.proven = self.prove(node)
+                proven = node.proven is not None
+
+    def prove(self, node):
+        """
+        Infers the winner of an expanded node with perfect play from the proven results of its children.
+
+        Parameters:
+        -----------
+        node : Node
+            An expanded node.
+
+        Returns:
+        --------
+        int or None
+            The winner (1, -1, or 0 for a tie), None while the children do not decide it.
+        """
+        results = [child.proven for child in node.children.values()]
+        if node.turn in results:
+            return node.turn
+        if None in results:
+            return None
+        return 0 if 0 in results else -node.turn
 
     def best_move(self):
         """
         Determines the best move by selecting the child node with the highest accumulated value.
 
+        A child proven to be won by the main player is played at once, and children proven to be lost
+        are only played if every child is.
+
         Returns:
         --------
         int
             The move corresponding to the best child node.
         """
-        max_value = max([child.value for child in self.root.children.values()])
-        max_moves = [move for move in self.root.children.keys() if self.root.children[move].value == max_value]
-        return random.choice(max_moves)
+        if self.tree is not None:
+            return self.tree.best_move(self.root)
+
+        children = self.root.children
+        wins = [move for move, child in children.items() if child.proven == self.main_player]
+        if wins:
+            return self.random.choice(wins)
+        children = {move: child for move, child in children.items() if child.proven != -self.main_player} or children
+
+        max_value = max([child.value for child in children.values()])
+        max_moves = [move for move in children.keys() if children[move].value == max_value]
+        return self.random.choice(max_moves)
 
     def reset(self):
         """
         Resets the MCTS instance to its initial state, clearing the tree and other attributes.
         """
         self.root_state = None
+        self.undo_token = None
         self.main_player = None
-        self.root = Node(None, None)
+        if self.tree is not None:
+            self.tree.clear()
+        else:
+            self.root = Node(None, None, C = self.c)
+        self.reused_visits = 0
+        self.reused_nodes = 0
         self.run_time = 0
-        self.node_count = 0
+        self.node_count = 1
         self.num_rollouts = 0
+        self.tt_hits = 0
+        self.tt_misses = 0
         self.bitboard.reset()
+
+    def solve_endgame(self):
+        """
+        Solves the bitboard position with the endgame solver if it has at most endgame_threshold
+        empty squares.
+
+        Returns:
+        --------
+        int or None
+            The winner with perfect play (1, -1, or 0 for a tie), None if the position has more
+            empty squares than the threshold or no solver is set.
+        """
+        bitboard = self.bitboard
+        if bitboard.winner is not None:
+            return bitboard.winner
+        if self.endgame is None:
+            return None
+
+        turn = bitboard.turn
+        player, opponent = bitboard.player_bitboards[turn], bitboard.player_bitboards[-turn]
+        if bin(bitboard.in_board_mask & ~(player | opponent)).count('1') > self.endgame_threshold:
+            return None
+        score = self.endgame.solve(player, opponent, -1, 1)
+        return turn if score > 0 else -turn if score < 0 else 0
+
+    def worker_config(self):
+        """
+        Returns the constructor arguments of the single-process instances run by the workers.
+
+        Returns:
+        --------
+        dict
+            The configuration of this instance without parallelism nor tree reuse, with its current
+            budget (which a time manager sets for every move).
+        """
+        return dict(self.config, parallel = None, reuse_tree = False, seed = None, instrument = False,
+                    cap_method = self.cap_method, runtime = self.max_runtime, time_control = None)
+
+    def get_executor(self):
+        """
+        Returns the worker pool of the parallel modes, starting it on first use.
+
+        Returns:
+        --------
+        ProcessPoolExecutor
+            A pool of n_workers processes.
+        """
+        if self.executor is None:
+            from concurrent.futures import ProcessPoolExecutor
+            from othello_MCTS.parallel import seed_worker, init_tree_worker
+
+            if self.parallel == 'tree':
+                import multiprocessing
+                self.tree_locks = [multiprocessing.Lock() for _ in range(17)]
+                self.executor = ProcessPoolExecutor(max_workers = self.n_workers, initializer = init_tree_worker,
+                                                    initargs = (self.tree_locks,))
+            else:
+                self.executor = ProcessPoolExecutor(max_workers = self.n_workers, initializer = seed_worker)
+        return self.executor
+
+    def close(self):
+        """
+        Shuts down the worker pool of the parallel modes, if it was started.
+        """
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+        if self.shared_tree is not None:
+            self.shared_tree.close()
+            self.shared_tree = None
+
+    def profile_next(self, path):
+        """
+        Runs the next search under cProfile and writes its profile to a file.
+
+        Parameters:
+        -----------
+        path : str
+            The profile file, readable with pstats or snakeviz.
+        """
+        self.profile_path = path
@@ -1,5 +1,5 @@
 from .bitboard import Bitboard, display_bits_in_grid
 from .MCTS import MCTS, Node
-from .simulation import play_match, show_match, play_single_match, tournament
+from .simulation import play_match, show_match, play_single_match, tournament, TournamentEngine
 
-__all__ = ["Bitboard", "display_bits_in_grid", "MCTS", "Node", "play_match", "show_match", "play_single_match", "tournament"]
\ No newline at end of file
+__all__ = ["Bitboard", "display_bits_in_grid", "MCTS", "Node", "play_match", "show_match", "play_single_match", "tournament", "TournamentEngine"]
\ No newline at end of file
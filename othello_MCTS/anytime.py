@@ -0,0 +1,203 @@
+import threading
+import time
+
+
+class CancellationToken:
+    """
+    A flag that stops a search when it is set, from any thread. It has the is_set method of
+    threading.Event, so it can also be used as MCTS.stop_event.
+
+    Methods:
+    --------
+    cancel():
+        Stops the searches using the token.
+
+    is_set():
+        Returns True once the token is cancelled.
+    """
+
+    def __init__(self):
+        self.event = threading.Event()
+
+    def cancel(self):
+        """
+        Cancels the token. The searches using it stop after their current iteration.
+        """
+        self.event.set()
+
+    def is_set(self):
+        return self.event.is_set()
+
+    @property
+    def cancelled(self):
+        return self.event.is_set()
+
+
+class Snapshot:
+    """
+    The root of an anytime search at some point of the search.
+
+    Attributes:
+    -----------
+    best_move : int or None
+        The move best_move would play at that point (the move to play in the last snapshot),
+        None before the root is expanded.
+    children : list of tuple
+        (move, n_visits, mean value for the player to move) of every root child, most visited first.
+    iterations : int
+        Number of iterations done by the search.
+    elapsed : float
+        Time since the search started, in seconds.
+    done : bool
+        Whether the search is over.
+    reason : str or None
+        Why the search stopped: 'budget' (max_iter or runtime used up), 'decided' (the rest of the
+        budget could not change the best move), 'proven' (the root is solved), 'cancelled',
+        'deadline', or 'quick' (random player, book move or solved endgame, no search).
+
+    Methods:
+    --------
+    as_dict():
+        Returns the snapshot as a dictionary.
+    """
+
+    def __init__(self, best_move, children, iterations, elapsed, done = False, reason = None):
+        self.best_move = best_move
+        self.children = children
+        self.iterations = iterations
+        self.elapsed = elapsed
+        self.done = done
+        self.reason = reason
+
+    def as_dict(self):
+        """
+        Returns the snapshot as a JSON-serializable dictionary.
+        """
+        return {'best_move': self.best_move,
+                'children': [list(child) for child in self.children],
+                'iterations': self.iterations,
+                'elapsed': self.elapsed,
+                'done': self.done,
+                'reason': self.reason}
+
+
+def anytime_search(mcts, state, interval = 0.1, token = None, deadline = None, early_stop = True):
+    """
+    Searches a state like MCTS.run_mcts, yielding a snapshot of the root every interval seconds.
+
+    The search stops at the first of: the budget of the instance (max_iter or runtime, following
+    cap_method) is used up, the token is cancelled, the deadline passes, the root is proven, or
+    with early_stop the leading child is ahead by more value than the rest of the budget and the
+    deadline can bring. It then yields a last snapshot with done set and the move to play.
+
+    The parallel modes and profiled searches run run_mcts as a whole (the token is used as its
+    stop_event) and yield only the last snapshot.
+
+    Parameters:
+    -----------
+    mcts : MCTS
+        The searching instance.
+    state : tuple
+        The state to search from.
+    interval : float, optional
+        Time between two snapshots, in seconds (default is 0.1).
+    token : CancellationToken, optional
+        A token whose cancellation stops the search.
+    deadline : float, optional
+        A time.time() value at which the search stops.
+    early_stop : bool, optional
+        Whether the search stops once the best move cannot change any more (default is True).
+
+    Returns:
+    --------
+    generator of Snapshot
+        The snapshots, the last one with done set.
+    """
+    start_time = time.time()
+    if mcts.parallel is not None or mcts.profile_path is not None:
+        previous, mcts.stop_event = mcts.stop_event, token
+        try:
+            move = mcts.run_mcts(state)
+        finally:
+            mcts.stop_event = previous
+        yield Snapshot(move, mcts.root_statistics() if mcts.parallel == 'leaf' else [], mcts.num_rollouts,
+                       time.time() - start_time, True, 'budget')
+        return
+
+    move = mcts.quick_move(state)
+    if move is not None:
+        yield Snapshot(move, [], 0, time.time() - start_time, True, 'quick')
+        return
+
+    mcts.set_root(state, state[2])
+    ips = mcts.iterations_per_simulation
+    iterations = 0
+    next_snapshot = start_time + interval
+    while True:
+        now = time.time()
+        elapsed = now - start_time
+        time_left = float('inf')
+        if mcts.cap_method == 'time':
+            time_left = mcts.max_runtime - elapsed
+        if deadline is not None:
+            time_left = min(time_left, deadline - now)
+        remaining = iterations*time_left/elapsed if iterations else float('inf')
+        if mcts.cap_method == 'iter':
+            remaining = min(remaining, mcts.max_iter - iterations)
+
+        if (mcts.max_iter - iterations if mcts.cap_method == 'iter' else mcts.max_runtime - elapsed) <= 0:
+            reason = 'budget'
+        elif token is not None and token.is_set():
+            reason = 'cancelled'
+        elif deadline is not None and now >= deadline:
+            reason = 'deadline'
+        elif mcts.tree is None and mcts.root.proven is not None:
+            reason = 'proven'
+        elif early_stop and mcts.root_lead()[1] > remaining*ips:
+            reason = 'decided'
+        else:
+            reason = None
+        if reason is not None:
+            break
+
+        if now >= next_snapshot:
+            next_snapshot = now + interval
+            yield Snapshot(mcts.root_lead()[0], mcts.root_statistics(), iterations, elapsed)
+        mcts.iterate()
+        iterations += 1
+
+    mcts.run_time = elapsed
+    yield Snapshot(mcts.best_move(), mcts.root_statistics(), iterations, elapsed, True, reason)
+
+
+async def search_async(mcts, state, interval = 0.1, token = None, deadline = None, early_stop = True):
+    """
+    Asynchronous version of anytime_search: the iterations run in a thread of the default
+    executor, so that the event loop keeps serving other tasks between snapshots.
+
+    Leaving the loop early (break, or cancellation of the consuming task) cancels the search.
+
+    Returns:
+    --------
+    async generator of Snapshot
+        The snapshots of anytime_search.
+    """
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    token = token or CancellationToken()
+    search = anytime_search(mcts, state, interval, token, deadline, early_stop)
+    pending = None
+    try:
+        while True:
+            pending = loop.run_in_executor(None, next, search, None)
+            snapshot = await pending
+            pending = None
+            if snapshot is None:
+                return
+            yield snapshot
+    finally:
+        token.cancel()
+        # a thread still running the search ends it at its next iteration
+        if pending is None:
+            search.close()
@@ -0,0 +1,227 @@
+import numpy as np
+
+
+ONE = np.uint64(1)
+SQUARES = np.arange(64, dtype=np.uint64)
+
+ROW_0 = np.uint64(0x0101010101010101)
+ROW_7 = np.uint64(0x8080808080808080)
+ALL = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+# (shift, left, source mask) for the 8 directions of the 64-bit layout, where a square
+# (column j, row r) is bit 8*j + r. The source mask drops the discs that would wrap to
+# the other edge of the board.
+DIRECTIONS = (
+    (np.uint64(1), True, ~ROW_7),
+    (np.uint64(1), False, ~ROW_0),
+    (np.uint64(8), True, ALL),
+    (np.uint64(8), False, ALL),
+    (np.uint64(9), True, ~ROW_7),
+    (np.uint64(9), False, ~ROW_0),
+    (np.uint64(7), True, ~ROW_0),
+    (np.uint64(7), False, ~ROW_7),
+)
+
+
+def to_64(bitboard):
+    """
+    Remaps a bitboard from the padded 9x8 layout to the 64-bit layout.
+
+    Parameters:
+    -----------
+    bitboard : int
+        A bitboard where square (column j, row r) is bit 9*j + r.
+
+    Returns:
+    --------
+    int
+        The same squares with (column j, row r) at bit 8*j + r.
+    """
+    remapped = 0
+    for j in range(8):
+        remapped |= ((bitboard >> 9*j) & 0xFF) << 8*j
+    return remapped
+
+
+def popcount(bitboards):
+    """
+    Counts the set bits of every element of a uint64 array.
+
+    Parameters:
+    -----------
+    bitboards : np.ndarray
+        An array of uint64 bitboards.
+
+    Returns:
+    --------
+    np.ndarray
+        The number of discs on each bitboard.
+    """
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(bitboards).astype(np.int64)
+
+    x = bitboards - ((bitboards >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    x = (x & np.uint64(0x3333333333333333)) + ((x >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    x = (x + (x >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return ((x * np.uint64(0x0101010101010101)) >> np.uint64(56)).astype(np.int64)
+
+
+def shift(bitboards, amount, left, mask):
+    """
+    Shifts every bitboard one square in a direction, dropping the discs that leave the board.
+    """
+    if left:
+        return (bitboards & mask) << amount
+    return (bitboards & mask) >> amount
+
+
+class BatchRollout:
+    """
+    Plays random games on many boards at once, with every board stored in uint64 NumPy arrays.
+
+    Each ply generates the moves, picks a random legal move and applies the flips for all the
+    boards with a fixed number of array operations, whatever the number of boards.
+
+    Attributes:
+    -----------
+    rng : np.random.Generator
+        The random generator used to pick the moves.
+
+    Methods:
+    --------
+    rollout(state, n, player):
+        Plays n random games from a state and returns the win/draw/loss vectors of player.
+
+    play_out(player, opponent, turn):
+        Plays random games from arrays of boards and returns the winner of each one.
+
+    get_moves(player, opponent):
+        Computes the legal moves of every board.
+
+    get_flips(moves, player, opponent):
+        Computes the discs flipped by one move on every board.
+    """
+
+    def __init__(self, seed=None):
+        self.rng = np.random.default_rng(seed)
+
+    def rollout(self, state, n, player):
+        """
+        Plays n random games from a Bitboard state.
+
+        Parameters:
+        -----------
+        state : tuple
+            A Bitboard state (player, opponent, turn, passed).
+        n : int
+            Number of games to play.
+        player : int
+            The player (1 or -1) from whose point of view the results are given.
+
+        Returns:
+        --------
+        tuple:
+            - wins (np.ndarray): True where player won.
+            - draws (np.ndarray): True where the game was a draw.
+            - losses (np.ndarray): True where player lost.
+        """
+        to_move, opponent, turn, _ = state
+        winners = self.play_out(np.full(n, to_64(to_move), dtype=np.uint64),
+                                np.full(n, to_64(opponent), dtype=np.uint64),
+                                np.full(n, turn, dtype=np.int8))
+        results = winners * player
+        return results == 1, results == 0, results == -1
+
+    def play_out(self, player, opponent, turn):
+        """
+        Plays random games until every board is finished.
+
+        Parameters:
+        -----------
+        player : np.ndarray
+            uint64 bitboards (64-bit layout) of the player to move on each board.
+        opponent : np.ndarray
+            uint64 bitboards of the other player.
+        turn : np.ndarray
+            int8 array with the color (1 or -1) of the player to move.
+
+        Returns:
+        --------
+        np.ndarray
+            int8 array with the winner of each game (1, -1, or 0 for a tie).
+        """
+        passed = np.zeros(len(player), dtype=bool)
+        done = np.zeros(len(player), dtype=bool)
+
+        while not done.all():
+            moves = self.get_moves(player, opponent)
+            has_moves = moves != 0
+            done |= passed & ~has_moves
+            passed = ~has_moves
+
+            candidates = ((moves[:, None] >> SQUARES) & ONE).astype(bool)
+            scores = self.rng.random(candidates.shape)
+            scores[~candidates] = -1
+            move = np.where(has_moves, ONE << np.argmax(scores, axis=1).astype(np.uint64), np.uint64(0))
+
+            flips = self.get_flips(move, player, opponent)
+            player = player | move | flips
+            opponent = opponent & ~flips
+
+            player, opponent = np.where(done, player, opponent), np.where(done, opponent, player)
+            turn = np.where(done, turn, -turn)
+
+        difference = popcount(player) - popcount(opponent)
+        return (np.sign(difference) * turn).astype(np.int8)
+
+    def get_moves(self, player, opponent):
+        """
+        Computes the legal moves of every board with a fill in each of the 8 directions.
+
+        Parameters:
+        -----------
+        player : np.ndarray
+            uint64 bitboards of the player to move.
+        opponent : np.ndarray
+            uint64 bitboards of the other player.
+
+        Returns:
+        --------
+        np.ndarray
+            uint64 bitboards of the legal moves.
+        """
+        empty = ~(player | opponent)
+        moves = np.zeros_like(player)
+        for amount, left, mask in DIRECTIONS:
+            run = shift(player, amount, left, mask) & opponent
+            for _ in range(5):
+                run |= shift(run, amount, left, mask) & opponent
+            moves |= shift(run, amount, left, mask) & empty
+        return moves
+
+    def get_flips(self, moves, player, opponent):
+        """
+        Computes the discs flipped by one move on every board.
+
+        Parameters:
+        -----------
+        moves : np.ndarray
+            uint64 bitboards with the bit of the move played on each board (0 for no move).
+        player : np.ndarray
+            uint64 bitboards of the player to move.
+        opponent : np.ndarray
+            uint64 bitboards of the other player.
+
+        Returns:
+        --------
+        np.ndarray
+            uint64 bitboards of the flipped discs.
+        """
+        flips = np.zeros_like(player)
+        for amount, left, mask in DIRECTIONS:
+            run = shift(moves, amount, left, mask) & opponent
+            for _ in range(5):
+                run |= shift(run, amount, left, mask) & opponent
+            closed = (shift(run, amount, left, mask) & player) != 0
+            flips |= np.where(closed, run, np.uint64(0))
+        return flips
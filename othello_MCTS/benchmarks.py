@@ -0,0 +1,355 @@
+from othello_MCTS.bitboard import Bitboard
+from othello_MCTS.MCTS import MCTS
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+
+SEED = 0x0E110
+MCTS_ITERATIONS = (100, 400, 1600)
+
+
+def make_corpus(n_games = 40, seed = SEED):
+    """
+    Plays seeded random games and records every position reached with the move played from it.
+
+    Parameters:
+    -----------
+    n_games : int, optional
+        Number of games to play (default is 40, about 2400 positions).
+    seed : int, optional
+        Seed of the random moves.
+
+    Returns:
+    --------
+    list of tuple
+        (state, move) for every position of the games.
+    """
+    generator = random.Random(seed)
+    bitboard = Bitboard()
+    corpus = []
+    for _ in range(n_games):
+        bitboard.reset()
+        while bitboard.winner is None:
+            moves = bitboard.get_move_mask()
+            move = generator.choice([i for i in range(moves.bit_length()) if (moves >> i) & 1])
+            corpus.append((bitboard.get_state(), move))
+            bitboard.play(move)
+    return corpus
+
+
+def best_time(function, repeat):
+    """
+    Returns the shortest of repeat timed calls of function, the least disturbed by other processes.
+    """
+    times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start_time)
+    return min(times)
+
+
+def bench_get_moves(repeat):
+    """
+    Move generation on the positions of the corpus, in positions per second.
+    """
+    corpus = make_corpus()
+    bitboard = Bitboard()
+
+    def run():
+        for state, _ in corpus:
+            bitboard.set_state(state)
+            bitboard.get_moves()
+
+    return len(corpus)/best_time(run, repeat), 'positions/s'
+
+
+def bench_play(repeat):
+    """
+    Playing the recorded move of every position of the corpus, in moves per second.
+    """
+    corpus = make_corpus()
+    bitboard = Bitboard()
+
+    def run():
+        for state, move in corpus:
+            bitboard.set_state(state)
+            bitboard.play(move)
+
+    return len(corpus)/best_time(run, repeat), 'moves/s'
+
+
+def bench_perft(repeat, depth = 6):
+    """
+    Perft from the starting position, in leaf positions per second.
+    """
+    from othello_MCTS.perft import perft
+
+    bitboard = Bitboard()
+    return perft(bitboard, depth)/best_time(lambda: perft(bitboard, depth), repeat), 'nodes/s'
+
+
+def bench_rollouts(repeat, n_rollouts = 200):
+    """
+    Full random games from the starting position with the python rollout backend, in rollouts per second.
+    """
+    mcts = MCTS(seed = SEED)
+    mcts.bitboard.reset()
+    mcts.main_player = 1
+
+    def run():
+        random.seed(SEED)
+        for _ in range(n_rollouts):
+            mcts.run_simulation()
+
+    return n_rollouts/best_time(run, repeat), 'rollouts/s'
+
+
+def bench_mcts(repeat, max_iter):
+    """
+    A UCT search from the starting position, in iterations per second.
+    """
+    mcts = MCTS(max_iter = max_iter, selection_method = 'uct', reuse_tree = False, seed = SEED)
+    state = Bitboard().get_state()
+
+    def run():
+        random.seed(SEED)
+        mcts.run_mcts(state)
+
+    return max_iter/best_time(run, repeat), 'iterations/s'
+
+
+def bench_policy(repeat, policy, move_time = 0.02, games_per_repeat = 8):
+    """
+    Elo difference of a rollout policy against uniform rollouts when both search for the same time
+    per move, so that the policy's extra cost per rollout is paid in fewer rollouts. Colors
+    alternate between games.
+    """
+    from othello_MCTS.simulation import play_match
+    from math import log10
+
+    config = {'cap_method': 'time', 'runtime': move_time, 'selection_method': 'uct'}
+    games = games_per_repeat*repeat
+    random.seed(SEED)
+    score = 0
+    for game in range(games):
+        tested = MCTS(**config, rollout_policy = policy)
+        uniform = MCTS(**config)
+        if game % 2 == 0:
+            score += (play_match(tested, uniform) + 1)/2
+        else:
+            score += (1 - play_match(uniform, tested))/2
+
+    score = min(max(score/games, 0.5/games), 1 - 0.5/games)
+    return 400*log10(score/(1 - score)), 'Elo'
+
+
+def bench_tournament(repeat, games_per_pair = 2):
+    """
+    A small tournament between a random player and a 50-iteration MCTS, in games per hour.
+    Its result files are written to a temporary directory.
+    """
+    from othello_MCTS.simulation import tournament
+    from contextlib import redirect_stdout
+    import io
+
+    players = [{'player_type': 'random', 'seed': SEED},
+               {'max_iter': 50, 'selection_method': 'uct', 'seed': SEED}]
+    rates = []
+    cwd = os.getcwd()
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)
+            try:
+                with redirect_stdout(io.StringIO()):
+                    stats = tournament(players, games_per_pair = games_per_pair, max_workers = 1)
+            finally:
+                os.chdir(cwd)
+        rates.append(stats['games_per_hour'])
+    return max(rates), 'games/hour'
+
+
+def first_move(max_iter):
+    """
+    Imports the engine and searches the starting position, in a freshly spawned worker process.
+    """
+    from othello_MCTS import Bitboard, MCTS
+
+    return MCTS(max_iter = max_iter, selection_method = 'uct', seed = SEED).run_mcts(Bitboard().get_state())
+
+
+def bench_startup_import(repeat):
+    """
+    Import of the package by a new interpreter, in milliseconds. Lower is better.
+    """
+    import subprocess
+
+    command = [sys.executable, '-c', 'import othello_MCTS']
+    subprocess.run(command, check = True)
+    return 1000*best_time(lambda: subprocess.run(command, check = True), repeat), 'ms'
+
+
+def bench_startup_first_move(repeat, max_iter = 50):
+    """
+    Time until a spawned worker process returns its first move, as in the tournaments and the
+    parallel searches on platforms that spawn their workers, in milliseconds. Lower is better.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    import multiprocessing
+
+    context = multiprocessing.get_context('spawn')
+
+    def run():
+        with ProcessPoolExecutor(max_workers = 1, mp_context = context) as executor:
+            executor.submit(first_move, max_iter).result()
+
+    return 1000*best_time(run, repeat), 'ms'
+
+
+BENCHMARKS = {
+    'get_moves': bench_get_moves,
+    'play': bench_play,
+    'perft': bench_perft,
+    'rollouts': bench_rollouts,
+    **{f'mcts_{max_iter}': lambda repeat, max_iter = max_iter: bench_mcts(repeat, max_iter)
+       for max_iter in MCTS_ITERATIONS},
+    'tournament': bench_tournament,
+    'policy_corner': lambda repeat: bench_policy(repeat, 'corner'),
+    'policy_mobility': lambda repeat: bench_policy(repeat, 'mobility'),
+    'startup_import': bench_startup_import,
+    'startup_first_move': bench_startup_first_move,
+}
+
+# metrics that are durations rather than rates
+LOWER_IS_BETTER = {'startup_import', 'startup_first_move'}
+# metrics too noisy to be checked against a baseline (Elo estimates from a few games), only reported
+REPORT_ONLY = {'policy_corner', 'policy_mobility'}
+# benchmarks run only when named, for their length and noise
+OPT_IN = {'policy_corner', 'policy_mobility'}
+
+
+def run_benchmarks(names = None, repeat = 3):
+    """
+    Runs the benchmarks. Higher is better for the rates and the Elo differences of the rollout
+    policies, lower is better for the durations of LOWER_IS_BETTER.
+
+    Parameters:
+    -----------
+    names : list of str, optional
+        The benchmarks to run (default is all of BENCHMARKS but those of OPT_IN).
+    repeat : int, optional
+        Number of runs of each workload, the fastest one is kept (default is 3).
+
+    Returns:
+    --------
+    dict
+        {'value': float, 'unit': str} for every benchmark, indexed by name.
+    """
+    results = {}
+    for name in names or [name for name in BENCHMARKS if name not in OPT_IN]:
+        if name not in BENCHMARKS:
+            raise ValueError(f"unknown benchmark {name!r}, expected one of {', '.join(BENCHMARKS)}")
+        value, unit = BENCHMARKS[name](repeat)
+        results[name] = {'value': value, 'unit': unit}
+    return results
+
+
+def compare(results, baseline, tolerance = 0.1):
+    """
+    Compares the results with a baseline.
+
+    Parameters:
+    -----------
+    results : dict
+        Results of run_benchmarks.
+    baseline : dict
+        Results of a previous run_benchmarks.
+    tolerance : float, optional
+        Drop allowed before a metric counts as a regression (a rise for the metrics of
+        LOWER_IS_BETTER), relative to the absolute value of the baseline (default is 0.1).
+
+    Returns:
+    --------
+    list of str
+        The names of the metrics that regressed. Only the throughput and timing metrics are
+        checked: the metrics of REPORT_ONLY, those missing from the baseline and those with a
+        zero baseline are ignored.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name in REPORT_ONLY or name not in baseline or not baseline[name]['value']:
+            continue
+        reference = baseline[name]['value']
+        sign = -1 if name in LOWER_IS_BETTER else 1
+        if sign*(result['value'] - reference) < -tolerance*abs(reference):
+            regressions.append(name)
+    return regressions
+
+
+def format_table(results, baseline = None):
+    """
+    Formats the results as a text table, with the change from the baseline if one is given.
+    """
+    lines = [f"{'benchmark':<20}{'value':>14}  {'unit':<14}{'baseline':>14}{'change':>9}"]
+    for name, result in results.items():
+        line = f"{name:<20}{result['value']:>14.1f}  {result['unit']:<14}"
+        if baseline and name in baseline:
+            reference = baseline[name]['value']
+            line += f"{reference:>14.1f}{100*(result['value'] - reference)/abs(reference or 1):>+8.1f}%"
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def main(argv = None):
+    """
+    Command line entry point: python -m othello_MCTS.benchmarks [options].
+
+    Returns:
+    --------
+    int
+        The exit status, 1 if a metric regressed beyond the tolerance, 0 otherwise.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description = "Runs the othello_MCTS performance benchmarks.")
+    parser.add_argument('names', nargs = '*', help = f"benchmarks to run (default: all of {', '.join(BENCHMARKS)} "
+                                                        f"but {', '.join(sorted(OPT_IN))})")
+    parser.add_argument('--repeat', type = int, default = 3, help = "runs per workload, the fastest is kept")
+    parser.add_argument('--json', metavar = 'PATH', help = "write the results as JSON to PATH ('-' for stdout)")
+    parser.add_argument('--baseline', metavar = 'PATH', help = "compare with the results stored in PATH")
+    parser.add_argument('--save-baseline', metavar = 'PATH', help = "store the results in PATH as the new baseline")
+    parser.add_argument('--tolerance', type = float, default = 0.1,
+                        help = "relative slowdown allowed before failing (default 0.1)")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    results = run_benchmarks(args.names, args.repeat)
+    print(format_table(results, baseline))
+
+    if args.json == '-':
+        print(json.dumps(results, indent = 1))
+    elif args.json:
+        with open(args.json, 'w') as file:
+            json.dump(results, file, indent = 1)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as file:
+            json.dump(results, file, indent = 1)
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"regression beyond {100*args.tolerance:.0f}%: {', '.join(regressions)}", file = sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,7 +1,261 @@
 import random
-from functools import reduce
-import pygame
-import copy
+
+
+def _make_in_board_mask():
+    mask = 0
+    for i in range(8):
+        for j in range(8):
+            mask |= 1 << j*9 + 7-i
+    return mask
+
+
+IN_BOARD_MASK = _make_in_board_mask()
+
+# (d, 2d, 4d) for each of the 4 shift directions of the 9x8 layout: 1 is vertical,
+# 9 horizontal and 8/10 the two diagonals. The padding bit at the top of each column
+# stops fills from wrapping around the board.
+SHIFTS = ((1, 2, 4), (8, 16, 32), (9, 18, 36), (10, 20, 40))
+
+
+def legal_moves(player, ennemy):
+    """
+    Computes the legal moves of `player` with a Kogge-Stone occluded fill in each direction.
+
+    Parameters:
+    -----------
+    player : int
+        Bitboard of the player to move.
+    ennemy : int
+        Bitboard of the opponent.
+
+    Returns:
+    --------
+    int
+        A bitboard with a bit set on every legal move.
+    """
+    empty = IN_BOARD_MASK & ~(player | ennemy)
+    moves = 0
+    for d1, d2, d4 in SHIFTS:
+        gen = player | (ennemy & (player << d1))
+        pro = ennemy & (ennemy << d1)
+        gen |= pro & (gen << d2)
+        pro &= pro << d2
+        gen |= pro & (gen << d4)
+        moves |= ((gen & ennemy) << d1) & empty
+
+        gen = player | (ennemy & (player >> d1))
+        pro = ennemy & (ennemy >> d1)
+        gen |= pro & (gen >> d2)
+        pro &= pro >> d2
+        gen |= pro & (gen >> d4)
+        moves |= ((gen & ennemy) >> d1) & empty
+
+    return moves
+
+
+def flip_mask(position, player, ennemy):
+    """
+    Computes the discs flipped when `player` plays at `position`.
+
+    Parameters:
+    -----------
+    position : int
+        The bit position of the move.
+    player : int
+        Bitboard of the player to move.
+    ennemy : int
+        Bitboard of the opponent.
+
+    Returns:
+    --------
+    int
+        A bitboard of the opponent discs that change color (0 if the move flips nothing).
+    """
+    move = 1 << position
+    flips = 0
+    for d1, d2, d4 in SHIFTS:
+        if ennemy & (move << d1):
+            gen = move | (ennemy & (move << d1))
+            pro = ennemy & (ennemy << d1)
+            gen |= pro & (gen << d2)
+            pro &= pro << d2
+            gen |= pro & (gen << d4)
+            gen &= ennemy
+            if (gen << d1) & player:
+                flips |= gen
+
+        if ennemy & (move >> d1):
+            gen = move | (ennemy & (move >> d1))
+            pro = ennemy & (ennemy >> d1)
+            gen |= pro & (gen >> d2)
+            pro &= pro >> d2
+            gen |= pro & (gen >> d4)
+            gen &= ennemy
+            if (gen >> d1) & player:
+                flips |= gen
+
+    return flips
+
+
+def _make_zobrist_keys(seed=0x0E110):
+    generator = random.Random(seed)
+    keys = [None, [generator.getrandbits(64) for _ in range(72)], [generator.getrandbits(64) for _ in range(72)]]
+    return keys, generator.getrandbits(64)
+
+
+# Zobrist keys are drawn from a fixed seed so that hashes are the same in every process.
+ZOBRIST, ZOBRIST_TURN = _make_zobrist_keys()
+ZOBRIST_FLIP = [ZOBRIST[1][i] ^ ZOBRIST[-1][i] for i in range(72)]
+
+
+def zobrist_hash(player1, player2, turn):
+    """
+    Computes the Zobrist hash of a position from scratch.
+
+    Parameters:
+    -----------
+    player1 : int
+        Bitboard of player 1.
+    player2 : int
+        Bitboard of player -1.
+    turn : int
+        The player to move (1 or -1).
+
+    Returns:
+    --------
+    int
+        A 64-bit hash of the position.
+    """
+    key = ZOBRIST_TURN if turn == -1 else 0
+    for keys, bitboard in ((ZOBRIST[1], player1), (ZOBRIST[-1], player2)):
+        while bitboard:
+            low = bitboard & -bitboard
+            key ^= keys[low.bit_length() - 1]
+            bitboard ^= low
+    return key
+
+
+def _make_square_mask(predicate):
+    mask = 0
+    for j in range(8):
+        for r in range(8):
+            if predicate(j, r):
+                mask |= 1 << 9*j + r
+    return mask
+
+
+CORNERS = _make_square_mask(lambda j, r: j in (0, 7) and r in (0, 7))
+# squares diagonally next to a corner, which usually give it away
+X_SQUARES = _make_square_mask(lambda j, r: j in (1, 6) and r in (1, 6))
+# edge squares next to a corner
+C_SQUARES = _make_square_mask(lambda j, r: (j in (0, 7) and r in (1, 6)) or (j in (1, 6) and r in (0, 7)))
+EDGES = _make_square_mask(lambda j, r: j in (0, 7) or r in (0, 7)) & ~(CORNERS | C_SQUARES)
+
+# (delta, mask) of the delta swaps of each symmetry of the 9x8 layout: every bit of the mask is
+# exchanged with the bit delta places above it. Reversing the rows swaps 4, 2 then 1 rows inside
+# each column, reversing the columns swaps 4, 2 then 1 columns, and the transpose swaps the
+# off-diagonal quarters of the 8x8, 4x4 then 2x2 blocks, which are 8*s bits apart.
+ROW_SWAPS = tuple((d, _make_square_mask(lambda j, r, d=d: r % (2*d) < d)) for d in (4, 2, 1))
+COLUMN_SWAPS = tuple((9*d, _make_square_mask(lambda j, r, d=d: j % (2*d) < d)) for d in (4, 2, 1))
+TRANSPOSE_SWAPS = tuple((8*d, _make_square_mask(lambda j, r, d=d: j % (2*d) < d <= r % (2*d))) for d in (4, 2, 1))
+
+# Symmetry s transposes the board if s & 4, then reverses the columns if s & 1 and the rows if s & 2,
+# so that square (j, r) goes to (j, r), (7-j, r), (j, 7-r), (7-j, 7-r), (r, j), (7-r, j), (r, 7-j)
+# and (7-r, 7-j). SYMMETRY_INVERSES[s] undoes symmetry s.
+SYMMETRY_INVERSES = (0, 1, 2, 3, 4, 6, 5, 7)
+
+
+def _delta_swaps(bitboard, swaps):
+    for delta, mask in swaps:
+        t = ((bitboard >> delta) ^ bitboard) & mask
+        bitboard ^= t ^ (t << delta)
+    return bitboard
+
+
+def transform(bitboard, symmetry):
+    """
+    Applies one of the 8 board symmetries to a bitboard with delta swaps.
+
+    Parameters:
+    -----------
+    bitboard : int
+        A bitboard of the 9x8 layout.
+    symmetry : int
+        The symmetry, from 0 (identity) to 7 (see SYMMETRY_INVERSES).
+
+    Returns:
+    --------
+    int
+        The transformed bitboard.
+    """
+    if symmetry & 4:
+        bitboard = _delta_swaps(bitboard, TRANSPOSE_SWAPS)
+    if symmetry & 1:
+        bitboard = _delta_swaps(bitboard, COLUMN_SWAPS)
+    if symmetry & 2:
+        bitboard = _delta_swaps(bitboard, ROW_SWAPS)
+    return bitboard
+
+
+def symmetric_images(bitboard):
+    """
+    Returns the 8 images of a bitboard, indexed by symmetry, with 7 rounds of delta swaps.
+    """
+    images = [bitboard, 0, 0, 0]
+    images[1] = _delta_swaps(bitboard, COLUMN_SWAPS)
+    images[2] = _delta_swaps(bitboard, ROW_SWAPS)
+    images[3] = _delta_swaps(images[1], ROW_SWAPS)
+    transposed = _delta_swaps(bitboard, TRANSPOSE_SWAPS)
+    images.append(transposed)
+    images.append(_delta_swaps(transposed, COLUMN_SWAPS))
+    images.append(_delta_swaps(transposed, ROW_SWAPS))
+    images.append(_delta_swaps(images[5], ROW_SWAPS))
+    return images
+
+
+def canonical_key(player1, player2, turn):
+    """
+    Returns the key shared by all the symmetric images of a position.
+
+    The canonical image is the one with the smallest (player1, player2) bitboards, and the key is
+    its Zobrist hash.
+
+    Parameters:
+    -----------
+    player1 : int
+        Bitboard of player 1.
+    player2 : int
+        Bitboard of player -1.
+    turn : int
+        The player to move.
+
+    Returns:
+    --------
+    tuple:
+        - key (int): The Zobrist hash of the canonical image.
+        - symmetry (int): The symmetry that maps the position to its canonical image.
+    """
+    image1, image2, symmetry = min(zip(symmetric_images(player1), symmetric_images(player2), range(8)))
+    return zobrist_hash(image1, image2, turn), symmetry
+
+
+def random_move(moves):
+    """
+    Picks a uniformly random set bit of a move bitboard.
+
+    Parameters:
+    -----------
+    moves : int
+        A non-empty bitboard of legal moves.
+
+    Returns:
+    --------
+    int
+        The bit position of the chosen move.
+    """
+    for _ in range(random.randrange(bin(moves).count('1'))):
+        moves &= moves - 1
+    return (moves & -moves).bit_length() - 1
 
 
 class Bitboard:
@@ -20,6 +274,14 @@ class Bitboard:
         A bitmask to determine valid positions within the board.
     winner : int or None
         The winner of the game (1, -1, or 0 for a tie), or None if the game is ongoing.
+    moves : int or None
+        Cached bitboard of the legal moves for the current player, None when it has to be recomputed.
+    passed : bool
+        True if the current player is moving again because the opponent had to pass.
+    hashing : bool
+        Whether the Zobrist hash is updated on each move.
+    hash : int
+        Zobrist hash of the current position, only kept up to date while hashing is True.
     
     Methods:
     --------
@@ -32,9 +294,36 @@ class Bitboard:
     get_moves():
         Determines all possible moves for the current player.
 
+    get_move_mask():
+        Returns the bitboard of legal moves for the current player.
+
+    get_flips(position):
+        Returns the bitboard of discs flipped by a move at the given position.
+
     play(position=72):
         Plays a move at the specified position or selects one randomly if the position is invalid.
 
+    make_move(position=72):
+        Plays a move like `play` and returns a token that `unmake` uses to undo it.
+
+    unmake(undo_token):
+        Restores the position stored in an undo token.
+
+    get_undo_token():
+        Returns an undo token for the current position.
+
+    set_hashing(enabled):
+        Turns the incremental Zobrist hash on or off.
+
+    get_canonical_key():
+        Returns the key shared by the symmetric images of the position.
+
+    get_stabilizer():
+        Returns the symmetries that leave the position unchanged.
+
+    get_distinct_moves():
+        Returns the legal moves with one move per class of symmetric moves.
+
     is_full():
         Checks if the board is full.
 
@@ -45,7 +334,7 @@ class Bitboard:
         Sets the board and turn to the provided state.
 
     get_state():
-        Returns a copy of the current state of the game.
+        Returns the current state of the game as an immutable tuple.
 
     reset():
         Resets the game to its initial state.
@@ -67,6 +356,101 @@ class Bitboard:
         self.turn = 1
         self.in_board_mask = self.make_mask()
         self.winner = None
+        self.moves = None
+        self.passed = False
+        self.hashing = False
+        self.hash = 0
+
+    def set_hashing(self, enabled):
+        """
+        Turns the incremental Zobrist hash on or off, recomputing it for the current position.
+
+        Parameters:
+        -----------
+        enabled : bool
+            Whether `hash` should be kept up to date by `play`.
+        """
+        self.hashing = enabled
+        self.hash = zobrist_hash(self.player_bitboards[1], self.player_bitboards[-1], self.turn) if enabled else 0
+
+    def get_move_mask(self):
+        """
+        Returns the legal moves for the current player, computing them only if the cache is empty.
+
+        Returns:
+        --------
+        int
+            A bitboard representing all possible moves.
+        """
+        if self.moves is None:
+            self.moves = legal_moves(self.player_bitboards[self.turn], self.player_bitboards[-self.turn])
+        return self.moves
+
+    def get_canonical_key(self):
+        """
+        Returns the key shared by the 8 symmetric images of the position (see canonical_key).
+
+        Returns:
+        --------
+        tuple:
+            - key (int): The Zobrist hash of the canonical image.
+            - symmetry (int): The symmetry that maps the position to its canonical image.
+        """
+        return canonical_key(self.player_bitboards[1], self.player_bitboards[-1], self.turn)
+
+    def get_stabilizer(self):
+        """
+        Returns the symmetries other than the identity that map the position to itself.
+
+        Returns:
+        --------
+        list of int
+            The symmetries, empty for most positions past the first moves.
+        """
+        images1 = symmetric_images(self.player_bitboards[1])
+        images2 = symmetric_images(self.player_bitboards[-1])
+        return [symmetry for symmetry in range(1, 8)
+                if images1[symmetry] == images1[0] and images2[symmetry] == images2[0]]
+
+    def get_distinct_moves(self):
+        """
+        Returns the legal moves, keeping one move of each class of moves that the symmetries of the
+        position map to each other. The moves of a class lead to symmetric positions.
+
+        Returns:
+        --------
+        int
+            A bitboard of legal moves.
+        """
+        moves = self.get_move_mask()
+        stabilizer = self.get_stabilizer()
+        if not stabilizer:
+            return moves
+
+        distinct = 0
+        while moves:
+            low = moves & -moves
+            distinct |= low
+            moves ^= low
+            for symmetry in stabilizer:
+                moves &= ~transform(low, symmetry)
+        return distinct
+
+    def get_flips(self, position):
+        """
+        Returns the discs flipped if the current player plays at the given position.
+
+        Parameters:
+        -----------
+        position : int
+            The bit position of the move.
+
+        Returns:
+        --------
+        int
+            A bitboard of the flipped discs.
+        """
+        return flip_mask(position, self.player_bitboards[self.turn], self.player_bitboards[-self.turn])
 
     def get_moves(self):
         """
@@ -84,82 +468,123 @@ class Bitboard:
 
         player = self.player_bitboards[self.turn]
         ennemy = self.player_bitboards[-self.turn]
-        directions = [1, 8, 9, 10]
-
-        for i in directions:
-            moves_in_direction = 0
-            mask = ennemy & (player >> i)
-            while mask :
-                mask = (mask >> i) & (~player) & self.in_board_mask
-                positions = (mask) & (~ennemy)
-                mask &= ~positions
-                moves_in_direction |= positions
-
+        empty = self.in_board_mask & ~(player | ennemy)
+
+        for d1, d2, d4 in SHIFTS:
+            gen = player | (ennemy & (player >> d1))
+            pro = ennemy & (ennemy >> d1)
+            gen |= pro & (gen >> d2)
+            pro &= pro >> d2
+            gen |= pro & (gen >> d4)
+            moves_in_direction = ((gen & ennemy) >> d1) & empty
             if moves_in_direction:
-                moves_by_direction1.append((i, moves_in_direction))
-
-        for i in directions:
-            moves_in_direction = 0
-            mask = ennemy & (player << i)
-            while mask :
-                mask = (mask << i) & (~player) & self.in_board_mask
-                positions = (mask) & (~ennemy)
-                mask &= ~positions
-                moves_in_direction |= positions
+                moves_by_direction1.append((d1, moves_in_direction))
+
+        for d1, d2, d4 in SHIFTS:
+            gen = player | (ennemy & (player << d1))
+            pro = ennemy & (ennemy << d1)
+            gen |= pro & (gen << d2)
+            pro &= pro << d2
+            gen |= pro & (gen << d4)
+            moves_in_direction = ((gen & ennemy) << d1) & empty
             if moves_in_direction:
-                moves_by_direction2.append((i, moves_in_direction))
-
-        moves_by_direction = [i[1] for i in moves_by_direction1 + moves_by_direction2]
-        moves = 0
-        if moves_by_direction:
-            moves = reduce(lambda x, y: x | y, moves_by_direction)
+                moves_by_direction2.append((d1, moves_in_direction))
 
-        return moves_by_direction1, moves_by_direction2, moves
+        return moves_by_direction1, moves_by_direction2, self.get_move_mask()
 
     def play(self, position=72):
         """
         Executes a move at the given position or selects a valid position randomly if invalid.
 
+        The flips are computed in one pass by `flip_mask`, and the legal moves of the next
+        player are cached so that the pass check and the following move reuse them.
+
         Parameters:
         -----------
         position : int, optional
             The bit position where the move is to be played (default is 72 which is always invalid).
         """
-        moves_by_direction1, moves_by_direction2, moves = self.get_moves()
+        moves = self.moves
+        if moves is None:
+            moves = self.get_move_mask()
 
         if not ((1 << position) & moves):
-            position = random.choice([i for i in range(moves.bit_length()) if (moves >> i) & 1])
+            position = random_move(moves)
+
+        turn = self.turn
+        player = self.player_bitboards[turn]
+        ennemy = self.player_bitboards[-turn]
+        flips = flip_mask(position, player, ennemy)
+
+        player |= flips | (1 << position)
+        ennemy ^= flips
+        self.player_bitboards[turn] = player
+        self.player_bitboards[-turn] = ennemy
+
+        if self.hashing:
+            key = self.hash ^ ZOBRIST[turn][position]
+            while flips:
+                low = flips & -flips
+                key ^= ZOBRIST_FLIP[low.bit_length() - 1]
+                flips ^= low
+            self.hash = key
+
+        moves = legal_moves(ennemy, player)
+        if moves:
+            self.turn = -turn
+            self.passed = False
+            if self.hashing:
+                self.hash ^= ZOBRIST_TURN
+        else:
+            moves = legal_moves(player, ennemy)
+            self.passed = True
+            if moves == 0:
+                self.winner = self.get_winner()
 
-        directions1 = [i[0] for i in moves_by_direction1 if ((1 << position) & i[1])]
-        directions2 = [i[0] for i in moves_by_direction2 if ((1 << position) & i[1])]
+        self.moves = moves
 
-        self.player_bitboards[self.turn] |= 1 << position
+    def make_move(self, position=72):
+        """
+        Plays a move like `play` and returns the token needed to undo it.
 
-        player = self.player_bitboards[self.turn]
+        Parameters:
+        -----------
+        position : int, optional
+            The bit position where the move is to be played (default is 72 which is always invalid).
 
-        for i in directions1:
-            mask = 1 << position
-            while mask != 0:
-                mask = (mask << i) & (~player) & self.in_board_mask
-                self.player_bitboards[self.turn] |= mask
-                self.player_bitboards[-self.turn] &= ~mask
+        Returns:
+        --------
+        tuple
+            The undo token of the position before the move.
+        """
+        undo_token = self.get_undo_token()
+        self.play(position)
+        return undo_token
 
-        for i in directions2:
-            mask = 1 << position
-            while mask != 0:
-                mask = (mask >> i) & (~player) & self.in_board_mask
-                self.player_bitboards[self.turn] |= mask
-                self.player_bitboards[-self.turn] &= ~mask
+    def get_undo_token(self):
+        """
+        Returns an undo token for the current position.
 
-        self.turn = -self.turn
+        A token is a snapshot of plain ints, so unmaking the first token of a sequence of moves
+        rewinds the whole sequence at once.
 
-        _, _, moves = self.get_moves()
+        Returns:
+        --------
+        tuple
+            The player bitboards, turn, pass flag, winner, cached moves and hash.
+        """
+        return (self.player_bitboards[1], self.player_bitboards[-1], self.turn, self.passed, self.winner, self.moves, self.hash)
 
-        if moves == 0:
-            self.turn = -self.turn
-            _, _, moves = self.get_moves()
-            if moves == 0:
-                self.winner = self.get_winner()
+    def unmake(self, undo_token):
+        """
+        Restores the position stored in an undo token.
+
+        Parameters:
+        -----------
+        undo_token : tuple
+            A token returned by `make_move` or `get_undo_token`.
+        """
+        self.player_bitboards[1], self.player_bitboards[-1], self.turn, self.passed, self.winner, self.moves, self.hash = undo_token
 
     def is_full(self):
         """
@@ -191,25 +616,45 @@ class Bitboard:
         """
         Sets the game state to the provided state.
 
+        If the player to move has no legal move the turn is passed, and if neither player can
+        move the winner is set.
+
         Parameters:
         -----------
         state : tuple
-            A tuple containing the player bitboards and turn.
+            A tuple (player, opponent, turn, passed) where player is the bitboard of the player to move.
         """
-        temp_state = copy.deepcopy(state)
-        self.player_bitboards = temp_state[0]
-        self.turn = temp_state[1]
+        player, ennemy, turn, passed = state
+        self.player_bitboards[turn] = player
+        self.player_bitboards[-turn] = ennemy
+        self.turn = turn
+        self.passed = passed
+        self.winner = None
+        self.moves = legal_moves(player, ennemy)
+
+        if self.moves == 0:
+            self.moves = legal_moves(ennemy, player)
+            if self.moves:
+                self.turn = -turn
+                self.passed = True
+            else:
+                self.winner = self.get_winner()
+
+        if self.hashing:
+            self.hash = zobrist_hash(self.player_bitboards[1], self.player_bitboards[-1], self.turn)
 
     def get_state(self):
         """
-        Returns a copy of the current state of the game.
+        Returns the current state of the game.
+
+        The state only holds ints, so it can be shared and stored without copying.
 
         Returns:
         --------
         tuple:
-            A tuple containing the player bitboards and turn.
+            A tuple (player, opponent, turn, passed) where player is the bitboard of the player to move.
         """
-        return copy.deepcopy([self.player_bitboards, self.turn])
+        return (self.player_bitboards[self.turn], self.player_bitboards[-self.turn], self.turn, self.passed)
 
 
     def reset(self):
@@ -220,86 +665,32 @@ class Bitboard:
         self.initiate_board()
         self.turn = 1
         self.winner = None
+        self.moves = None
+        self.passed = False
+        if self.hashing:
+            self.hash = zobrist_hash(self.player_bitboards[1], self.player_bitboards[-1], self.turn)
 
 
     def show(self, surface, width, height):
         """
-        Displays the current game state on a Pygame surface.
-
-        Parameters:
-        -----------
-        surface : pygame.Surface
-            The surface to draw the game board on.
-        width : int
-            The width of the game board.
-        height : int
-            The height of the game board.
-        """
-        pygame.draw.rect(surface, "#189AB4", pygame.Rect(0, 0, width, height))
-        for i in range(8):
-            for j in range(8):
-                position = (7-i + j*9)
-                player = int(((self.player_bitboards[1] >> position) & 1) - ((self.player_bitboards[-1] >> position) & 1))
-                color = self.colors[player]
-                pygame.draw.circle(surface, color, ((j+0.5)*width/8,(i+0.5)*height/8), 30)
+        Displays the current game state on a Pygame surface (see gui.show).
+        """
+        from othello_MCTS.gui import show
+        show(self, surface, width, height)
 
     def show_with_possible_moves(self, surface, width, height):
         """
-        Displays the current game state on a Pygame surface with the possible moves to play.
-
-        Parameters:
-        -----------
-        surface : pygame.Surface
-            The surface to draw the game board on.
-        width : int
-            The width of the game board.
-        height : int
-            The height of the game board.
+        Displays the current game state on a Pygame surface with the possible moves to play (see gui.show_with_possible_moves).
         """
-        _,_,moves = self.get_moves()
-
-        pygame.draw.rect(surface, "#189AB4", pygame.Rect(0, 0, width, height))
-        for i in range(8):
-            for j in range(8):
-                position = (7-i + j*9)
-                player = int(((self.player_bitboards[1] >> position) & 1) - ((self.player_bitboards[-1] >> position) & 1)) + 2*((moves >> position) & 1)
-                color = self.colors[player]
-                pygame.draw.circle(surface, color, ((j+0.5)*width/8,(i+0.5)*height/8), 30)
+        from othello_MCTS.gui import show_with_possible_moves
+        show_with_possible_moves(self, surface, width, height)
 
     def user_move(self, surface, width, height):
         """
-        Handles user interactions to play a move.
-
-        Parameters:
-        -----------
-        surface : pygame.Surface
-            The surface on which the game is drawn.
-        width : int
-            The width of the surface.
-        height : int
-            The height of the surface.
-        """
-        finished = False
-        step = (width // 8)
-        _, _, moves = self.get_moves()
-        moves = [i for i in range(moves.bit_length()) if (moves >> i) & 1]
-
-        while not finished:
-            events = pygame.event.get()
-            pos = pygame.mouse.get_pos()
-            i = pos[0] // step
-            j = pos[1] // step
-            move = 9 * i + 7 - j
-            for event in events:
-                if event.type == pygame.MOUSEBUTTONUP and (move in moves):
-                    self.play(move)
-                    return
-
-            self.show_with_possible_moves(surface, width, height)
-            if move in moves:
-                pygame.draw.circle(surface, "#8B0000", ((i + 0.5) * width / 8, (j + 0.5) * height / 8), 30)
-
-            pygame.display.flip()
+        Handles user interactions to play a move (see gui.user_move).
+        """
+        from othello_MCTS.gui import user_move
+        user_move(self, surface, width, height)
 
     def initiate_board(self):
         """
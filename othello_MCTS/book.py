@@ -0,0 +1,296 @@
+from othello_MCTS.bitboard import Bitboard, SYMMETRY_INVERSES, canonical_key, legal_moves, transform
+import struct
+import sys
+
+
+class OpeningBook:
+    """
+    An opening book file: fixed-size records sorted by canonical key, searched by bisection in a
+    read-only memory map that is opened on the first lookup.
+
+    Moves are stored in the frame of the canonical image of their position, so one record serves
+    the 8 symmetric positions. A header after the magic bytes holds the largest number of discs of
+    the book positions: every move adds a disc, so later positions are rejected without computing
+    their canonical key.
+
+    Attributes:
+    -----------
+    MAGIC : bytes
+        The first bytes of a book file.
+    OLD_MAGIC : bytes
+        The first bytes of the book files written without header, still read.
+    HEADER : struct.Struct
+        The header layout: largest number of discs of a book position.
+    RECORD : struct.Struct
+        The record layout: key, move, n_visits and mean value of the move.
+    path : str
+        The book file.
+    data : mmap or None
+        The memory map of the file, None until the first lookup.
+    max_discs : int
+        Largest number of discs of a book position, read from the header.
+    hits : int
+        Number of lookups that found a move.
+
+    Methods:
+    --------
+    find(key):
+        Returns the record of a canonical key.
+
+    lookup(state):
+        Returns the book move of a state.
+
+    write(path, records, max_discs):
+        Writes a book file.
+
+    close():
+        Unmaps the file.
+    """
+    MAGIC = b'OTHBOOK2'
+    OLD_MAGIC = b'OTHBOOK1'
+    HEADER = struct.Struct('<B')
+    RECORD = struct.Struct('<QBIf')
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.data = None
+        self.size = 0
+        self.offset = 0
+        self.max_discs = 64
+        self.hits = 0
+
+    def __len__(self):
+        self.load()
+        return self.size
+
+    def load(self):
+        """
+        Maps the book file, if it is not mapped yet.
+        """
+        if self.data is not None:
+            return
+        import mmap
+
+        self.file = open(self.path, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access = mmap.ACCESS_READ)
+        magic = self.data[:len(self.MAGIC)]
+        if magic == self.MAGIC:
+            self.max_discs, = self.HEADER.unpack_from(self.data, len(self.MAGIC))
+            self.offset = len(self.MAGIC) + self.HEADER.size
+        elif magic == self.OLD_MAGIC:
+            self.max_discs = 64
+            self.offset = len(self.OLD_MAGIC)
+        else:
+            self.close()
+            raise ValueError(f"{self.path} is not an opening book")
+        self.size = (len(self.data) - self.offset) // self.RECORD.size
+
+    def find(self, key):
+        """
+        Looks up a canonical key by bisection.
+
+        Parameters:
+        -----------
+        key : int
+            Canonical key of a position (see canonical_key).
+
+        Returns:
+        --------
+        tuple or None
+            (move, n_visits, value) in the canonical frame, None if the position is not in the book.
+        """
+        self.load()
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            record = self.RECORD.unpack_from(self.data, self.offset + middle*self.RECORD.size)
+            if record[0] < key:
+                low = middle + 1
+            elif record[0] > key:
+                high = middle
+            else:
+                return record[1:]
+        return None
+
+    def lookup(self, state):
+        """
+        Returns the book move of a state.
+
+        Parameters:
+        -----------
+        state : tuple
+            A Bitboard state (player, opponent, turn, passed).
+
+        Returns:
+        --------
+        int or None
+            The move to play, None if the position is not in the book.
+        """
+        player, opponent, turn, _ = state
+        self.load()
+        if bin(player | opponent).count('1') > self.max_discs:
+            return None
+        player1, player2 = (player, opponent) if turn == 1 else (opponent, player)
+        key, symmetry = canonical_key(player1, player2, turn)
+        record = self.find(key)
+        if record is None:
+            return None
+
+        move = transform(1 << record[0], SYMMETRY_INVERSES[symmetry]).bit_length() - 1
+        if not (legal_moves(player, opponent) >> move) & 1:
+            return None
+        self.hits += 1
+        return move
+
+    @classmethod
+    def write(cls, path, records, max_discs = 64):
+        """
+        Writes a book file.
+
+        Parameters:
+        -----------
+        path : str
+            The book file.
+        records : dict
+            (move, n_visits, value) in the canonical frame, indexed by canonical key.
+        max_discs : int, optional
+            Largest number of discs of the positions of the records (default is 64, no limit).
+        """
+        with open(path, 'wb') as file:
+            file.write(cls.MAGIC)
+            file.write(cls.HEADER.pack(max_discs))
+            for key in sorted(records):
+                file.write(cls.RECORD.pack(key, *records[key]))
+
+    def close(self):
+        """
+        Unmaps the book file. The next lookup maps it again.
+        """
+        if self.data is not None:
+            self.data.close()
+            self.file.close()
+        self.data = None
+        self.file = None
+
+
+def book_positions(plies):
+    """
+    Lists the positions reached in the first plies of a game, one per symmetry class.
+
+    Parameters:
+    -----------
+    plies : int
+        Number of moves from the starting position.
+
+    Returns:
+    --------
+    dict
+        The canonical image of every position with a move to play before plies moves, as a
+        Bitboard state, indexed by canonical key.
+    """
+    bitboard = Bitboard()
+    positions = {}
+    frontier = [bitboard.get_state()]
+    for _ in range(plies):
+        next_frontier = []
+        for state in frontier:
+            bitboard.set_state(state)
+            if bitboard.winner is not None:
+                continue
+            player1, player2, turn = bitboard.player_bitboards[1], bitboard.player_bitboards[-1], bitboard.turn
+            key, symmetry = canonical_key(player1, player2, turn)
+            if key in positions:
+                continue
+            player1, player2 = transform(player1, symmetry), transform(player2, symmetry)
+            positions[key] = (player1, player2, turn, False) if turn == 1 else (player2, player1, turn, False)
+
+            undo_token = bitboard.get_undo_token()
+            moves = bitboard.get_move_mask()
+            for move in range(moves.bit_length()):
+                if (moves >> move) & 1:
+                    bitboard.play(move)
+                    next_frontier.append(bitboard.get_state())
+                    bitboard.unmake(undo_token)
+        frontier = next_frontier
+    return positions
+
+
+def book_search(config, state):
+    """
+    Searches a book position in a worker process.
+
+    Returns:
+    --------
+    tuple
+        (move, n_visits, value) of the chosen move, value being its mean for the player to move.
+    """
+    from othello_MCTS.parallel import worker_mcts
+
+    mcts = worker_mcts(config)
+    move = mcts.run_mcts(state)
+    child = dict(mcts.children_of(mcts.root))[move]
+    if mcts.tree is not None:
+        n_visits, value = mcts.tree.n_visits[child], mcts.tree.value[child]
+    else:
+        n_visits, value = child.n_visits, child.value
+    return move, int(n_visits), value/n_visits if n_visits else 0.0
+
+
+def build_book(path, plies = 4, config = None, max_workers = None):
+    """
+    Builds an opening book with a deep search of every position of the first plies.
+
+    Parameters:
+    -----------
+    path : str
+        The book file to write.
+    plies : int, optional
+        Number of moves covered by the book (default is 4).
+    config : dict, optional
+        Keyword arguments of the searching MCTS (default is 10000 UCT iterations).
+    max_workers : int, optional
+        Number of worker processes (default is the number of CPUs).
+
+    Returns:
+    --------
+    int
+        Number of positions in the book.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from othello_MCTS.parallel import seed_worker
+
+    config = dict(config or {'max_iter': 10000, 'selection_method': 'uct'}, reuse_tree = False, book_path = None)
+    positions = book_positions(plies)
+    with ProcessPoolExecutor(max_workers = max_workers, initializer = seed_worker) as executor:
+        futures = {key: executor.submit(book_search, config, state) for key, state in positions.items()}
+        records = {}
+        for i, (key, future) in enumerate(futures.items(), 1):
+            records[key] = future.result()
+            print(f"{i} out of {len(futures)}")
+
+    max_discs = max(bin(state[0] | state[1]).count('1') for state in positions.values())
+    OpeningBook.write(path, records, max_discs)
+    return len(records)
+
+
+def main(argv = None):
+    """
+    Command line entry point: python -m othello_MCTS.book PATH [options].
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description = "Builds an opening book from MCTS searches.")
+    parser.add_argument('path', help = "book file to write")
+    parser.add_argument('--plies', type = int, default = 4, help = "number of moves covered by the book (default 4)")
+    parser.add_argument('--max-iter', type = int, default = 10000, help = "iterations of each search (default 10000)")
+    parser.add_argument('--workers', type = int, default = None, help = "number of worker processes")
+    args = parser.parse_args(argv)
+
+    n_positions = build_book(args.path, args.plies, {'max_iter': args.max_iter, 'selection_method': 'uct'}, args.workers)
+    print(f"{n_positions} positions written to {args.path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,216 @@
+from othello_MCTS.bitboard import CORNERS, IN_BOARD_MASK, flip_mask, legal_moves
+
+
+def _make_region_mask(columns, rows):
+    mask = 0
+    for j in columns:
+        for r in rows:
+            mask |= 1 << 9*j + r
+    return mask
+
+
+QUADRANTS = tuple(_make_region_mask(columns, rows) for columns in (range(4), range(4, 8)) for rows in (range(4), range(4, 8)))
+
+
+class EndgameSolver:
+    """
+    An exact endgame solver: negamax with alpha-beta pruning on plain bitboards.
+
+    Moves are tried with the move stored in the hash table first, then corners, then moves in the
+    quadrants with an odd number of empty squares (parity), and far from the end by increasing
+    number of replies left to the opponent. Bounds of positions with at least TABLE_MIN_EMPTIES
+    empty squares are stored in a hash table that is cleared when it holds hash_size positions.
+
+    Scores are final disc differences for the player to move; a pass does not count as a move,
+    as in Bitboard.play.
+
+    Attributes:
+    -----------
+    TABLE_MIN_EMPTIES : int
+        Number of empty squares from which positions are stored in the hash table.
+    MOBILITY_MIN_EMPTIES : int
+        Number of empty squares from which moves are ordered by the opponent's mobility.
+    hash_size : int
+        Maximum number of positions in the hash table.
+    table : dict
+        (lower bound, upper bound, best move) of positions, indexed by (player, opponent).
+    nodes : int
+        Number of positions searched.
+
+    Methods:
+    --------
+    solve(player, opponent, alpha, beta):
+        Returns the score of a position.
+
+    best_move(player, opponent, alpha, beta):
+        Returns the best move of a position and its score.
+
+    clear():
+        Empties the hash table.
+    """
+    TABLE_MIN_EMPTIES = 6
+    MOBILITY_MIN_EMPTIES = 8
+
+    def __init__(self, hash_size = 2**16):
+        self.hash_size = hash_size
+        self.table = {}
+        self.nodes = 0
+
+    def clear(self):
+        """
+        Empties the hash table and resets the node count.
+        """
+        self.table.clear()
+        self.nodes = 0
+
+    def solve(self, player, opponent, alpha = -64, beta = 64):
+        """
+        Computes the final disc difference of a position with perfect play.
+
+        A narrow window is much faster: solve(player, opponent, -1, 1) only finds whether the
+        position is won (score >= 1), drawn (0) or lost (score <= -1).
+
+        Parameters:
+        -----------
+        player : int
+            Bitboard of the player to move.
+        opponent : int
+            Bitboard of the other player.
+        alpha : int, optional
+            Lower bound of the window (default is -64).
+        beta : int, optional
+            Upper bound of the window (default is 64).
+
+        Returns:
+        --------
+        int
+            The score for the player to move, exact inside the window, a bound outside it.
+        """
+        return self.negamax(player, opponent, alpha, beta)
+
+    def best_move(self, player, opponent, alpha = -64, beta = 64):
+        """
+        Finds the best move of a position.
+
+        Parameters:
+        -----------
+        player : int
+            Bitboard of the player to move, who must have a legal move.
+        opponent : int
+            Bitboard of the other player.
+        alpha : int, optional
+            Lower bound of the window (default is -64).
+        beta : int, optional
+            Upper bound of the window (default is 64). With the window (-1, 1) the first winning
+            move is returned, or else a drawing move.
+
+        Returns:
+        --------
+        tuple:
+            - move (int): The bit position of the best move.
+            - score (int): Its final disc difference for the player to move, a bound outside the window.
+        """
+        moves = legal_moves(player, opponent)
+        best_score = -65
+        best_move = None
+        for move in self.ordered_moves(player, opponent, moves, None):
+            flips = flip_mask(move, player, opponent)
+            score = -self.negamax(opponent ^ flips, player | flips | (1 << move), -beta, -max(alpha, best_score))
+            if score > best_score:
+                best_score, best_move = score, move
+                if best_score >= beta:
+                    break
+        return best_move, best_score
+
+    def negamax(self, player, opponent, alpha, beta):
+        self.nodes += 1
+        moves = legal_moves(player, opponent)
+        if not moves:
+            if not legal_moves(opponent, player):
+                return bin(player).count('1') - bin(opponent).count('1')
+            return -self.negamax(opponent, player, -beta, -alpha)
+
+        key = None
+        hash_move = None
+        empties = bin(IN_BOARD_MASK & ~(player | opponent)).count('1')
+        if empties >= self.TABLE_MIN_EMPTIES:
+            key = (player, opponent)
+            entry = self.table.get(key)
+            if entry is not None:
+                lower, upper, hash_move = entry
+                if lower >= beta:
+                    return lower
+                if upper <= alpha:
+                    return upper
+                alpha = max(alpha, lower)
+                beta = min(beta, upper)
+
+        window_alpha = alpha
+        best_score = -65
+        best_move = None
+        for move in self.ordered_moves(player, opponent, moves, hash_move, empties):
+            flips = flip_mask(move, player, opponent)
+            score = -self.negamax(opponent ^ flips, player | flips | (1 << move), -beta, -alpha)
+            if score > best_score:
+                best_score, best_move = score, move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        if key is not None:
+            if len(self.table) >= self.hash_size:
+                self.table.clear()
+            if best_score <= window_alpha:
+                self.table[key] = (-64, best_score, best_move)
+            elif best_score >= beta:
+                self.table[key] = (best_score, 64, best_move)
+            else:
+                self.table[key] = (best_score, best_score, best_move)
+        return best_score
+
+    def ordered_moves(self, player, opponent, moves, hash_move, empties = 64):
+        """
+        Returns the legal moves of a position in the order they should be searched.
+
+        Parameters:
+        -----------
+        player : int
+            Bitboard of the player to move.
+        opponent : int
+            Bitboard of the other player.
+        moves : int
+            Bitboard of the legal moves.
+        hash_move : int or None
+            The best move found by an earlier search of the position, tried first.
+        empties : int, optional
+            Number of empty squares, moves are ordered by mobility from MOBILITY_MIN_EMPTIES.
+
+        Returns:
+        --------
+        list of int
+            The moves.
+        """
+        empty = IN_BOARD_MASK & ~(player | opponent)
+        odd = 0
+        for quadrant in QUADRANTS:
+            if bin(empty & quadrant).count('1') & 1:
+                odd |= quadrant
+
+        ordered = []
+        while moves:
+            low = moves & -moves
+            moves ^= low
+            move = low.bit_length() - 1
+            if move == hash_move:
+                priority = -100
+            else:
+                priority = -20 if low & CORNERS else 0
+                if low & odd:
+                    priority -= 10
+                if empties >= self.MOBILITY_MIN_EMPTIES:
+                    flips = flip_mask(move, player, opponent)
+                    priority += bin(legal_moves(opponent ^ flips, player | flips | low)).count('1')
+            ordered.append((priority, move))
+        ordered.sort()
+        return [move for _, move in ordered]
@@ -0,0 +1,384 @@
+from othello_MCTS.bitboard import Bitboard
+import pygame
+import threading
+
+
+BACKGROUND = "#189AB4"
+HOVER = "#8B0000"
+RADIUS = 30
+# Longest wait for an event, in milliseconds: the progress of a search is shown at this rate.
+PROGRESS_INTERVAL = 200
+PLAYER_NAMES = {1: 'black', -1: 'white'}
+# Posted by a SearchThread when its search is over, to wake the event loop up.
+SEARCH_DONE = pygame.USEREVENT
+
+
+def show(bitboard, surface, width, height):
+    """
+    Displays the current game state on a Pygame surface.
+
+    Parameters:
+    -----------
+    bitboard : Bitboard
+        The board to draw.
+    surface : pygame.Surface
+        The surface to draw the game board on.
+    width : int
+        The width of the game board.
+    height : int
+        The height of the game board.
+    """
+    pygame.draw.rect(surface, BACKGROUND, pygame.Rect(0, 0, width, height))
+    for i in range(8):
+        for j in range(8):
+            position = (7-i + j*9)
+            player = int(((bitboard.player_bitboards[1] >> position) & 1) - ((bitboard.player_bitboards[-1] >> position) & 1))
+            color = bitboard.colors[player]
+            pygame.draw.circle(surface, color, ((j+0.5)*width/8,(i+0.5)*height/8), RADIUS)
+
+
+def show_with_possible_moves(bitboard, surface, width, height):
+    """
+    Displays the current game state on a Pygame surface with the possible moves to play.
+
+    Parameters:
+    -----------
+    bitboard : Bitboard
+        The board to draw.
+    surface : pygame.Surface
+        The surface to draw the game board on.
+    width : int
+        The width of the game board.
+    height : int
+        The height of the game board.
+    """
+    moves = bitboard.get_move_mask()
+
+    pygame.draw.rect(surface, BACKGROUND, pygame.Rect(0, 0, width, height))
+    for i in range(8):
+        for j in range(8):
+            position = (7-i + j*9)
+            player = int(((bitboard.player_bitboards[1] >> position) & 1) - ((bitboard.player_bitboards[-1] >> position) & 1)) + 2*((moves >> position) & 1)
+            color = bitboard.colors[player]
+            pygame.draw.circle(surface, color, ((j+0.5)*width/8,(i+0.5)*height/8), RADIUS)
+
+
+def square_at(pos, width, height):
+    """
+    Returns the bit position of the square under a point of the window, None outside the board.
+    """
+    i = pos[0] * 8 // width
+    j = pos[1] * 8 // height
+    if not (0 <= i < 8 and 0 <= j < 8):
+        return None
+    return 9 * i + 7 - j
+
+
+def move_name(move):
+    """
+    Returns the name of a move as drawn on the window, column letter then row number from the top
+    (for example 'd3').
+    """
+    return f"{'abcdefgh'[move // 9]}{8 - move % 9}"
+
+
+class BoardView:
+    """
+    Draws a bitboard on a Pygame surface, repainting only the squares whose color changed since
+    the last drawing and updating only their rectangles on the display.
+
+    The board background is drawn once into a cached surface, from which each repainted square
+    is restored before its disc is drawn.
+
+    Attributes:
+    -----------
+    surface : pygame.Surface
+        The display surface.
+    width : int
+        The width of the game board.
+    height : int
+        The height of the game board.
+    background : pygame.Surface
+        The cached empty board.
+    drawn : dict
+        The color currently drawn on each square, indexed by bit position.
+
+    Methods:
+    --------
+    draw(bitboard, moves, hover):
+        Repaints the squares that changed.
+
+    invalidate():
+        Forces a full repaint at the next drawing.
+    """
+
+    def __init__(self, surface, width, height):
+        self.surface = surface
+        self.width = width
+        self.height = height
+        self.background = pygame.Surface((width, height))
+        self.background.fill(BACKGROUND)
+        self.drawn = {}
+
+    def invalidate(self):
+        """
+        Forgets what is drawn, so that the next drawing repaints every square.
+        """
+        self.drawn.clear()
+
+    def draw(self, bitboard, moves = 0, hover = None):
+        """
+        Repaints the squares whose color changed.
+
+        Parameters:
+        -----------
+        bitboard : Bitboard
+            The board to draw.
+        moves : int, optional
+            Bitboard of the moves to highlight (default is none).
+        hover : int or None, optional
+            The move under the mouse, highlighted in HOVER.
+
+        Returns:
+        --------
+        list of pygame.Rect
+            The repainted rectangles.
+        """
+        player1, player2 = bitboard.player_bitboards[1], bitboard.player_bitboards[-1]
+        dirty = []
+        for i in range(8):
+            for j in range(8):
+                position = (7-i + j*9)
+                if position == hover:
+                    color = HOVER
+                else:
+                    color = bitboard.colors[int(((player1 >> position) & 1) - ((player2 >> position) & 1)) + 2*((moves >> position) & 1)]
+                if self.drawn.get(position) == color:
+                    continue
+
+                self.drawn[position] = color
+                left, top = j*self.width//8, i*self.height//8
+                rect = pygame.Rect(left, top, (j+1)*self.width//8 - left, (i+1)*self.height//8 - top)
+                self.surface.blit(self.background, rect, rect)
+                pygame.draw.circle(self.surface, color, ((j+0.5)*self.width/8,(i+0.5)*self.height/8), RADIUS)
+                dirty.append(rect)
+
+        if dirty:
+            pygame.display.update(dirty)
+        return dirty
+
+
+class SearchThread(threading.Thread):
+    """
+    Runs the search of an MCTS player in a background thread, so that the window keeps handling
+    events while the player thinks or ponders.
+
+    Attributes:
+    -----------
+    mcts : MCTS
+        The searching player.
+    state : tuple
+        The state searched.
+    pondering : bool
+        Whether the search runs during the opponent's turn (see MCTS.ponder).
+    stop_event : threading.Event
+        Set to end the search early.
+    move : int or None
+        The move found, None until the search is over, when pondering or when the search failed.
+    error : Exception or None
+        The exception raised by the search, if it failed.
+
+    Methods:
+    --------
+    progress():
+        Returns the number of iterations and the best move so far.
+
+    stop():
+        Ends the search and waits for the thread.
+    """
+
+    def __init__(self, mcts, state, pondering = False):
+        super().__init__(daemon = True)
+        self.mcts = mcts
+        self.state = state
+        self.pondering = pondering
+        self.stop_event = threading.Event()
+        self.move = None
+        self.error = None
+
+    def run(self):
+        if self.pondering:
+            self.mcts.ponder(self.state, self.stop_event)
+            return
+
+        previous, self.mcts.stop_event = self.mcts.stop_event, self.stop_event
+        try:
+            self.move = self.mcts.run_mcts(self.state)
+        except Exception as error:
+            self.error = error
+        finally:
+            self.mcts.stop_event = previous
+            if pygame.display.get_init():
+                pygame.event.post(pygame.event.Event(SEARCH_DONE))
+
+    def progress(self):
+        """
+        Returns the progress of the search.
+
+        Returns:
+        --------
+        tuple:
+            - iterations (int): Number of rollouts played by the search.
+            - best_move (int or None): The most visited root child, the expected reply when pondering.
+        """
+        stats = self.mcts.root_statistics() if self.mcts.player_type == 'MCTS' else []
+        return self.mcts.num_rollouts, stats[0][0] if stats else None
+
+    def stop(self):
+        """
+        Ends the search after its current iteration and waits for the thread.
+        """
+        self.stop_event.set()
+        self.join()
+
+
+def user_move(bitboard, surface, width, height):
+    """
+    Handles user interactions to play a move. Sleeps until an event arrives, and repaints only
+    the squares whose highlight changed.
+
+    Parameters:
+    -----------
+    bitboard : Bitboard
+        The board on which the move is played.
+    surface : pygame.Surface
+        The surface on which the game is drawn.
+    width : int
+        The width of the surface.
+    height : int
+        The height of the surface.
+    """
+    view = BoardView(surface, width, height)
+    moves = bitboard.get_move_mask()
+    hover = None
+    view.draw(bitboard, moves)
+
+    while True:
+        event = pygame.event.wait()
+        if event.type in (pygame.MOUSEMOTION, pygame.MOUSEBUTTONUP):
+            move = square_at(event.pos, width, height)
+            hover = move if move is not None and (moves >> move) & 1 else None
+            if event.type == pygame.MOUSEBUTTONUP and hover is not None:
+                bitboard.play(hover)
+                return
+        elif event.type == pygame.QUIT:
+            pygame.event.post(event)
+            return
+        view.draw(bitboard, moves, hover)
+
+
+def show_match(player1,player2, ponder = True):
+    """
+    Plays and displays a single match where player1 starts.
+
+    The window is event driven: it sleeps until an event arrives (a search posts SEARCH_DONE
+    when it is over) or PROGRESS_INTERVAL passes, and repaints only the squares that changed.
+    The MCTS players search in a background thread while the window title shows their
+    iterations and best move so far, and the search ends early when the window is closed.
+
+    Parameters:
+    -----------
+    player1 : MCTS or 'user'
+        The first player of the match. Can be an instance of the MCTS class or a user input ('user').
+    player2 : MCTS or 'user'
+        The second player of the match. Can be an instance of the MCTS class or a user input ('user').
+    ponder : bool, optional
+        Whether an MCTS player searches during the turn of a user, keeping the tree of the move
+        the user plays (default is True).
+
+    Returns:
+    --------
+    int or None
+        The winner of the match (1 for player1, -1 for player2, 0 for a draw), None if the
+        window was closed before the end. If the search of an MCTS player fails, the match ends
+        and a RuntimeError is raised from its error.
+    """
+    width = 800
+    height = 800
+    pygame.init()
+
+    surface = pygame.display.set_mode((width,height))
+    view = BoardView(surface, width, height)
+    bitboard = Bitboard()
+    players = {1: player1, -1: player2}
+    search = None
+    pondering = None
+    hover = None
+    caption = None
+    end_time = None
+    failed = None
+
+    while True:
+        turn = bitboard.turn
+        human = bitboard.winner is None and players[turn] == 'user'
+        moves = bitboard.get_move_mask() if human else 0
+
+        if bitboard.winner is None and not human and search is None:
+            search = SearchThread(players[turn], bitboard.get_state())
+            search.start()
+        if ponder and human and pondering is None and players[-turn] != 'user':
+            pondering = SearchThread(players[-turn], bitboard.get_state(), pondering = True)
+            pondering.start()
+
+        if bitboard.winner is not None:
+            result = {1: 'black wins', -1: 'white wins', 0: 'draw'}[bitboard.winner]
+            text = f"Othello - {result}"
+        elif search is not None:
+            iterations, best_move = search.progress()
+            text = f"Othello - {PLAYER_NAMES[turn]} thinking: {iterations} iterations"
+            if best_move is not None:
+                text += f", best move {move_name(best_move)}"
+        else:
+            text = f"Othello - {PLAYER_NAMES[turn]} to move"
+            if pondering is not None:
+                iterations, best_move = pondering.progress()
+                text += f" ({PLAYER_NAMES[-turn]} pondering: {iterations} iterations)"
+        if text != caption:
+            caption = text
+            pygame.display.set_caption(caption)
+
+        view.draw(bitboard, moves, hover)
+        if bitboard.winner is not None and end_time is None:
+            end_time = pygame.time.get_ticks() + 5000
+
+        event = pygame.event.wait(PROGRESS_INTERVAL)
+        if event.type == pygame.QUIT:
+            break
+        if end_time is not None and pygame.time.get_ticks() >= end_time:
+            break
+
+        if human and event.type in (pygame.MOUSEMOTION, pygame.MOUSEBUTTONUP):
+            move = square_at(event.pos, width, height)
+            hover = move if move is not None and (moves >> move) & 1 else None
+            if event.type == pygame.MOUSEBUTTONUP and hover is not None:
+                if pondering is not None:
+                    pondering.stop()
+                    pondering = None
+                bitboard.play(hover)
+                hover = None
+
+        if search is not None and not search.is_alive():
+            if search.move is None:
+                failed = search
+                search = None
+                break
+            bitboard.play(search.move)
+            search = None
+
+    for thread in (search, pondering):
+        if thread is not None:
+            thread.stop()
+    pygame.quit()
+    if failed is not None:
+        raise RuntimeError(f"the search of {PLAYER_NAMES[bitboard.turn]} failed") from failed.error
+    return bitboard.winner
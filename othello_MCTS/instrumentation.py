@@ -0,0 +1,234 @@
+from collections import Counter
+import time
+
+
+class SearchStats:
+    """
+    Measurements of one instrumented MCTS search.
+
+    Phase times are exclusive: the time of expand is not counted again in select, nor the time
+    of unmake in run_simulation.
+
+    Attributes:
+    -----------
+    PHASES : tuple
+        The timed methods, of MCTS (select, expand, run_simulation, back_propagate) and of its
+        Bitboard (set_state, unmake).
+    phase_time : dict
+        Cumulative time of each phase, in seconds.
+    phase_calls : dict
+        Number of calls of each phase.
+    depth_histogram : Counter
+        Number of selected nodes at each depth below the root.
+    expansions : int
+        Number of expanded nodes.
+    children : int
+        Number of children created by the expansions.
+    rollouts : int
+        Number of rollouts whose length was measured (python rollout backend only).
+    rollout_plies : int
+        Total number of moves played by these rollouts.
+    run_time : float
+        Duration of the search, in seconds.
+    node_count : int
+        Number of nodes created by the search.
+    num_rollouts : int
+        Number of rollouts played by the search.
+
+    Methods:
+    --------
+    as_dict():
+        Returns the measurements and derived rates as a dictionary.
+
+    report():
+        Returns the measurements as a text table.
+    """
+    PHASES = ('select', 'expand', 'run_simulation', 'back_propagate', 'set_state', 'unmake')
+
+    def __init__(self):
+        self.phase_time = dict.fromkeys(self.PHASES, 0.0)
+        self.phase_calls = dict.fromkeys(self.PHASES, 0)
+        self.depth_histogram = Counter()
+        self.expansions = 0
+        self.children = 0
+        self.rollouts = 0
+        self.rollout_plies = 0
+        self.run_time = 0
+        self.node_count = 0
+        self.num_rollouts = 0
+
+    @property
+    def branching_factor(self):
+        return self.children/self.expansions if self.expansions else 0
+
+    @property
+    def mean_rollout_length(self):
+        return self.rollout_plies/self.rollouts if self.rollouts else 0
+
+    @property
+    def mean_depth(self):
+        selections = sum(self.depth_histogram.values())
+        return sum(depth*count for depth, count in self.depth_histogram.items())/selections if selections else 0
+
+    @property
+    def nodes_per_second(self):
+        return self.node_count/self.run_time if self.run_time else 0
+
+    @property
+    def rollouts_per_second(self):
+        return self.num_rollouts/self.run_time if self.run_time else 0
+
+    def as_dict(self):
+        """
+        Returns the measurements and the derived rates as a JSON-serializable dictionary.
+        """
+        return {'phase_time': dict(self.phase_time),
+                'phase_calls': dict(self.phase_calls),
+                'depth_histogram': dict(sorted(self.depth_histogram.items())),
+                'mean_depth': self.mean_depth,
+                'branching_factor': self.branching_factor,
+                'mean_rollout_length': self.mean_rollout_length,
+                'run_time': self.run_time,
+                'node_count': self.node_count,
+                'num_rollouts': self.num_rollouts,
+                'nodes_per_second': self.nodes_per_second,
+                'rollouts_per_second': self.rollouts_per_second}
+
+    def report(self):
+        """
+        Returns the phase times and the tree and rollout measurements as a text table.
+        """
+        lines = [f"{'phase':<16}{'calls':>10}{'time (s)':>12}{'share':>8}"]
+        for phase in self.PHASES:
+            share = self.phase_time[phase]/self.run_time if self.run_time else 0
+            lines.append(f"{phase:<16}{self.phase_calls[phase]:>10}{self.phase_time[phase]:>12.4f}{100*share:>7.1f}%")
+        lines.append(f"run time {self.run_time:.4f}s, {self.node_count} nodes ({self.nodes_per_second:.0f}/s), "
+                     f"{self.num_rollouts} rollouts ({self.rollouts_per_second:.0f}/s)")
+        lines.append(f"mean depth {self.mean_depth:.2f}, branching factor {self.branching_factor:.2f}, "
+                     f"mean rollout length {self.mean_rollout_length:.1f} moves")
+        return '\n'.join(lines)
+
+
+def node_depth(mcts, node):
+    """
+    Returns the number of moves between the root of a search tree and one of its nodes.
+    """
+    depth = 0
+    if mcts.tree is not None:
+        while mcts.tree.parent[node] != -1:
+            node = mcts.tree.parent[node]
+            depth += 1
+        return depth
+
+    while node.parent is not None:
+        node = node.parent
+        depth += 1
+    return depth
+
+
+def instrument(mcts):
+    """
+    Replaces the phases of an MCTS instance and of its bitboard by timed wrappers, and its run_mcts
+    by a wrapper that stores a new SearchStats in mcts.stats for every search.
+
+    The wrappers are instance attributes, so uninstrumented instances run the plain methods. Only
+    the phases run in this process are measured: the worker processes of the parallel modes are not.
+
+    Parameters:
+    -----------
+    mcts : MCTS
+        The instance to instrument.
+    """
+    clock = time.perf_counter
+    bitboard = mcts.bitboard
+    # time spent in the timed calls nested in the current one, and number of moves played
+    nested = [0.0]
+    plies = [0]
+
+    def timed(phase, method):
+        def wrapper(*args):
+            outer = nested[0]
+            nested[0] = 0.0
+            start_time = clock()
+            result = method(*args)
+            elapsed = clock() - start_time
+            mcts.stats.phase_time[phase] += elapsed - nested[0]
+            mcts.stats.phase_calls[phase] += 1
+            nested[0] = outer + elapsed
+            return result
+        return wrapper
+
+    select = timed('select', mcts.select)
+    expand = timed('expand', mcts.expand)
+    run_simulation = timed('run_simulation', mcts.run_simulation)
+    play = bitboard.play
+    run_mcts = mcts.run_mcts
+
+    def select_wrapper():
+        node = select()
+        mcts.stats.depth_histogram[node_depth(mcts, node)] += 1
+        return node
+
+    def expand_wrapper(parent):
+        expanded = expand(parent)
+        if expanded:
+            mcts.stats.expansions += 1
+            mcts.stats.children += len(mcts.children_of(parent))
+        return expanded
+
+    def run_simulation_wrapper(winner = None):
+        start_plies = plies[0]
+        value = run_simulation(winner)
+        if mcts.batch_rollout is None and mcts.bitboard.winner is None:
+            mcts.stats.rollouts += mcts.iterations_per_simulation
+            mcts.stats.rollout_plies += plies[0] - start_plies
+        return value
+
+    def play_wrapper(position = 72):
+        plies[0] += 1
+        play(position)
+
+    def run_mcts_wrapper(state):
+        stats = mcts.stats = SearchStats()
+        start_time = clock()
+        move = run_mcts(state)
+        stats.run_time = clock() - start_time
+        stats.node_count = mcts.node_count - mcts.reused_nodes
+        stats.num_rollouts = mcts.num_rollouts
+        return move
+
+    mcts.stats = SearchStats()
+    mcts.select = select_wrapper
+    mcts.expand = expand_wrapper
+    mcts.run_simulation = run_simulation_wrapper
+    mcts.back_propagate = timed('back_propagate', mcts.back_propagate)
+    mcts.run_mcts = run_mcts_wrapper
+    bitboard.set_state = timed('set_state', bitboard.set_state)
+    bitboard.unmake = timed('unmake', bitboard.unmake)
+    bitboard.play = play_wrapper
+
+
+def profile_search(mcts, state, path):
+    """
+    Runs one search under cProfile and writes the profile to a file. Used by MCTS.profile_next.
+
+    Parameters:
+    -----------
+    mcts : MCTS
+        The searching instance.
+    state : tuple
+        The state to search from.
+    path : str
+        The profile file, readable with pstats or snakeviz.
+
+    Returns:
+    --------
+    int
+        The best move.
+    """
+    import cProfile
+
+    profiler = cProfile.Profile()
+    move = profiler.runcall(type(mcts).run_mcts, mcts, state)
+    profiler.dump_stats(path)
+    return move
@@ -0,0 +1,340 @@
+from array import array
+from math import log, sqrt
+import random
+
+
+class NodeStore:
+    """
+    A search tree stored in preallocated typed arrays instead of one Python object per node.
+
+    Nodes are indices into the arrays, the root is node 0 and the children of a node are allocated
+    next to each other, so they are the range first_child[i] to first_child[i] + n_children[i].
+    The arrays grow by chunk_size nodes when they are full.
+
+    Attributes:
+    -----------
+    FIELDS : tuple
+        (name, typecode) of every per-node array.
+    chunk_size : int
+        Number of nodes added to the arrays each time they grow.
+    size : int
+        Number of nodes in use.
+    capacity : int
+        Number of nodes the arrays can hold before growing.
+    move : array
+        The move leading to each node (-1 for the root).
+    parent : array
+        The index of the parent of each node (-1 for the root).
+    first_child : array
+        The index of the first child of each node.
+    n_children : array
+        The number of children of each node (0 if the node is not expanded).
+    n_visits : array
+        The number of visits of each node.
+    value : array
+        The total value accumulated from simulations at each node.
+    random : random.Random
+        The generator used to break ties, seeded for reproducible searches.
+
+    Methods:
+    --------
+    add_children(parent, moves):
+        Allocates the children of a node.
+
+    children(node):
+        Returns the range of the children of a node.
+
+    select_child(node, selection_method, c):
+        Picks a child of a node by UCT or at random.
+
+    back_propagate(node, value, n_visits):
+        Adds a simulation result to a node and all its ancestors.
+
+    best_move(node):
+        Returns the move of the child with the highest value.
+
+    reroot(node):
+        Returns a new store holding only the subtree of a node.
+
+    clear():
+        Removes every node but a fresh root, keeping the allocated memory.
+    """
+    FIELDS = (('move', 'b'), ('parent', 'i'), ('first_child', 'i'), ('n_children', 'B'),
+              ('n_visits', 'd'), ('value', 'd'))
+
+    def __init__(self, chunk_size = 4096, seed = None):
+        self.chunk_size = chunk_size
+        self.random = random.Random(seed)
+        self.capacity = 0
+        for name, typecode in self.FIELDS:
+            setattr(self, name, array(typecode))
+        self.grow(chunk_size)
+        self.clear()
+
+    @property
+    def bytes_per_node(self):
+        """
+        Number of bytes used by one node across all the arrays.
+        """
+        return sum(getattr(self, name).itemsize for name, _ in self.FIELDS)
+
+    @property
+    def nbytes(self):
+        """
+        Number of bytes allocated by the arrays, used or not.
+        """
+        return self.capacity * self.bytes_per_node
+
+    def grow(self, n_nodes):
+        """
+        Extends every array by n_nodes zeroed nodes.
+
+        Parameters:
+        -----------
+        n_nodes : int
+            Number of nodes to add to the capacity.
+        """
+        for name, _ in self.FIELDS:
+            field = getattr(self, name)
+            field.frombytes(bytes(n_nodes * field.itemsize))
+        self.capacity += n_nodes
+
+    def clear(self):
+        """
+        Removes every node but a fresh root, keeping the allocated memory.
+        """
+        self.size = 1
+        self.move[0] = -1
+        self.parent[0] = -1
+        self.first_child[0] = 0
+        self.n_children[0] = 0
+        self.n_visits[0] = 0
+        self.value[0] = 0
+
+    def add_children(self, parent, moves):
+        """
+        Allocates the children of a node in a contiguous block.
+
+        Parameters:
+        -----------
+        parent : int
+            The node to expand.
+        moves : list of int
+            The moves leading to the children.
+        """
+        first = self.size
+        if first + len(moves) > self.capacity:
+            self.grow(max(self.chunk_size, len(moves)))
+
+        for i, move in enumerate(moves, first):
+            self.move[i] = move
+            self.parent[i] = parent
+            self.first_child[i] = 0
+            self.n_children[i] = 0
+            self.n_visits[i] = 0
+            self.value[i] = 0
+
+        self.first_child[parent] = first
+        self.n_children[parent] = len(moves)
+        self.size = first + len(moves)
+
+    def children(self, node):
+        """
+        Returns the children of a node.
+
+        Parameters:
+        -----------
+        node : int
+            The parent node.
+
+        Returns:
+        --------
+        range
+            The indices of the children.
+        """
+        first = self.first_child[node]
+        return range(first, first + self.n_children[node])
+
+    def select_child(self, node, selection_method, c):
+        """
+        Picks a child of a node, by UCT or uniformly at random.
+
+        Unvisited children are picked first, without giving them an infinite score, and
+        log(n_visits) of the parent is computed once for all the children. Ties are broken
+        with the seeded generator.
+
+        Parameters:
+        -----------
+        node : int
+            The parent node.
+        selection_method : str
+            'uct' or 'random'.
+        c : float
+            Exploration parameter for UCT calculation.
+
+        Returns:
+        --------
+        int
+            The selected child.
+        """
+        children = self.children(node)
+        if selection_method == 'random':
+            return self.random.choice(children)
+
+        n_visits = self.n_visits
+        value = self.value
+        unvisited = [child for child in children if n_visits[child] == 0]
+        if unvisited:
+            return self.random.choice(unvisited)
+
+        log_visits = log(n_visits[node])
+        ucts = [value[child]/n_visits[child] + c*sqrt(log_visits/n_visits[child]) for child in children]
+        max_uct = max(ucts)
+        return self.random.choice([child for child, uct in zip(children, ucts) if uct == max_uct])
+
+    def back_propagate(self, node, value, n_visits):
+        """
+        Adds a simulation result to a node and all its ancestors.
+
+        Parameters:
+        -----------
+        node : int
+            The node from which backpropagation starts.
+        value : float
+            The value to add.
+        n_visits : int
+            The number of visits to add.
+        """
+        while node != -1:
+            self.n_visits[node] += n_visits
+            self.value[node] += value
+            node = self.parent[node]
+
+    def best_move(self, node = 0):
+        """
+        Returns the move of the child with the highest accumulated value, ties broken at random.
+
+        Parameters:
+        -----------
+        node : int
+            The parent node (the root by default).
+
+        Returns:
+        --------
+        int
+            The best move.
+        """
+        children = self.children(node)
+        max_value = max(self.value[child] for child in children)
+        return self.random.choice([self.move[child] for child in children if self.value[child] == max_value])
+
+    def reroot(self, node):
+        """
+        Returns a new store holding only the subtree of a node, with that node as root.
+
+        Parameters:
+        -----------
+        node : int
+            The future root.
+
+        Returns:
+        --------
+        NodeStore
+            The new store.
+        """
+        store = NodeStore(self.chunk_size)
+        store.random = self.random
+        store.n_visits[0] = self.n_visits[node]
+        store.value[0] = self.value[node]
+
+        pending = [(node, 0)]
+        while pending:
+            old, new = pending.pop()
+            children = self.children(old)
+            if not children:
+                continue
+            store.add_children(new, [self.move[child] for child in children])
+            for old_child, new_child in zip(children, store.children(new)):
+                store.n_visits[new_child] = self.n_visits[old_child]
+                store.value[new_child] = self.value[old_child]
+                pending.append((old_child, new_child))
+
+        return store
+
+
+class SharedNodeStore(NodeStore):
+    """
+    A NodeStore of fixed capacity whose arrays live in shared memory, so that several processes
+    can search the same tree.
+
+    The size of the tree and a shared iteration counter are kept in a small header in front of
+    the arrays. The store cannot grow: add_children raises MemoryError once it is full.
+
+    Attributes:
+    -----------
+    shm : SharedMemory
+        The shared memory block holding the header and the arrays.
+    header : memoryview
+        int64 header: [size, iterations].
+    owner : bool
+        True in the process that created the block and has to unlink it.
+
+    Methods:
+    --------
+    close():
+        Releases the arrays and the shared memory block.
+    """
+
+    def __init__(self, capacity, name = None, seed = None):
+        from multiprocessing import shared_memory
+
+        self.chunk_size = 0
+        self.random = random.Random(seed)
+        self.capacity = capacity
+        self.owner = name is None
+
+        fields = sorted(self.FIELDS, key=lambda field: -array(field[1]).itemsize)
+        nbytes = 16 + capacity*sum(array(typecode).itemsize for _, typecode in fields)
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+
+        self.header = self.shm.buf[:16].cast('q')
+        offset = 16
+        for field, typecode in fields:
+            itemsize = array(typecode).itemsize
+            setattr(self, field, self.shm.buf[offset:offset + capacity*itemsize].cast(typecode))
+            offset += capacity*itemsize
+
+        if self.owner:
+            self.clear()
+
+    @property
+    def size(self):
+        return self.header[0]
+
+    @size.setter
+    def size(self, size):
+        self.header[0] = size
+
+    @property
+    def name(self):
+        """
+        Name of the shared memory block, used by other processes to attach to the store.
+        """
+        return self.shm.name
+
+    def grow(self, n_nodes):
+        raise MemoryError(f"shared node store is full ({self.capacity} nodes)")
+
+    def close(self):
+        """
+        Releases the arrays and the shared memory block, which is unlinked by its owner.
+        """
+        for field, _ in self.FIELDS:
+            getattr(self, field).release()
+        self.header.release()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
@@ -0,0 +1,402 @@
+from othello_MCTS.MCTS import MCTS
+from othello_MCTS.bitboard import Bitboard
+from othello_MCTS.node_store import SharedNodeStore
+import os
+import random
+import time
+
+
+# MCTS instances built in a worker process, keyed by their configuration, so that repeated
+# searches do not rebuild the bitboard and the tree storage.
+_workers = {}
+
+
+def seed_worker():
+    """
+    Reseeds the random module of a new worker process, which would otherwise inherit the state
+    of the parent process and play the same rollouts as the other workers.
+    """
+    random.seed()
+
+
+def worker_mcts(config, seat = 0):
+    """
+    Returns the MCTS instance of the current process for a configuration, building it on first use.
+
+    Parameters:
+    -----------
+    config : dict
+        Keyword arguments of the MCTS constructor.
+    seat : int, optional
+        Separates the instances of a same configuration used at the same time, such as both
+        players of a game.
+
+    Returns:
+    --------
+    MCTS
+        The cached instance.
+    """
+    key = (seat, repr(sorted(config.items())))
+    if key not in _workers:
+        _workers[key] = MCTS(**config)
+    return _workers[key]
+
+
+def root_search(config, state, max_iter, seed):
+    """
+    Runs an independent search in a worker process and returns the statistics of the root children.
+
+    Parameters:
+    -----------
+    config : dict
+        Keyword arguments of the MCTS constructor.
+    state : tuple
+        The state to search from.
+    max_iter : int
+        Number of iterations of this worker (used only if cap_method == 'iter').
+    seed : int
+        Seed of the worker's generator, different for every worker.
+
+    Returns:
+    --------
+    tuple:
+        - stats (dict): (n_visits, value) of every root child, indexed by move.
+        - num_rollouts (int): Number of rollouts played by the worker.
+        - node_count (int): Number of nodes created by the worker.
+    """
+    mcts = worker_mcts(config)
+    mcts.max_iter = max_iter
+    random.seed(seed)
+    mcts.random.seed(seed)
+    mcts.run_mcts(state)
+
+    if mcts.tree is not None:
+        tree = mcts.tree
+        stats = {tree.move[child]: (tree.n_visits[child], tree.value[child]) for child in tree.children(mcts.root)}
+    else:
+        stats = {move: (child.n_visits, child.value) for move, child in mcts.root.children.items()}
+    return stats, mcts.num_rollouts, mcts.node_count
+
+
+def leaf_rollouts(config, main_player, states):
+    """
+    Runs the simulations of a batch of leaves in a worker process.
+
+    Parameters:
+    -----------
+    config : dict
+        Keyword arguments of the MCTS constructor.
+    main_player : int
+        The player the values are relative to.
+    states : list of tuple
+        The states of the leaves.
+
+    Returns:
+    --------
+    list of float
+        The simulation value of each leaf.
+    """
+    mcts = worker_mcts(config)
+    mcts.main_player = main_player
+    values = []
+    for state in states:
+        mcts.bitboard.set_state(state)
+        values.append(mcts.run_simulation())
+    return values
+
+
+def root_parallel_search(mcts, state):
+    """
+    Root parallelism: every worker grows its own tree from the same state, and the statistics
+    of the root children are summed before picking the move with the highest value.
+
+    With cap_method == 'iter' the max_iter iterations are split between the workers, with
+    cap_method == 'time' every worker searches for max_runtime seconds of wall time.
+
+    Parameters:
+    -----------
+    mcts : MCTS
+        The searching instance, with parallel == 'root'.
+    state : tuple
+        The state to search from.
+
+    Returns:
+    --------
+    int
+        The best move.
+    """
+    start_time = time.time()
+    config = mcts.worker_config()
+    max_iter = -(-mcts.max_iter // mcts.n_workers)
+    seeds = [mcts.random.getrandbits(32) for _ in range(mcts.n_workers)]
+    futures = [mcts.get_executor().submit(root_search, config, state, max_iter, seed) for seed in seeds]
+
+    merged = {}
+    mcts.num_rollouts = 0
+    mcts.node_count = 0
+    for future in futures:
+        stats, num_rollouts, node_count = future.result()
+        for move, (n_visits, value) in stats.items():
+            total_visits, total_value = merged.get(move, (0, 0))
+            merged[move] = (total_visits + n_visits, total_value + value)
+        mcts.num_rollouts += num_rollouts
+        mcts.node_count += node_count
+
+    mcts.root_stats = merged
+    mcts.run_time = time.time() - start_time
+    max_value = max(value for _, value in merged.values())
+    return mcts.random.choice([move for move, (_, value) in merged.items() if value == max_value])
+
+
+def leaf_parallel_search(mcts, state):
+    """
+    Leaf parallelism: the tree is grown in this process, and the simulations of a batch of
+    n_workers * leaf_batch leaves are sent to the worker pool at once before being backpropagated.
+
+    Parameters:
+    -----------
+    mcts : MCTS
+        The searching instance, with parallel == 'leaf'.
+    state : tuple
+        The state to search from.
+
+    Returns:
+    --------
+    int
+        The best move.
+    """
+    executor = mcts.get_executor()
+    config = mcts.worker_config()
+    batch_size = mcts.n_workers * mcts.leaf_batch
+    start_time = time.time()
+    iterations = 0
+
+    while True:
+        if mcts.cap_method == 'time':
+            if time.time() - start_time >= mcts.max_runtime:
+                break
+            n_leaves = batch_size
+        else:
+            n_leaves = min(batch_size, mcts.max_iter - iterations)
+            if n_leaves <= 0:
+                break
+
+        nodes = []
+        states = []
+        for _ in range(n_leaves):
+            nodes.append(mcts.select())
+            states.append(mcts.bitboard.get_state())
+            mcts.bitboard.unmake(mcts.undo_token)
+
+        chunk = -(-n_leaves // mcts.n_workers)
+        futures = [executor.submit(leaf_rollouts, config, mcts.main_player, states[i:i + chunk])
+                   for i in range(0, n_leaves, chunk)]
+        values = [value for future in futures for value in future.result()]
+
+        for node, value in zip(nodes, values):
+            mcts.back_propagate(node, value)
+        mcts.num_rollouts += n_leaves*mcts.iterations_per_simulation
+        iterations += n_leaves
+        if mcts.search_done():
+            break
+
+    mcts.run_time = time.time() - start_time
+    return mcts.best_move()
+
+
+# Locks of the tree-parallel mode, given to each worker process when the pool starts: the
+# first one guards expansions and the iteration counter, the others guard the node statistics.
+_tree_locks = None
+_shared_trees = {}
+
+
+def init_tree_worker(locks):
+    """
+    Initializes a worker process of the tree-parallel mode.
+
+    Parameters:
+    -----------
+    locks : list of multiprocessing.Lock
+        The expansion lock followed by the statistics locks.
+    """
+    global _tree_locks
+    seed_worker()
+    _tree_locks = locks
+
+
+def shared_tree(name, capacity):
+    """
+    Returns the shared node store of the current process for a shared memory block, attaching to it on first use.
+    """
+    if name not in _shared_trees:
+        _shared_trees[name] = SharedNodeStore(capacity, name = name)
+    return _shared_trees[name]
+
+
+def tree_search(config, state, name, capacity, virtual_loss, deadline):
+    """
+    Runs MCTS iterations in a worker process on the tree shared by all the workers.
+
+    Every node on the path from the root gets virtual_loss extra visits with no value, which
+    lowers its score for the other workers until the real result replaces them. Expansions and the
+    iteration counter are guarded by the first lock, and node statistics by one of the other locks
+    chosen by node index.
+
+    Parameters:
+    -----------
+    config : dict
+        Keyword arguments of the MCTS constructor.
+    state : tuple
+        The root state.
+    name : str
+        Name of the shared memory block of the tree.
+    capacity : int
+        Capacity of the shared tree in nodes.
+    virtual_loss : int
+        Number of virtual visits added to every node of a path during its iteration.
+    deadline : float or None
+        time.time() at which the search stops, None when the iterations are capped by max_iter.
+
+    Returns:
+    --------
+    int
+        Number of iterations run by this worker.
+    """
+    mcts = worker_mcts(config)
+    tree = shared_tree(name, capacity)
+    expand_lock = _tree_locks[0]
+    stat_locks = _tree_locks[1:]
+    bitboard = mcts.bitboard
+    bitboard.set_state(state)
+    mcts.main_player = state[2]
+    undo_token = bitboard.get_undo_token()
+    iterations = 0
+
+    while True:
+        if deadline is not None:
+            if time.time() >= deadline:
+                break
+        else:
+            with expand_lock:
+                if tree.header[1] >= mcts.max_iter:
+                    break
+                tree.header[1] += 1
+
+        node = 0
+        with stat_locks[0]:
+            tree.n_visits[0] += virtual_loss
+        path = [0]
+        while tree.n_children[node] != 0:
+            node = tree.select_child(node, mcts.selection_method, mcts.c)
+            unvisited = tree.n_visits[node] == 0
+            with stat_locks[node % len(stat_locks)]:
+                tree.n_visits[node] += virtual_loss
+            path.append(node)
+            bitboard.play(tree.move[node])
+            if unvisited:
+                break
+        else:
+            if bitboard.winner is None:
+                with expand_lock:
+                    if tree.n_children[node] == 0:
+                        moves = bitboard.get_distinct_moves() if mcts.merge_symmetries else bitboard.get_move_mask()
+                        try:
+                            tree.add_children(node, [i for i in range(moves.bit_length()) if (moves >> i) & 1])
+                        except MemoryError:
+                            pass
+                if tree.n_children[node] != 0:
+                    node = tree.random.choice(tree.children(node))
+                    with stat_locks[node % len(stat_locks)]:
+                        tree.n_visits[node] += virtual_loss
+                    path.append(node)
+                    bitboard.play(tree.move[node])
+
+        value = mcts.run_simulation()
+        n_visits = mcts.iterations_per_simulation
+        for node in path:
+            with stat_locks[node % len(stat_locks)]:
+                tree.n_visits[node] += n_visits - virtual_loss
+                tree.value[node] += value
+
+        bitboard.unmake(undo_token)
+        iterations += 1
+
+    return iterations
+
+
+def tree_parallel_search(mcts, state):
+    """
+    Tree parallelism: all the workers descend, expand and update one tree in shared memory,
+    spread over different leaves by virtual loss.
+
+    The tree is rebuilt for every search, and stops growing once tree_capacity nodes are used.
+
+    Parameters:
+    -----------
+    mcts : MCTS
+        The searching instance, with parallel == 'tree'.
+    state : tuple
+        The state to search from.
+
+    Returns:
+    --------
+    int
+        The best move.
+    """
+    executor = mcts.get_executor()
+    if mcts.shared_tree is None:
+        mcts.shared_tree = SharedNodeStore(mcts.tree_capacity, seed = mcts.random.getrandbits(32))
+    tree = mcts.shared_tree
+    tree.clear()
+    tree.header[1] = 0
+
+    start_time = time.time()
+    deadline = start_time + mcts.max_runtime if mcts.cap_method == 'time' else None
+    config = mcts.worker_config()
+    futures = [executor.submit(tree_search, config, state, tree.name, tree.capacity, mcts.virtual_loss, deadline)
+               for _ in range(mcts.n_workers)]
+    iterations = sum(future.result() for future in futures)
+
+    mcts.num_rollouts = iterations*mcts.iterations_per_simulation
+    mcts.node_count = tree.size
+    mcts.run_time = time.time() - start_time
+    return tree.best_move(0)
+
+
+def measure_scaling(config, worker_counts = None, state = None):
+    """
+    Measures the search throughput of a parallel configuration for several numbers of workers.
+
+    Parameters:
+    -----------
+    config : dict
+        Keyword arguments of the MCTS constructor, including parallel ('root' or 'leaf').
+    worker_counts : list of int, optional
+        Numbers of workers to try (default is 1, 2, 4, ... up to the number of CPUs).
+    state : tuple, optional
+        The state to search from (default is the starting position).
+
+    Returns:
+    --------
+    list of dict
+        For each number of workers: n_workers, run_time, rollouts_per_second and speedup.
+    """
+    if worker_counts is None:
+        worker_counts = [1]
+        while worker_counts[-1]*2 <= os.cpu_count():
+            worker_counts.append(worker_counts[-1]*2)
+    if state is None:
+        state = Bitboard().get_state()
+
+    results = []
+    for n_workers in worker_counts:
+        mcts = MCTS(**dict(config, n_workers = n_workers))
+        mcts.run_mcts(state)
+        mcts.run_mcts(state)
+        mcts.close()
+        rate = mcts.num_rollouts/mcts.run_time
+        results.append({'n_workers': n_workers, 'run_time': mcts.run_time, 'rollouts_per_second': rate,
+                        'speedup': rate/results[0]['rollouts_per_second'] if results else 1.0})
+        print(f"{n_workers} workers: {rate:.0f} rollouts/s, speedup {results[-1]['speedup']:.2f}")
+
+    return results
@@ -0,0 +1,144 @@
+from othello_MCTS.bitboard import Bitboard
+import sys
+import time
+
+
+# Number of positions at each depth from the starting position. Up to depth 8 nobody has to pass
+# and these are the standard Othello perft numbers. From depth 9 passes appear, which the standard
+# numbers count as a move (3005288 at depth 9) and Bitboard.play does not.
+KNOWN_COUNTS = {1: 4, 2: 12, 3: 56, 4: 244, 5: 1396, 6: 8200, 7: 55092, 8: 390216, 9: 3005320}
+
+
+def perft(bitboard, depth):
+    """
+    Counts the positions reached after depth moves from the current position of a bitboard.
+
+    Passes are played by Bitboard.play and do not count as a move, and a finished game counts as
+    one position whatever the remaining depth. The bitboard is back to its position on return.
+
+    Parameters:
+    -----------
+    bitboard : Bitboard
+        The board to search from.
+    depth : int
+        Number of moves.
+
+    Returns:
+    --------
+    int
+        The number of leaf positions.
+    """
+    if depth == 0 or bitboard.winner is not None:
+        return 1
+
+    nodes = 0
+    undo_token = bitboard.get_undo_token()
+    moves = bitboard.get_move_mask()
+    while moves:
+        low = moves & -moves
+        moves ^= low
+        bitboard.play(low.bit_length() - 1)
+        nodes += perft(bitboard, depth - 1)
+        bitboard.unmake(undo_token)
+    return nodes
+
+
+def divide(bitboard, depth):
+    """
+    Counts the positions reached after depth moves, split by the first move.
+
+    Parameters:
+    -----------
+    bitboard : Bitboard
+        The board to search from.
+    depth : int
+        Number of moves, at least 1.
+
+    Returns:
+    --------
+    dict
+        The number of leaf positions under each legal move, indexed by move.
+    """
+    counts = {}
+    undo_token = bitboard.get_undo_token()
+    moves = bitboard.get_move_mask()
+    while moves:
+        low = moves & -moves
+        moves ^= low
+        move = low.bit_length() - 1
+        bitboard.play(move)
+        counts[move] = perft(bitboard, depth - 1)
+        bitboard.unmake(undo_token)
+    return counts
+
+
+def run_perft(depth, state = None):
+    """
+    Runs perft on a fresh bitboard and measures its speed.
+
+    Parameters:
+    -----------
+    depth : int
+        Number of moves.
+    state : tuple, optional
+        The state to search from (default is the starting position).
+
+    Returns:
+    --------
+    tuple:
+        - nodes (int): The number of leaf positions.
+        - run_time (float): Duration of the count, in seconds.
+    """
+    bitboard = Bitboard()
+    if state is not None:
+        bitboard.set_state(state)
+
+    start_time = time.perf_counter()
+    nodes = perft(bitboard, depth)
+    return nodes, time.perf_counter() - start_time
+
+
+def main(argv = None):
+    """
+    Command line entry point: python -m othello_MCTS.perft DEPTH [options].
+
+    Returns:
+    --------
+    int
+        The exit status, 1 if a count of the starting position differs from KNOWN_COUNTS, 0 otherwise.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description = "Counts the positions reached after each number of moves.")
+    parser.add_argument('depth', type = int, help = "maximum number of moves")
+    parser.add_argument('--state', nargs = 4, type = int, action = 'append', metavar = ('PLAYER', 'OPPONENT', 'TURN', 'PASSED'),
+                        help = "search from this Bitboard state instead of the starting position (repeatable)")
+    parser.add_argument('--divide', action = 'store_true', help = "split the count at the maximum depth by first move")
+    args = parser.parse_args(argv)
+
+    states = [tuple(state[:3]) + (bool(state[3]),) for state in args.state] if args.state else [None]
+    status = 0
+    for state in states:
+        print(f"state {state}" if state else "starting position")
+        for depth in range(1, args.depth + 1):
+            nodes, run_time = run_perft(depth, state)
+            line = f"depth {depth:>2}: {nodes:>12} nodes {run_time:>9.3f}s {nodes/max(run_time, 1e-9):>12.0f} nodes/s"
+            if state is None and depth in KNOWN_COUNTS:
+                if nodes == KNOWN_COUNTS[depth]:
+                    line += "  ok"
+                else:
+                    line += f"  expected {KNOWN_COUNTS[depth]}"
+                    status = 1
+            print(line)
+
+        if args.divide:
+            bitboard = Bitboard()
+            if state is not None:
+                bitboard.set_state(state)
+            for move, nodes in sorted(divide(bitboard, args.depth).items()):
+                print(f"move {move:>2} (column {move // 9}, row {move % 9}): {nodes}")
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
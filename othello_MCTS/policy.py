@@ -0,0 +1,139 @@
+from othello_MCTS.bitboard import C_SQUARES, CORNERS, EDGES, X_SQUARES, flip_mask, legal_moves, random_move
+from abc import ABC, abstractmethod
+import random
+
+
+# Sampling weight of a move by square, indexed by bit position.
+SQUARE_WEIGHTS = [16 if (CORNERS >> i) & 1 else 0.25 if (X_SQUARES >> i) & 1 else 0.5 if (C_SQUARES >> i) & 1
+                  else 2 if (EDGES >> i) & 1 else 1 for i in range(72)]
+
+
+class RolloutPolicy(ABC):
+    """
+    Chooses the moves of the rollouts of MCTS.run_simulation.
+
+    Subclasses implement the abstract method choose, which gets a bitboard whose game is not over and returns one of
+    its legal moves. Policies use the random module, like Bitboard.play, and must be picklable so
+    that the parallel modes can send them to worker processes.
+
+    Methods:
+    --------
+    choose(bitboard):
+        Returns the move to play.
+    """
+
+    @abstractmethod
+    def choose(self, bitboard):
+        """
+        Returns the move to play in the bitboard's position.
+
+        Parameters:
+        -----------
+        bitboard : Bitboard
+            The board of the rollout, with at least one legal move.
+
+        Returns:
+        --------
+        int
+            The bit position of a legal move.
+        """
+
+
+class UniformPolicy(RolloutPolicy):
+    """
+    Picks a legal move uniformly at random, like Bitboard.play(72).
+    """
+
+    def choose(self, bitboard):
+        return random_move(bitboard.get_move_mask())
+
+
+class CornerPolicy(RolloutPolicy):
+    """
+    Takes a corner when one is available, otherwise picks uniformly among the moves that are not
+    X-squares, and plays an X-square only when nothing else is legal. Costs two masks per move.
+    """
+
+    def choose(self, bitboard):
+        moves = bitboard.get_move_mask()
+        if moves & CORNERS:
+            return random_move(moves & CORNERS)
+        if moves & ~X_SQUARES:
+            return random_move(moves & ~X_SQUARES)
+        return random_move(moves)
+
+
+class MobilityPolicy(RolloutPolicy):
+    """
+    Samples a move with probability proportional to the weight of its square divided by one plus
+    the number of replies it leaves to the opponent. Costs one move generation per legal move.
+    """
+
+    def choose(self, bitboard):
+        moves = bitboard.get_move_mask()
+        if not moves & (moves - 1):
+            return moves.bit_length() - 1
+
+        player = bitboard.player_bitboards[bitboard.turn]
+        opponent = bitboard.player_bitboards[-bitboard.turn]
+        candidates = []
+        weights = []
+        while moves:
+            low = moves & -moves
+            moves ^= low
+            move = low.bit_length() - 1
+            flips = flip_mask(move, player, opponent)
+            replies = bin(legal_moves(opponent ^ flips, player | flips | low)).count('1')
+            candidates.append(move)
+            weights.append(SQUARE_WEIGHTS[move]/(1 + replies))
+        return random.choices(candidates, weights)[0]
+
+
+class EpsilonGreedyPolicy(RolloutPolicy):
+    """
+    Plays a uniformly random move with probability epsilon, and the move of another policy otherwise.
+
+    Attributes:
+    -----------
+    policy : RolloutPolicy
+        The policy followed most of the time.
+    epsilon : float
+        Probability of a uniformly random move.
+    """
+
+    def __init__(self, policy, epsilon = 0.1):
+        self.policy = policy
+        self.epsilon = epsilon
+
+    def choose(self, bitboard):
+        if random.random() < self.epsilon:
+            return random_move(bitboard.get_move_mask())
+        return self.policy.choose(bitboard)
+
+
+POLICIES = {'uniform': UniformPolicy, 'corner': CornerPolicy, 'mobility': MobilityPolicy}
+
+
+def make_policy(policy, epsilon = 0):
+    """
+    Builds a rollout policy from its name.
+
+    Parameters:
+    -----------
+    policy : str or RolloutPolicy
+        A name of POLICIES ('uniform', 'corner' or 'mobility') or a policy instance.
+    epsilon : float, optional
+        If not 0, the policy is mixed with uniformly random moves by EpsilonGreedyPolicy (default is 0).
+
+    Returns:
+    --------
+    RolloutPolicy
+        The policy.
+    """
+    if isinstance(policy, str):
+        if policy not in POLICIES:
+            raise ValueError(f"unknown rollout policy {policy!r}, expected one of {', '.join(POLICIES)}")
+        policy = POLICIES[policy]()
+    if epsilon:
+        policy = EpsilonGreedyPolicy(policy, epsilon)
+    return policy
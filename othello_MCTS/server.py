@@ -0,0 +1,514 @@
+from othello_MCTS.bitboard import Bitboard
+import asyncio
+import json
+import sys
+import threading
+import time
+
+
+# The MCTS instance and the snapshot queue of a worker process, set by init_worker.
+_worker = {}
+
+
+def init_worker(config, snapshots):
+    """
+    Builds the MCTS instance of a worker process once, and warms it up with a short search so
+    that the first request does not pay for the imports and the first allocations.
+
+    Parameters:
+    -----------
+    config : dict
+        Keyword arguments of the MCTS instance.
+    snapshots : multiprocessing.Queue
+        The queue on which the streamed snapshots are sent back to the server.
+    """
+    from othello_MCTS.MCTS import MCTS
+    from othello_MCTS.parallel import seed_worker
+
+    seed_worker()
+    mcts = MCTS(**config)
+    mcts.max_iter, mcts.cap_method = 10, 'iter'
+    mcts.run_mcts(Bitboard().get_state())
+    _worker['mcts'] = mcts
+    _worker['snapshots'] = snapshots
+
+
+def analyse(ticket, state, max_iter, runtime, deadline, interval, stream, early_stop):
+    """
+    Searches one position in a worker process.
+
+    Parameters:
+    -----------
+    ticket : int
+        The server's number of the request, which tags its snapshots.
+    state : tuple
+        The Bitboard state to search.
+    max_iter : int or None
+        Number of iterations of the search, if runtime is None.
+    runtime : float or None
+        Duration of the search, in seconds.
+    deadline : float or None
+        A time.time() value at which the search stops.
+    interval : float
+        Time between two streamed snapshots, in seconds.
+    stream : bool
+        Whether the snapshots are sent to the server while searching.
+    early_stop : bool
+        Whether the search stops once the best move cannot change any more.
+
+    Returns:
+    --------
+    dict
+        The last snapshot (see Snapshot.as_dict).
+    """
+    mcts = _worker['mcts']
+    if runtime is not None:
+        mcts.cap_method, mcts.max_runtime = 'time', runtime
+    else:
+        mcts.cap_method, mcts.max_iter = 'iter', max_iter
+
+    for snapshot in mcts.search(state, interval, deadline = deadline, early_stop = early_stop):
+        if snapshot.done:
+            return snapshot.as_dict()
+        if stream:
+            _worker['snapshots'].put((ticket, snapshot.as_dict()))
+
+
+def parse_request(line):
+    """
+    Reads and checks an analysis request.
+
+    A request is a JSON object on one line with the fields:
+        - id: any JSON value, repeated in the responses (default null).
+        - state: [player, opponent, turn, passed], a Bitboard state where the player to move
+          has a legal move.
+        - max_iter: number of iterations, at least 1 (default 1000), or
+        - time: duration of the search in seconds, positive, instead of max_iter.
+        - deadline: seconds after which the request is answered with what the search found,
+          or with an error if it is still queued (default none).
+        - stream: whether snapshots are sent while searching (default false).
+        - interval: seconds between snapshots, positive (default 0.1).
+        - early_stop: whether the search stops once the best move is decided (default true).
+
+    Parameters:
+    -----------
+    line : bytes
+        The request line.
+
+    Returns:
+    --------
+    dict
+        The request with its defaults.
+    """
+    request = json.loads(line)
+    if not isinstance(request, dict):
+        raise ValueError("a request must be a JSON object")
+    state = request.get('state')
+    if not (isinstance(state, list) and len(state) == 4 and all(isinstance(value, int) for value in state[:3])):
+        raise ValueError("state must be [player, opponent, turn, passed]")
+    if state[2] not in (1, -1):
+        raise ValueError("turn must be 1 or -1")
+    state = (state[0], state[1], state[2], bool(state[3]))
+
+    bitboard = Bitboard()
+    if (state[0] | state[1]) & ~bitboard.in_board_mask or state[0] & state[1]:
+        raise ValueError("state has discs outside the board or on the same squares")
+    bitboard.set_state(state)
+    if bitboard.winner is not None:
+        raise ValueError("the game is over")
+    # set_state passes the turn of a player without moves, while the search would play for state[2]
+    if bitboard.turn != state[2]:
+        raise ValueError("the player to move has no legal move and must pass")
+
+    max_iter = int(request.get('max_iter', 1000))
+    if max_iter < 1:
+        raise ValueError("max_iter must be at least 1")
+    runtime = request.get('time')
+    if runtime is not None:
+        runtime = float(runtime)
+        if not runtime > 0:
+            raise ValueError("time must be positive")
+    interval = float(request.get('interval', 0.1))
+    if not interval > 0:
+        raise ValueError("interval must be positive")
+    deadline = request.get('deadline')
+    return {'id': request.get('id'),
+            'state': state,
+            'max_iter': max_iter,
+            'runtime': runtime,
+            'deadline': time.time() + float(deadline) if deadline is not None else None,
+            'stream': bool(request.get('stream', False)),
+            'interval': interval,
+            'early_stop': bool(request.get('early_stop', True))}
+
+
+class AnalysisServer:
+    """
+    An asyncio server analyzing Othello positions with a pool of warm MCTS worker processes.
+
+    Clients send JSON requests, one per line (see parse_request), on a TCP or Unix socket, and
+    receive JSON responses, one per line, tagged with the id of their request:
+        - {"id", "type": "snapshot", ...} while searching, if the request asked for a stream,
+        - {"id", "type": "result", "best_move", "children", "iterations", "elapsed", "reason",
+          "queued"} when the search is over ("queued" is the time spent waiting for a worker),
+        - {"id", "type": "error", "error"} for an invalid request or a deadline passed in the queue.
+
+    Requests wait in a bounded queue. When it is full the server stops reading from the
+    connection that sends, which pushes back on the client through the socket.
+
+    Attributes:
+    -----------
+    config : dict
+        Keyword arguments of the MCTS instances of the workers.
+    n_workers : int
+        Number of worker processes, and of requests searched at once.
+    queue_size : int
+        Number of requests that can wait for a worker.
+    queue : asyncio.Queue or None
+        The waiting requests, created by start.
+    executor : ProcessPoolExecutor or None
+        The worker pool, started by start.
+    served : int
+        Number of requests answered with a result.
+
+    Methods:
+    --------
+    start(host, port, path):
+        Starts the workers and listens.
+
+    close():
+        Stops listening and shuts the workers down.
+    """
+
+    def __init__(self, config = None, n_workers = None, queue_size = 64):
+        import os
+
+        self.config = dict(config or {'selection_method': 'uct'}, reuse_tree = False, parallel = None)
+        self.n_workers = n_workers or os.cpu_count()
+        self.queue_size = queue_size
+        self.queue = None
+        self.executor = None
+        self.server = None
+        self.tasks = []
+        self.connections = set()
+        self.streams = {}
+        self.tickets = 0
+        self.served = 0
+        self.snapshots = None
+        self.reader_thread = None
+
+    async def start(self, host = '127.0.0.1', port = 8765, path = None):
+        """
+        Starts the worker processes (and waits until they are warm) and the listening socket.
+
+        Parameters:
+        -----------
+        host : str, optional
+            Address to listen on (default is '127.0.0.1').
+        port : int, optional
+            TCP port (default is 8765, 0 for any free port).
+        path : str, optional
+            Path of a Unix socket to listen on instead of TCP.
+
+        Returns:
+        --------
+        asyncio.base_events.Server
+            The listening server.
+        """
+        from concurrent.futures import ProcessPoolExecutor
+        import multiprocessing
+
+        loop = asyncio.get_running_loop()
+        self.snapshots = multiprocessing.Queue()
+        self.executor = ProcessPoolExecutor(max_workers = self.n_workers, initializer = init_worker,
+                                            initargs = (self.config, self.snapshots))
+        # starts every worker now rather than on its first request
+        await asyncio.gather(*[loop.run_in_executor(self.executor, time.sleep, 0.05) for _ in range(self.n_workers)])
+
+        self.reader_thread = threading.Thread(target = self.read_snapshots, args = (loop,), daemon = True)
+        self.reader_thread.start()
+        self.queue = asyncio.Queue(self.queue_size)
+        self.tasks = [asyncio.ensure_future(self.work()) for _ in range(self.n_workers)]
+        if path is not None:
+            self.server = await asyncio.start_unix_server(self.handle, path)
+        else:
+            self.server = await asyncio.start_server(self.handle, host, port)
+        return self.server
+
+    def read_snapshots(self, loop):
+        """
+        Forwards the snapshots sent by the workers to the connections of their requests. Runs in
+        a thread, as the queue of the workers is blocking.
+        """
+        while True:
+            message = self.snapshots.get()
+            if message is None:
+                return
+            loop.call_soon_threadsafe(self.forward, *message)
+
+    def forward(self, ticket, snapshot):
+        asyncio.ensure_future(self.send_snapshot(ticket, snapshot))
+
+    async def send_snapshot(self, ticket, snapshot):
+        # the stream is removed before the result is sent, so no snapshot follows the result
+        send = self.streams.get(ticket)
+        if send is None:
+            return
+        try:
+            await send(dict(snapshot, type = 'snapshot'))
+        except ConnectionError:
+            pass
+
+    async def handle(self, reader, writer):
+        """
+        Serves one connection: reads its requests and queues them, until the client closes it or
+        the server is closed.
+        """
+        self.connections.add(asyncio.current_task())
+        lock = asyncio.Lock()
+
+        async def send(response):
+            async with lock:
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+
+        # the requests of the connection still queued or searching
+        pending = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    request = parse_request(line)
+                except (ValueError, TypeError) as error:
+                    request_id = None
+                    try:
+                        request_id = json.loads(line).get('id')
+                    except (ValueError, AttributeError):
+                        pass
+                    await send({'id': request_id, 'type': 'error', 'error': str(error)})
+                    continue
+
+                done = asyncio.get_running_loop().create_future()
+                pending.add(done)
+                done.add_done_callback(pending.discard)
+                await self.queue.put((request, send, done, time.time()))
+            if pending:
+                await asyncio.gather(*pending)
+        except ConnectionError:
+            pass
+        except asyncio.CancelledError:
+            # the server is closing: its requests are dropped rather than left waiting
+            for done in list(pending):
+                done.cancel()
+        finally:
+            self.connections.discard(asyncio.current_task())
+            writer.close()
+
+    async def work(self):
+        """
+        Takes the requests from the queue and runs them on the worker pool, one at a time.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            request, send, done, queued_time = await self.queue.get()
+            ticket = self.tickets = self.tickets + 1
+            queued = time.time() - queued_time
+            try:
+                if request['deadline'] is not None and time.time() >= request['deadline']:
+                    await send({'id': request['id'], 'type': 'error', 'error': "deadline passed in the queue"})
+                    continue
+
+                if request['stream']:
+                    self.streams[ticket] = lambda response, request_id = request['id']: send(dict(response, id = request_id))
+                try:
+                    result = await loop.run_in_executor(self.executor, analyse, ticket, request['state'], request['max_iter'],
+                                                        request['runtime'], request['deadline'], request['interval'],
+                                                        request['stream'], request['early_stop'])
+                except Exception as error:
+                    self.streams.pop(ticket, None)
+                    await send({'id': request['id'], 'type': 'error', 'error': f"search failed: {error!r}"})
+                    continue
+                self.streams.pop(ticket, None)
+                self.served += 1
+                await send(dict(result, id = request['id'], type = 'result', queued = queued))
+            except ConnectionError:
+                pass
+            finally:
+                self.streams.pop(ticket, None)
+                if not done.done():
+                    done.set_result(None)
+                self.queue.task_done()
+
+    async def close(self):
+        """
+        Stops listening, cancels the waiting requests and the connections, and shuts the worker
+        pool down without blocking the event loop.
+        """
+        if self.server is not None:
+            self.server.close()
+        tasks = self.tasks + list(self.connections)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions = True)
+        if self.server is not None:
+            await self.server.wait_closed()
+        if self.executor is not None:
+            # waits in a thread for the searches still running in the workers
+            await asyncio.get_running_loop().run_in_executor(None, self.executor.shutdown)
+        if self.snapshots is not None:
+            self.snapshots.put(None)
+            self.reader_thread.join()
+
+
+async def open_connection(host = '127.0.0.1', port = 8765, path = None):
+    """
+    Opens a connection to an AnalysisServer.
+
+    Returns:
+    --------
+    tuple
+        The (reader, writer) streams of the connection.
+    """
+    if path is not None:
+        return await asyncio.open_unix_connection(path)
+    return await asyncio.open_connection(host, port)
+
+
+def percentile(values, fraction):
+    """
+    Returns the nearest-rank percentile of a list of values (fraction between 0 and 1).
+    """
+    from math import ceil
+
+    values = sorted(values)
+    return values[min(len(values), max(1, ceil(fraction*len(values)))) - 1]
+
+
+async def load_test(host = '127.0.0.1', port = 8765, path = None, n_requests = 200, concurrency = 8,
+                    max_iter = 200, runtime = None, stream = False):
+    """
+    Sends analysis requests for the positions of seeded random games and measures the server.
+
+    Every one of the concurrency connections sends its next request as soon as the previous one
+    is answered.
+
+    Parameters:
+    -----------
+    host, port, path :
+        The address of the server (see open_connection).
+    n_requests : int, optional
+        Number of requests (default is 200).
+    concurrency : int, optional
+        Number of connections, that is of requests in flight (default is 8).
+    max_iter : int, optional
+        Iterations of each search (default is 200).
+    runtime : float, optional
+        Duration of each search in seconds, instead of max_iter.
+    stream : bool, optional
+        Whether the requests ask for snapshots (default is False).
+
+    Returns:
+    --------
+    dict
+        Number of requests, errors, elapsed time, throughput (requests per second), and mean,
+        p50 and p99 latency in seconds.
+    """
+    from othello_MCTS.benchmarks import make_corpus
+
+    corpus = make_corpus(max(1, n_requests // 60 + 1))
+    states = [state for state, _ in corpus][:n_requests]
+    states = (states * (n_requests // len(states) + 1))[:n_requests]
+    next_request = iter(enumerate(states))
+    latencies = []
+    errors = [0]
+
+    async def client():
+        reader, writer = await open_connection(host, port, path)
+        try:
+            for request_id, state in next_request:
+                request = {'id': request_id, 'state': [state[0], state[1], state[2], int(state[3])], 'stream': stream}
+                if runtime is not None:
+                    request['time'] = runtime
+                else:
+                    request['max_iter'] = max_iter
+                start_time = time.perf_counter()
+                writer.write(json.dumps(request).encode() + b'\n')
+                await writer.drain()
+                while True:
+                    response = json.loads(await reader.readline())
+                    if response['id'] == request_id and response['type'] != 'snapshot':
+                        break
+                latencies.append(time.perf_counter() - start_time)
+                if response['type'] == 'error':
+                    errors[0] += 1
+        finally:
+            writer.close()
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start_time
+    return {'requests': len(latencies),
+            'errors': errors[0],
+            'elapsed': elapsed,
+            'throughput': len(latencies)/elapsed,
+            'mean_latency': sum(latencies)/len(latencies),
+            'p50_latency': percentile(latencies, 0.5),
+            'p99_latency': percentile(latencies, 0.99)}
+
+
+async def serve(host = '127.0.0.1', port = 8765, path = None, config = None, n_workers = None, queue_size = 64):
+    """
+    Runs an AnalysisServer until the task is cancelled.
+    """
+    server = AnalysisServer(config, n_workers, queue_size)
+    listening = await server.start(host, port, path)
+    print(f"listening on {path or '%s:%d' % listening.sockets[0].getsockname()[:2]} with {server.n_workers} workers")
+    try:
+        await listening.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(argv = None):
+    """
+    Command line entry point: python -m othello_MCTS.server {serve,load} [options].
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description = "Serves MCTS analyses of Othello positions, or load-tests a server.")
+    parser.add_argument('command', choices = ('serve', 'load'), help = "run a server, or a load test against one")
+    parser.add_argument('--host', default = '127.0.0.1', help = "address of the server (default 127.0.0.1)")
+    parser.add_argument('--port', type = int, default = 8765, help = "TCP port of the server (default 8765)")
+    parser.add_argument('--unix', metavar = 'PATH', help = "Unix socket of the server, instead of TCP")
+    parser.add_argument('--workers', type = int, default = None, help = "number of worker processes (serve)")
+    parser.add_argument('--queue', type = int, default = 64, help = "number of requests that can wait (serve, default 64)")
+    parser.add_argument('--config', default = None, help = "MCTS keyword arguments of the workers as JSON (serve)")
+    parser.add_argument('--requests', type = int, default = 200, help = "number of requests (load, default 200)")
+    parser.add_argument('--concurrency', type = int, default = 8, help = "number of connections (load, default 8)")
+    parser.add_argument('--max-iter', type = int, default = 200, help = "iterations of each search (load, default 200)")
+    parser.add_argument('--time', type = float, default = None, help = "seconds of each search instead of --max-iter (load)")
+    parser.add_argument('--stream', action = 'store_true', help = "ask for snapshots while searching (load)")
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        config = json.loads(args.config) if args.config else None
+        try:
+            asyncio.run(serve(args.host, args.port, args.unix, config, args.workers, args.queue))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    results = asyncio.run(load_test(args.host, args.port, args.unix, args.requests, args.concurrency,
+                                    args.max_iter, args.time, args.stream))
+    print(f"{results['requests']} requests ({results['errors']} errors) in {results['elapsed']:.2f}s: "
+          f"{results['throughput']:.1f} requests/s, latency mean {1000*results['mean_latency']:.1f} ms, "
+          f"p50 {1000*results['p50_latency']:.1f} ms, p99 {1000*results['p99_latency']:.1f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
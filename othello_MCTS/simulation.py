@@ -1,14 +1,16 @@
 
 from othello_MCTS.bitboard import Bitboard, display_bits_in_grid
 from othello_MCTS.MCTS import MCTS, Node
-import pygame
-import numpy as np
-from concurrent.futures import ProcessPoolExecutor
+from othello_MCTS.parallel import seed_worker, worker_mcts
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import json
+import os
+import time
 
 
 
 
-def play_match(player1,player2):
+def play_match(player1,player2, book = None, time_control = None):
     """
     Plays a single match where player1 starts and returns the winner.
 
@@ -18,6 +20,12 @@ def play_match(player1,player2):
         The first player of the match. Can be an instance of the MCTS class or a user input ('user').
     player2 : MCTS or 'user'
         The second player of the match. Can be an instance of the MCTS class or a user input ('user').
+    book : OpeningBook or str, optional
+        An opening book (or the path of its file) whose moves both players play while the position
+        is in it, without searching.
+    time_control : tuple, optional
+        (total time, increment) in seconds: each player gets a game clock, spent by a TimeManager
+        instead of its own search budget, and loses the match if the clock runs out.
 
 
     Returns:
@@ -29,23 +37,44 @@ def play_match(player1,player2):
             0 for a draw.
     """
     bitboard = Bitboard()
+    if isinstance(book, str):
+        from othello_MCTS.book import OpeningBook
+        book = OpeningBook(book)
+    clocks = {1: None, -1: None}
+    if time_control is not None:
+        from othello_MCTS.timemanager import TimeManager
+        clocks = {1: TimeManager(*time_control), -1: TimeManager(*time_control)}
+
+    def choose(player, side):
+        state = bitboard.get_state()
+        move = book.lookup(state) if book is not None else None
+        if move is not None:
+            return move
+        if clocks[side] is not None:
+            return clocks[side].choose(player, state)
+        return player.run_mcts(state)
 
     while bitboard.winner == None:
-        play = player1.run_mcts(bitboard.get_state())
+        play = choose(player1, 1)
+        if clocks[1] is not None and clocks[1].flagged:
+            return -1
         bitboard.play(play)
 
         if bitboard.winner != None:
             break
 
-        play = player2.run_mcts(bitboard.get_state())
+        play = choose(player2, -1)
+        if clocks[-1] is not None and clocks[-1].flagged:
+            return 1
         bitboard.play(play)
 
 
     return bitboard.winner
 
-def show_match(player1,player2):
+def show_match(player1,player2, ponder = True):
     """
-    Plays and displays a single match where player1 starts.
+    Plays and displays a single match where player1 starts. Needs pygame, which is only imported
+    by this function (see gui.show_match).
 
     Parameters:
     -----------
@@ -53,45 +82,18 @@ def show_match(player1,player2):
         The first player of the match. Can be an instance of the MCTS class or a user input ('user').
     player2 : MCTS or 'user'
         The second player of the match. Can be an instance of the MCTS class or a user input ('user').
-    """
-    width = 800
-    height = 800
-    pygame.init()
-
-    surface = pygame.display.set_mode((width,height))
-    bitboard = Bitboard()
-    bitboard.show(surface,width,height)
-    pygame.display.flip()
-
-    while bitboard.winner == None:
-        if player1 == 'user':
-            pygame.time.delay(500)
-            bitboard.user_move(surface,width,height)
-        else:
-            play = player1.run_mcts(bitboard.get_state())
-            bitboard.play(play)
-
-        bitboard.show(surface,width,height)
-        pygame.display.flip()
-        pygame.time.delay(100)
-
-        if bitboard.winner != None:
-            break
+    ponder : bool, optional
+        Whether an MCTS player searches during the turn of a user (default is True).
 
-        if player2 == 'user':
-            pygame.time.delay(500)
-            bitboard.user_move(surface,width,height)
-        else:
-            play = player2.run_mcts(bitboard.get_state())
-            bitboard.play(play)
-
-        bitboard.show(surface,width,height)
-        pygame.display.flip()
-        pygame.time.delay(100)
-
-    pygame.time.delay(5000)
+    Returns:
+    --------
+    int or None
+        The winner of the match (1 for player1, -1 for player2, 0 for a draw), None if the
+        window was closed before the end.
+    """
+    from othello_MCTS.gui import show_match
+    return show_match(player1, player2, ponder)
 
-    
 
 def play_single_match(player1, player2):
     """
@@ -115,6 +117,8 @@ def play_single_match(player1, player2):
                 Maximum runtime allowed for the simulation (in seconds, used only if cap_method == 'time').
             cap_method : str
                 Method to cap the simulation ('iter' or 'time').
+            rollout_backend : str
+                Rollout engine ('python' or 'numpy').
     player2 : dict
         Same as player1, but for player2.
 
@@ -131,9 +135,220 @@ def play_single_match(player1, player2):
 
 
 
-def tournament(players):
+def play_cached_match(player1, player2):
+    """
+    Plays a match in a worker process between the cached MCTS instances of two configurations.
+
+    The instances are built on their first game and reused afterwards, so their bitboard and tree
+    storage are kept from one game to the next.
+
+    Parameters:
+    -----------
+    player1 : dict
+        Configuration for player1.
+    player2 : dict
+        Configuration for player2.
+
+    Returns:
+    --------
+    tuple:
+        - winner (int): 1 for player1, -1 for player2, 0 for a draw.
+        - game_time (float): Time spent playing the game, in seconds.
+    """
+    start_time = time.perf_counter()
+    winner = play_match(worker_mcts(player1, seat = 1), worker_mcts(player2, seat = 2))
+    return winner, time.perf_counter() - start_time
+
+
+class TournamentEngine:
+    """
+    A long-lived pool of worker processes that keep their MCTS players between games.
+
+    Workers start and import the package once, then each one builds a player per configuration
+    on its first game and reuses it for all the following ones.
+
+    Attributes:
+    -----------
+    max_workers : int
+        Number of worker processes.
+    executor : ProcessPoolExecutor
+        The worker pool.
+    games : int
+        Number of games finished.
+    game_time : float
+        Total time spent by the workers playing games, in seconds.
+    start_time : float or None
+        time.perf_counter() of the first submitted game.
+
+    Methods:
+    --------
+    submit(player1, player2):
+        Schedules a game and returns its future.
+
+    stats():
+        Returns the throughput and dispatch overhead of the games played so far.
+
+    close():
+        Shuts down the worker pool.
+    """
+
+    def __init__(self, max_workers = None):
+        self.max_workers = max_workers or os.cpu_count()
+        self.executor = ProcessPoolExecutor(max_workers = self.max_workers, initializer = seed_worker)
+        self.games = 0
+        self.game_time = 0
+        self.start_time = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def submit(self, player1, player2):
+        """
+        Schedules a game between two player configurations.
+
+        Parameters:
+        -----------
+        player1 : dict
+            Configuration for player1.
+        player2 : dict
+            Configuration for player2.
+
+        Returns:
+        --------
+        Future
+            A future whose result is (winner, game_time).
+        """
+        if self.start_time is None:
+            self.start_time = time.perf_counter()
+        future = self.executor.submit(play_cached_match, player1, player2)
+        future.add_done_callback(self.record)
+        return future
+
+    def record(self, future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        self.games += 1
+        self.game_time += future.result()[1]
+
+    def stats(self):
+        """
+        Returns the throughput of the games finished so far.
+
+        The dispatch overhead is the worker time not spent inside a game (pickling, queues, idle
+        workers), averaged over the games.
+
+        Returns:
+        --------
+        dict
+            games, elapsed, games_per_hour, mean_game_time and dispatch_overhead (seconds per game).
+        """
+        elapsed = time.perf_counter() - self.start_time if self.start_time is not None else 0
+        games = max(self.games, 1)
+        return {'games': self.games,
+                'elapsed': elapsed,
+                'games_per_hour': 3600*self.games/elapsed if elapsed else 0,
+                'mean_game_time': self.game_time/games,
+                'dispatch_overhead': max(0, elapsed*self.max_workers - self.game_time)/games}
+
+    def close(self):
+        """
+        Shuts down the worker pool.
+        """
+        self.executor.shutdown()
+
+
+def read_results_log(log_path, players):
     """
-    Runs a tournament between multiple players, simulating 10 matches in parallel, and saves the results.
+    Reads the games already recorded in a tournament results log.
+
+    A last line cut by an interrupted run is removed from the file, so that the next games are
+    appended after the last complete record.
+
+    Parameters:
+    -----------
+    log_path : str
+        Path of the JSONL log. Its first line holds the player configurations, every other line one game.
+    players : list of dict
+        The player configurations of the tournament, which must match the ones of the log.
+
+    Returns:
+    --------
+    list of dict
+        The recorded games, with keys i, j, game and result. Empty if the log does not exist.
+    """
+    if not os.path.exists(log_path):
+        return []
+
+    games = []
+    with open(log_path, 'rb+') as log:
+        data = log.read()
+        # every record is written with its newline, so a last line without one was cut
+        if not data.endswith(b'\n'):
+            data = data[:data.rfind(b'\n') + 1]
+            log.truncate(len(data))
+    lines = data.decode().splitlines()
+    if not lines:
+        return []
+
+    if json.loads(lines[0]).get('players') != json.loads(json.dumps(players)):
+        raise ValueError(f"{log_path} was written for other players, remove it to start a new tournament")
+
+    for line in lines[1:]:
+        try:
+            games.append(json.loads(line))
+        except json.JSONDecodeError:
+            # a line cut by an interrupted run that older versions appended to
+            continue
+    return games
+
+
+def save_results(wins_player1, wins_player2, draws):
+    """
+    Saves the tournament matrices in `.npy` and `.txt` formats.
+    """
+    import numpy as np
+
+    np.save('wins_player1.npy', wins_player1)
+    np.savetxt('wins_player1.txt', wins_player1)
+    np.save('wins_player2.npy', wins_player2)
+    np.savetxt('wins_player2.txt', wins_player2)
+    np.save('draws.npy', draws)
+    np.savetxt('draws.txt', draws)
+
+
+def save_pair_status(tests, n_players):
+    """
+    Saves the number of games of every pair in `.npy` and `.txt` formats, and the state of
+    their sequential tests in `pair_status.json`.
+
+    Parameters:
+    -----------
+    tests : dict
+        The PairTest of every ordered pair (i, j).
+    n_players : int
+        Number of players of the tournament.
+    """
+    import numpy as np
+
+    games_played = np.zeros((n_players, n_players))
+    status = []
+    for (i, j), test in tests.items():
+        games_played[i, j] = test.games
+        status.append({'i': i, 'j': j, 'games': test.games, 'llr': test.llr(), 'reason': test.status()})
+
+    np.save('games_played.npy', games_played)
+    np.savetxt('games_played.txt', games_played)
+    with open('pair_status.json', 'w') as file:
+        json.dump(status, file, indent = 1)
+
+
+def tournament(players, games_per_pair = 10, max_workers = None, log_path = 'tournament_results.jsonl', engine = None,
+               adaptive = False, min_games = 4, max_games = None, elo_margin = 20, alpha = 0.05, beta = 0.05):
+    """
+    Runs a tournament between multiple players in parallel, and saves the results as games finish.
 
     Parameters:
     -----------
@@ -153,47 +368,144 @@ def tournament(players):
                 Maximum runtime allowed for the simulation (in seconds, used only if cap_method == 'time').
             cap_method : str
                 Method to cap the simulation ('iter' or 'time').
+            rollout_backend : str
+                Rollout engine ('python' or 'numpy').
+    games_per_pair : int, optional
+        Number of games played by each ordered pair of players (default is 10). With adaptive=True,
+        the tournament plays at most as many games in total, shared between the pairs by their tests.
+    max_workers : int, optional
+        Number of worker processes (default is the number of CPUs).
+    log_path : str, optional
+        JSONL file where every finished game is appended (default is 'tournament_results.jsonl').
+    engine : TournamentEngine, optional
+        A running engine whose warm workers play the games. By default an engine with max_workers
+        workers is started for this tournament and closed at the end.
+    adaptive : bool, optional
+        If True, each pair stops as soon as a sequential probability ratio test decides which player
+        is stronger, and its remaining games go to the undecided pairs (default is False).
+    min_games : int, optional
+        Number of games of a pair before its test can stop it (default is 4, used only if adaptive).
+    max_games : int, optional
+        Maximum number of games of a pair, which can exceed games_per_pair as the games saved on the
+        decided pairs go to the undecided ones (default is 4*games_per_pair, used only if adaptive).
+    elo_margin : float, optional
+        The test decides between "player1 is stronger by elo_margin" and "player2 is stronger by
+        elo_margin" (default is 20, used only if adaptive).
+    alpha : float, optional
+        Probability of declaring player1 stronger when player2 is (default is 0.05, used only if adaptive).
+    beta : float, optional
+        Probability of declaring player2 stronger when player1 is (default is 0.05, used only if adaptive).
 
     Returns:
     --------
-    None
+    dict
+        The engine stats (see TournamentEngine.stats) once the tournament is over.
 
     Notes:
     ------
-    - Simulates 10 matches between each ordered pair of players in the list, meaning each player gets to be player1 and player2 against every other player.
+    - Without adaptive, every (player1, player2, game) job is submitted at once and results are consumed
+      as they complete, so workers never wait for the other games of a pair.
+    - With adaptive, only two games per worker are in flight. Each new game goes to the undecided pair
+      with the fewest games, and the queued games of a pair are cancelled once its test decides. The
+      tournament ends when every pair is decided or has played max_games games, or once
+      len(players)**2*games_per_pair games are played.
+    - Each finished game is appended to `log_path`. If the log already exists, the games it records are
+      not played again, so an interrupted tournament resumes where it stopped.
     - Aggregates the results as:
         - `wins_player1[i, j]`: Number of wins for player1 when matched against player2.
         - `wins_player2[i, j]`: Number of wins for player2 when matched against player1.
         - `draws[i, j]`: Number of matches that ended in a draw between player1 and player2.
-    - Saves results in both `.npy` (binary) and `.txt` (readable) formats:
+        - `games_played[i, j]`: Number of games played between player1 and player2 (adaptive only).
+    - Saves results in both `.npy` (binary) and `.txt` (readable) formats after every game:
         - `wins_player1.npy` / `wins_player1.txt`
         - `wins_player2.npy` / `wins_player2.txt`
         - `draws.npy` / `draws.txt`
+        - `games_played.npy` / `games_played.txt` (adaptive only)
+    - With adaptive, saves in `pair_status.json` the number of games, log-likelihood ratio and stopping reason of every
+      pair: 'player1' or 'player2' when the test decided which one is stronger, 'max_games' when the
+      pair played max_games games, null while it is still running or when the budget ran out.
     """
+    import numpy as np
+    from othello_MCTS.sprt import PairTest
+
     wins_player1 = np.zeros((len(players), len(players)))
     wins_player2 = np.zeros((len(players), len(players)))
     draws = np.zeros((len(players), len(players)))
-
-    # Use ProcessPoolExecutor for parallel execution
-    with ProcessPoolExecutor() as executor:
-        for i, player1 in enumerate(players):
-            for j, player2 in enumerate(players):
-                # Run 10 matches in parallel
-                futures = [executor.submit(play_single_match, player1, player2) for _ in range(10)]
-                results = [future.result() for future in futures]
-                # Aggregate results
-                wins_player1[i, j] = results.count(1)  # Player 1 wins
-                wins_player2[i, j] = results.count(-1)  # Player 2 wins
-                draws[i,j] = results.count(0)
-
-
-
-                print(f"{i * len(players) + j + 1} out of {len(players) ** 2}")
-
-    # Save results
-    np.save('wins_player1.npy', wins_player1)
-    np.savetxt('wins_player1.txt', wins_player1)
-    np.save('wins_player2.npy', wins_player2)
-    np.savetxt('wins_player2.txt', wins_player2)
-    np.save('draws.npy', draws)
-    np.savetxt('draws.txt', draws)
\ No newline at end of file
+    total = len(players)**2 * games_per_pair
+    if not adaptive:
+        max_games = games_per_pair
+    elif max_games is None:
+        max_games = 4*games_per_pair
+    tests = {(i, j): PairTest(max_games, min_games, elo_margin, alpha, beta, sequential = adaptive)
+             for i in range(len(players)) for j in range(len(players))}
+
+    def record(game):
+        i, j, result = game['i'], game['j'], game['result']
+        if result == 1:
+            wins_player1[i, j] += 1
+        elif result == -1:
+            wins_player2[i, j] += 1
+        else:
+            draws[i, j] += 1
+        tests[(i, j)].add(result)
+
+    done = set()
+    for game in read_results_log(log_path, players):
+        done.add((game['i'], game['j'], game['game']))
+        record(game)
+
+    pending = {pair: [game for game in range(max_games) if (*pair, game) not in done] for pair in tests}
+    new_log = not os.path.exists(log_path) or os.path.getsize(log_path) == 0
+    save_results(wins_player1, wins_player2, draws)
+    if adaptive:
+        save_pair_status(tests, len(players))
+
+    own_engine = engine is None
+    if own_engine:
+        engine = TournamentEngine(max_workers)
+    max_in_flight = 2*engine.max_workers if adaptive else total
+    futures = {}
+
+    def schedule():
+        while len(futures) < max_in_flight and len(done) + len(futures) < total:
+            open_pairs = [pair for pair in tests if pending[pair] and tests[pair].status() is None]
+            if not open_pairs:
+                return
+            i, j = min(open_pairs, key=lambda pair: max_games - len(pending[pair]))
+            futures[engine.submit(players[i], players[j])] = (i, j, pending[(i, j)].pop(0))
+
+    with open(log_path, 'a') as log:
+        if new_log:
+            log.write(json.dumps({'players': players}) + '\n')
+            log.flush()
+
+        schedule()
+        while futures:
+            finished, _ = wait(futures, return_when = FIRST_COMPLETED)
+            for future in finished:
+                i, j, game = futures.pop(future)
+                if future.cancelled():
+                    continue
+                game = {'i': i, 'j': j, 'game': game, 'result': future.result()[0]}
+                log.write(json.dumps(game) + '\n')
+                log.flush()
+                record(game)
+                done.add((i, j, game['game']))
+
+                if tests[(i, j)].status() is not None:
+                    for queued, job in list(futures.items()):
+                        if job[:2] == (i, j) and queued.cancel():
+                            del futures[queued]
+
+            save_results(wins_player1, wins_player2, draws)
+            if adaptive:
+                save_pair_status(tests, len(players))
+            print(f"{len(done)} out of {total}")
+            schedule()
+
+    stats = engine.stats()
+    if own_engine:
+        engine.close()
+    print(f"{stats['games']} games, {stats['games_per_hour']:.0f} games/hour, "
+          f"{stats['mean_game_time']:.3f}s per game, {stats['dispatch_overhead']:.3f}s dispatch overhead per game")
+    return stats
@@ -0,0 +1,149 @@
+from math import log
+
+
+def elo_to_score(elo):
+    """
+    Converts an Elo difference to the expected score of the stronger side.
+
+    Parameters:
+    -----------
+    elo : float
+        Elo difference.
+
+    Returns:
+    --------
+    float
+        Expected score per game, between 0 and 1.
+    """
+    return 1/(1 + 10**(-elo/400))
+
+
+def log_likelihood_ratio(wins, draws, losses, elo0, elo1):
+    """
+    Computes the log-likelihood ratio of H1 (Elo difference elo1) against H0 (Elo difference elo0)
+    with the normal approximation of the game scores used by generalized SPRT.
+
+    Parameters:
+    -----------
+    wins : int
+        Number of wins of the tested side.
+    draws : int
+        Number of draws.
+    losses : int
+        Number of losses of the tested side.
+    elo0 : float
+        Elo difference under H0.
+    elo1 : float
+        Elo difference under H1.
+
+    Returns:
+    --------
+    float
+        The log-likelihood ratio, positive when the results favour H1.
+    """
+    n = wins + draws + losses
+    if n == 0:
+        return 0.0
+
+    mean = (wins + draws/2)/n
+    # floor the variance so that a few games with the same result do not give an infinite ratio
+    variance = max((wins*(1 - mean)**2 + draws*(0.5 - mean)**2 + losses*mean**2)/n, 0.01)
+    score0 = elo_to_score(elo0)
+    score1 = elo_to_score(elo1)
+    return n*(score1 - score0)*(2*mean - score0 - score1)/(2*variance)
+
+
+class PairTest:
+    """
+    Sequential test of the results of one pairing, deciding between "player1 is stronger by
+    elo_margin" and "player2 is stronger by elo_margin".
+
+    Attributes:
+    -----------
+    wins : int
+        Number of wins of player1.
+    draws : int
+        Number of draws.
+    losses : int
+        Number of wins of player2.
+    elo_margin : float
+        Elo difference of the two hypotheses (H0: -elo_margin, H1: +elo_margin).
+    lower : float
+        Log-likelihood ratio under which player2 is declared stronger.
+    upper : float
+        Log-likelihood ratio over which player1 is declared stronger.
+    min_games : int
+        Number of games played before the test can stop.
+    max_games : int
+        Number of games after which the pairing stops undecided.
+    sequential : bool
+        False to only stop at max_games.
+
+    Methods:
+    --------
+    add(result):
+        Records the result of a game.
+
+    llr():
+        Returns the current log-likelihood ratio.
+
+    status():
+        Returns the stopping reason, or None while more games are needed.
+    """
+
+    def __init__(self, max_games, min_games = 4, elo_margin = 20, alpha = 0.05, beta = 0.05, sequential = True):
+        self.wins = 0
+        self.draws = 0
+        self.losses = 0
+        self.elo_margin = elo_margin
+        self.lower = log(beta/(1 - alpha))
+        self.upper = log((1 - beta)/alpha)
+        self.min_games = min_games
+        self.max_games = max_games
+        self.sequential = sequential
+
+    @property
+    def games(self):
+        return self.wins + self.draws + self.losses
+
+    def add(self, result):
+        """
+        Records the result of a game.
+
+        Parameters:
+        -----------
+        result : int
+            1 if player1 won, -1 if player2 won, 0 for a draw.
+        """
+        if result == 1:
+            self.wins += 1
+        elif result == -1:
+            self.losses += 1
+        else:
+            self.draws += 1
+
+    def llr(self):
+        """
+        Returns the log-likelihood ratio of "player1 stronger" against "player2 stronger".
+        """
+        return log_likelihood_ratio(self.wins, self.draws, self.losses, -self.elo_margin, self.elo_margin)
+
+    def status(self):
+        """
+        Returns why the pairing stopped.
+
+        Returns:
+        --------
+        str or None
+            'player1' or 'player2' when the test decided which one is stronger, 'max_games' when
+            the pairing reached max_games, None while more games are needed.
+        """
+        if self.sequential and self.games >= self.min_games:
+            llr = self.llr()
+            if llr >= self.upper:
+                return 'player1'
+            if llr <= self.lower:
+                return 'player2'
+        if self.games >= self.max_games:
+            return 'max_games'
+        return None
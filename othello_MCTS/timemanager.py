@@ -0,0 +1,192 @@
+from othello_MCTS.anytime import CancellationToken
+from othello_MCTS.bitboard import Bitboard
+import time
+
+
+class TimeManager:
+    """
+    Spends a game clock (total time plus an increment per move) over the moves of a player.
+
+    The time of a move is planned from the clock: the remaining time, less a reserve, is shared
+    between the moves the player has left (half the empty squares), the increment is added, and
+    the share is scaled by the number of legal moves (a position with many choices gets more
+    than one with few). The search runs as an anytime search with this budget times
+    max_extension as hard limit, and is stopped at the planned time unless the search is
+    unstable: the best move changed since the middle of the budget, or the two best root
+    children are within close_margin of each other. A forced move is played at once.
+
+    Attributes:
+    -----------
+    total_time : float
+        The clock of a game, in seconds.
+    increment : float
+        Time added to the clock after each move, in seconds.
+    reserve : float
+        Share of total_time never planned, against overheads.
+    max_extension : float
+        Factor of the planned time that an unstable search may use.
+    close_margin : float
+        Relative gap of accumulated value under which the two best root children count as close.
+    remaining : float
+        Time left on the clock.
+    flagged : bool
+        Whether the clock ran out.
+    last_budget : float
+        Planned time of the last move.
+    last_time : float
+        Time used by the last move.
+    extensions : int
+        Number of moves of the game whose search was extended.
+
+    Methods:
+    --------
+    reset():
+        Restarts the clock for a new game.
+
+    budget(bitboard):
+        Returns the planned and the maximum time of a move.
+
+    choose(mcts, state):
+        Searches a state within the clock and returns the move.
+    """
+
+    def __init__(self, total_time = 60, increment = 0, reserve = 0.02, max_extension = 2, close_margin = 0.05):
+        self.total_time = total_time
+        self.increment = increment
+        self.reserve = reserve
+        self.max_extension = max_extension
+        self.close_margin = close_margin
+        self.bitboard = Bitboard()
+        self.reset()
+
+    def reset(self):
+        """
+        Restarts the clock for a new game.
+        """
+        self.remaining = self.total_time
+        self.flagged = False
+        self.last_budget = 0
+        self.last_time = 0
+        self.extensions = 0
+        self.last_empties = 65
+
+    def budget(self, bitboard):
+        """
+        Plans the time of a move.
+
+        Parameters:
+        -----------
+        bitboard : Bitboard
+            The position, with the player of this clock to move.
+
+        Returns:
+        --------
+        tuple:
+            - planned (float): The time to spend if the search is stable, in seconds.
+            - maximum (float): The time an unstable search may use, in seconds.
+        """
+        empties = bin(bitboard.in_board_mask & ~(bitboard.player_bitboards[1] | bitboard.player_bitboards[-1])).count('1')
+        n_moves = bin(bitboard.get_move_mask()).count('1')
+        available = max(0.0, self.remaining - self.reserve*self.total_time)
+        moves_to_go = max(1, (empties + 1) // 2)
+
+        planned = available/moves_to_go + self.increment
+        planned *= min(max(n_moves/8, 0.5), 1.5)
+        maximum = min(available, planned*self.max_extension)
+        return min(planned, maximum), maximum
+
+    def choose(self, mcts, state):
+        """
+        Searches a state within the clock, and charges the time used to it.
+
+        A state with more empty squares than the previous one starts a new game and resets the
+        clock. The search budget of the instance (cap_method, runtime) is replaced by the planned
+        time during the search.
+
+        Parameters:
+        -----------
+        mcts : MCTS
+            The searching player.
+        state : tuple
+            The state to search, with the player of this clock to move.
+
+        Returns:
+        --------
+        int
+            The move to play.
+        """
+        start_time = time.time()
+        bitboard = self.bitboard
+        bitboard.set_state(state)
+        empties = bin(bitboard.in_board_mask & ~(state[0] | state[1])).count('1')
+        if empties > self.last_empties:
+            self.reset()
+        self.last_empties = empties
+
+        moves = bitboard.get_move_mask()
+        if not moves & (moves - 1):
+            self.last_budget = 0
+            move = moves.bit_length() - 1
+        else:
+            planned, maximum = self.budget(bitboard)
+            self.last_budget = planned
+            move = self.search(mcts, state, start_time, planned, maximum)
+
+        self.last_time = time.time() - start_time
+        self.remaining -= self.last_time
+        if self.remaining < 0:
+            self.flagged = True
+        self.remaining += self.increment
+        return move
+
+    def search(self, mcts, state, start_time, planned, maximum):
+        """
+        Runs the anytime search of a move, stopped at the planned time when it is stable and at
+        the maximum time otherwise.
+
+        Returns:
+        --------
+        int
+            The move to play.
+        """
+        saved = mcts.cap_method, mcts.max_runtime, mcts.time_manager
+        mcts.cap_method, mcts.max_runtime, mcts.time_manager = 'time', max(maximum - (time.time() - start_time), 0.001), None
+        token = CancellationToken()
+        middle_move = None
+        extended = False
+        try:
+            for snapshot in mcts.search(state, interval = max(planned/8, 0.001), token = token):
+                if snapshot.done:
+                    return snapshot.best_move
+                elapsed = time.time() - start_time
+                if elapsed < planned/2 or extended:
+                    continue
+                if middle_move is None:
+                    middle_move = snapshot.best_move
+                if elapsed < planned:
+                    continue
+
+                if self.unstable(snapshot, middle_move):
+                    extended = True
+                    self.extensions += 1
+                else:
+                    token.cancel()
+        finally:
+            mcts.cap_method, mcts.max_runtime, mcts.time_manager = saved
+
+    def unstable(self, snapshot, middle_move):
+        """
+        Returns True if the search should go on: the best move is not the one of the middle of
+        the budget, or the two best root children are close.
+
+        Parameters:
+        -----------
+        snapshot : Snapshot
+            The search at the planned time.
+        middle_move : int or None
+            The best move at the middle of the planned time.
+        """
+        if snapshot.best_move != middle_move:
+            return True
+        values = sorted((n_visits*value for _, n_visits, value in snapshot.children), reverse = True)
+        return len(values) > 1 and values[0] - values[1] < self.close_margin*values[0]
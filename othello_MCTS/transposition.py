@@ -0,0 +1,107 @@
+from collections import OrderedDict
+from itertools import islice
+
+
+class TranspositionTable:
+    """
+    A bounded table of node statistics keyed by Zobrist hash, shared by every node of the same position.
+
+    Each entry is a list [n_visits, value]. Nodes reached by different move orders get the same
+    entry, so rollouts made in one subtree are seen by all the transpositions of a position.
+
+    Attributes:
+    -----------
+    ENTRY_BYTES : int
+        Estimated memory used by one entry (dict slot, key and stats list).
+    DEPTH_SAMPLE : int
+        Number of old entries compared by the 'depth' policy.
+    max_entries : int
+        Maximum number of entries, derived from the memory cap given in megabytes.
+    replacement : str
+        Replacement policy when the table is full: 'lru' evicts the least recently used entry,
+        'depth' evicts the entry with the fewest visits among the DEPTH_SAMPLE least recently used.
+    entries : OrderedDict
+        The entries, from least to most recently used.
+    main_player : int or None
+        The player the stored values are relative to.
+    hits : int
+        Number of lookups that found an entry.
+    misses : int
+        Number of lookups that created a new entry.
+
+    Methods:
+    --------
+    lookup(key):
+        Returns the entry of a position, creating it if needed.
+
+    evict():
+        Removes one entry according to the replacement policy.
+
+    clear():
+        Removes every entry.
+    """
+    ENTRY_BYTES = 256
+    DEPTH_SAMPLE = 8
+
+    def __init__(self, memory_cap = 64, replacement = 'lru'):
+        if replacement not in ('lru', 'depth'):
+            raise ValueError(f"unknown replacement policy {replacement!r}, expected 'lru' or 'depth'")
+
+        self.max_entries = max(1, int(memory_cap * 2**20) // self.ENTRY_BYTES)
+        self.replacement = replacement
+        self.entries = OrderedDict()
+        self.main_player = None
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookup(self, key):
+        """
+        Returns the entry of a position, creating it if needed.
+
+        Parameters:
+        -----------
+        key : int
+            Zobrist hash of the position.
+
+        Returns:
+        --------
+        tuple:
+            - entry (list): The [n_visits, value] statistics of the position.
+            - hit (bool): True if the entry was already in the table.
+        """
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry, True
+
+        self.misses += 1
+        if len(self.entries) >= self.max_entries:
+            self.evict()
+        entry = [0, 0]
+        self.entries[key] = entry
+        return entry, False
+
+    def evict(self):
+        """
+        Removes one entry according to the replacement policy.
+        """
+        if self.replacement == 'lru':
+            self.entries.popitem(last=False)
+            return
+
+        oldest = islice(self.entries.items(), self.DEPTH_SAMPLE)
+        key = min(oldest, key=lambda item: item[1][0])[0]
+        del self.entries[key]
+
+    def clear(self):
+        """
+        Removes every entry and resets the counters.
+        """
+        self.entries.clear()
+        self.main_player = None
+        self.hits = 0
+        self.misses = 0
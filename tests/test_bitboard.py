@@ -0,0 +1,132 @@
+import random
+
+import pytest
+
+from othello_MCTS import Bitboard
+from othello_MCTS.bitboard import (IN_BOARD_MASK, SYMMETRY_INVERSES, canonical_key, flip_mask, legal_moves,
+                                   symmetric_images, transform, zobrist_hash)
+from othello_MCTS.perft import KNOWN_COUNTS, perft
+
+DIRECTIONS = [(dj, dr) for dj in (-1, 0, 1) for dr in (-1, 0, 1) if (dj, dr) != (0, 0)]
+
+
+def reference_flips(j, r, player, ennemy):
+    """
+    Flips of a move at column j, row r, found by walking the board square by square.
+    """
+    flips = 0
+    for dj, dr in DIRECTIONS:
+        line = 0
+        cj, cr = j + dj, r + dr
+        while 0 <= cj < 8 and 0 <= cr < 8 and (ennemy >> 9*cj + cr) & 1:
+            line |= 1 << 9*cj + cr
+            cj, cr = cj + dj, cr + dr
+        if line and 0 <= cj < 8 and 0 <= cr < 8 and (player >> 9*cj + cr) & 1:
+            flips |= line
+    return flips
+
+
+def reference_moves(player, ennemy):
+    moves = 0
+    for j in range(8):
+        for r in range(8):
+            square = 1 << 9*j + r
+            if not (player | ennemy) & square and reference_flips(j, r, player, ennemy):
+                moves |= square
+    return moves
+
+
+def random_states(n_games, seed = 0):
+    """
+    Yields the state of every position of seeded random games.
+    """
+    random.seed(seed)
+    for _ in range(n_games):
+        bitboard = Bitboard()
+        while bitboard.winner is None:
+            yield bitboard.get_state()
+            bitboard.play(72)
+
+
+def test_move_generator_matches_the_reference():
+    for player, ennemy, _, _ in random_states(40):
+        moves = legal_moves(player, ennemy)
+        assert moves == reference_moves(player, ennemy)
+        while moves:
+            position = (moves & -moves).bit_length() - 1
+            moves &= moves - 1
+            assert flip_mask(position, player, ennemy) == reference_flips(position // 9, position % 9, player, ennemy)
+
+
+@pytest.mark.parametrize('depth', range(1, 7))
+def test_perft_counts(depth):
+    assert perft(Bitboard(), depth) == KNOWN_COUNTS[depth]
+
+
+def snapshot(bitboard):
+    return (bitboard.player_bitboards[1], bitboard.player_bitboards[-1], bitboard.turn, bitboard.passed,
+            bitboard.winner, bitboard.moves, bitboard.hash)
+
+
+def test_unmake_restores_the_position():
+    random.seed(1)
+    passes = 0
+    for _ in range(30):
+        bitboard = Bitboard()
+        bitboard.set_hashing(True)
+        start = snapshot(bitboard)
+        first_token = bitboard.get_undo_token()
+        while bitboard.winner is None:
+            moves = bitboard.get_move_mask()
+            before = snapshot(bitboard)
+            position = random.choice([i for i in range(72) if (moves >> i) & 1])
+            undo_token = bitboard.make_move(position)
+            after = snapshot(bitboard)
+            passes += bitboard.passed and bitboard.winner is None
+
+            bitboard.unmake(undo_token)
+            assert snapshot(bitboard) == before
+            bitboard.play(position)
+            assert snapshot(bitboard) == after
+
+        bitboard.unmake(first_token)
+        assert snapshot(bitboard) == start
+    assert passes
+
+
+def test_incremental_hash_matches_the_full_hash():
+    random.seed(2)
+    for _ in range(30):
+        bitboard = Bitboard()
+        bitboard.set_hashing(True)
+        while bitboard.winner is None:
+            bitboard.play(72)
+            assert bitboard.hash == zobrist_hash(bitboard.player_bitboards[1], bitboard.player_bitboards[-1], bitboard.turn)
+
+
+def test_transform_moves_squares():
+    for j in range(8):
+        for r in range(8):
+            images = [(j, r), (7-j, r), (j, 7-r), (7-j, 7-r), (r, j), (7-r, j), (r, 7-j), (7-r, 7-j)]
+            for symmetry, (image_j, image_r) in enumerate(images):
+                assert transform(1 << 9*j + r, symmetry) == 1 << 9*image_j + image_r
+
+
+def test_symmetries_are_undone_by_their_inverses():
+    for player, ennemy, _, _ in random_states(5):
+        for bitboard in (player, ennemy):
+            images = symmetric_images(bitboard)
+            for symmetry in range(8):
+                assert images[symmetry] == transform(bitboard, symmetry)
+                assert images[symmetry] & ~IN_BOARD_MASK == 0
+                assert transform(images[symmetry], SYMMETRY_INVERSES[symmetry]) == bitboard
+            assert transform(legal_moves(player, ennemy), 5) == legal_moves(transform(player, 5), transform(ennemy, 5))
+
+
+def test_canonical_key_is_shared_by_every_image():
+    for player1, player2, turn, _ in random_states(5, seed = 3):
+        key, symmetry = canonical_key(player1, player2, turn)
+        image1, image2 = transform(player1, symmetry), transform(player2, symmetry)
+        assert key == zobrist_hash(image1, image2, turn)
+        for other in range(8):
+            assert canonical_key(transform(player1, other), transform(player2, other), turn)[0] == key
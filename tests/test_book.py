@@ -0,0 +1,52 @@
+from othello_MCTS import Bitboard
+from othello_MCTS import book
+from othello_MCTS.book import OpeningBook, book_positions
+
+
+def write_book(path, plies):
+    """
+    Writes a book of the first plies whose move is the lowest legal move of each position.
+    """
+    positions = book_positions(plies)
+    bitboard = Bitboard()
+    records = {}
+    for key, state in positions.items():
+        bitboard.set_state(state)
+        moves = bitboard.get_move_mask()
+        records[key] = ((moves & -moves).bit_length() - 1, 1, 0.5)
+    max_discs = max(bin(state[0] | state[1]).count('1') for state in positions.values())
+    OpeningBook.write(path, records, max_discs)
+    return max_discs
+
+
+def test_lookup_skips_positions_past_the_book(tmp_path, monkeypatch):
+    path = str(tmp_path/'opening.book')
+    assert write_book(path, 2) == 5
+    opening_book = OpeningBook(path)
+
+    bitboard = Bitboard()
+    bitboard.play(bitboard.get_move_mask().bit_length() - 1)
+    move = opening_book.lookup(bitboard.get_state())
+    assert move is not None and (bitboard.get_move_mask() >> move) & 1
+
+    calls = []
+    canonical_key = book.canonical_key
+    monkeypatch.setattr(book, 'canonical_key', lambda *args: calls.append(args) or canonical_key(*args))
+    bitboard.play(move)
+    assert opening_book.lookup(bitboard.get_state()) is None
+    assert not calls
+    opening_book.close()
+
+
+def test_old_books_are_still_read(tmp_path):
+    path = str(tmp_path/'old.book')
+    write_book(path, 1)
+    with open(path, 'rb') as file:
+        data = file.read()
+    with open(path, 'wb') as file:
+        file.write(OpeningBook.OLD_MAGIC + data[len(OpeningBook.MAGIC) + OpeningBook.HEADER.size:])
+
+    opening_book = OpeningBook(path)
+    assert opening_book.lookup(Bitboard().get_state()) is not None
+    assert opening_book.max_discs == 64
+    opening_book.close()
@@ -0,0 +1,77 @@
+import random
+
+import pytest
+
+from othello_MCTS import Bitboard, MCTS
+
+
+def play_against_random(mcts, seed = 1):
+    """
+    Plays a game where mcts is player 1 and player 2 plays random moves, and returns the number
+    of searches of mcts and how many of them reused the previous tree.
+    """
+    random.seed(seed)
+    bitboard = Bitboard()
+    searches = 0
+    reused = 0
+    while bitboard.winner is None:
+        if bitboard.turn == 1:
+            bitboard.play(mcts.run_mcts(bitboard.get_state()))
+            searches += 1
+            reused += mcts.reused_visits > 0
+        else:
+            bitboard.play(72)
+    return searches, reused
+
+
+def test_tree_reuse_with_endgame_solver():
+    searches, reused = play_against_random(MCTS(max_iter = 200, selection_method = 'uct', endgame_threshold = 8, seed = 1))
+    assert reused > searches // 2
+
+
+def test_endgame_leaves_are_solved_once():
+    random.seed(2)
+    bitboard = Bitboard()
+    while bitboard.winner is None and bin(bitboard.player_bitboards[1] | bitboard.player_bitboards[-1]).count('1') < 55:
+        bitboard.play(72)
+    mcts = MCTS(selection_method = 'uct', endgame_threshold = 8, seed = 1)
+    calls = []
+    solve = mcts.endgame.solve
+    mcts.endgame.solve = lambda *args: calls.append(args) or solve(*args)
+
+    mcts.set_root(bitboard.get_state(), bitboard.turn)
+    for _ in range(100):
+        n_calls = len(calls)
+        mcts.iterate()
+        assert len(calls) - n_calls <= 1
+    assert calls
+
+
+def test_tree_reuse_is_off_with_tree_parallelism():
+    assert not MCTS(parallel = 'tree').reuse_tree
+    assert MCTS(parallel = 'leaf').reuse_tree
+    with pytest.raises(ValueError, match = 'reuse_tree'):
+        MCTS(parallel = 'tree', reuse_tree = True)
+
+
+@pytest.mark.parametrize('backend', ['object', 'array'])
+def test_node_count_includes_the_reused_subtree(backend):
+    random.seed(3)
+    mcts = MCTS(max_iter = 200, selection_method = 'uct', tree_backend = backend, seed = 3)
+    bitboard = Bitboard()
+    reused = 0
+    while bitboard.winner is None:
+        if bitboard.turn == 1:
+            bitboard.play(mcts.run_mcts(bitboard.get_state()))
+            if backend == 'array':
+                size = mcts.tree.size
+            else:
+                size, nodes = 0, [mcts.root]
+                while nodes:
+                    size += 1
+                    nodes.extend(nodes.pop().children.values())
+            assert mcts.node_count == size
+            reused += mcts.reused_nodes > 1
+        else:
+            bitboard.play(72)
+    assert reused
@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from othello_MCTS import Bitboard, MCTS
+from othello_MCTS.node_store import NodeStore
+
+
+def test_bytes_per_node():
+    store = NodeStore(chunk_size = 8)
+    assert store.bytes_per_node == 1 + 4 + 4 + 1 + 8 + 8
+    assert store.nbytes == 8*store.bytes_per_node
+
+
+def test_growth_past_chunk_size():
+    store = NodeStore(chunk_size = 4)
+    store.add_children(0, [10, 11, 12])
+    store.back_propagate(2, 1.5, 2)
+    store.add_children(2, [20, 21, 22, 23, 24, 25])
+    assert store.capacity >= store.size == 10
+    assert [store.move[child] for child in store.children(0)] == [10, 11, 12]
+    assert [store.move[child] for child in store.children(2)] == [20, 21, 22, 23, 24, 25]
+    assert all(store.parent[child] == 2 for child in store.children(2))
+    assert (store.n_visits[2], store.value[2], store.n_visits[0]) == (2, 1.5, 2)
+
+
+def test_reroot_keeps_the_subtree():
+    store = NodeStore(chunk_size = 4)
+    store.add_children(0, [10, 11])
+    store.add_children(1, [20, 21])
+    store.add_children(3, [30])
+    store.add_children(2, [40])
+    for node, value in ((3, 1.0), (4, 0.0), (5, 0.5), (6, 1.0)):
+        store.back_propagate(node, value, 1)
+
+    subtree = store.reroot(1)
+
+    def stats(node):
+        return [(subtree.move[child], subtree.n_visits[child], subtree.value[child]) for child in subtree.children(node)]
+
+    assert subtree.size == 4
+    assert (subtree.n_visits[0], subtree.value[0]) == (store.n_visits[1], store.value[1]) == (3, 1.5)
+    assert stats(0) == [(20, 2, 1.5), (21, 1, 0.0)]
+    assert stats(subtree.first_child[0]) == [(30, 1, 0.5)]
+    assert stats(subtree.first_child[0] + 1) == []
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_array_backend_searches_like_the_object_backend(seed):
+    random.seed(100 + seed)
+    bitboard = Bitboard()
+    for _ in range(3*seed):
+        bitboard.play(72)
+    state = bitboard.get_state()
+
+    searches = []
+    for backend in ('object', 'array'):
+        random.seed(seed)
+        mcts = MCTS(max_iter = 200, selection_method = 'uct', tree_backend = backend, seed = seed)
+        move = mcts.run_mcts(state)
+        searches.append((move, sorted(mcts.root_statistics())))
+    assert searches[0] == searches[1]
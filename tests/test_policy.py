@@ -0,0 +1,23 @@
+import pytest
+
+from othello_MCTS.bitboard import CORNERS
+from othello_MCTS.policy import CornerPolicy, RolloutPolicy
+
+
+def test_rollout_policy_is_abstract():
+    with pytest.raises(TypeError):
+        RolloutPolicy()
+
+    class Incomplete(RolloutPolicy):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_corner_policy_takes_corners():
+    class Board:
+        def get_move_mask(self):
+            return CORNERS & -CORNERS | 1 << 9*3 + 2
+
+    assert CornerPolicy().choose(Board()) == (CORNERS & -CORNERS).bit_length() - 1
@@ -0,0 +1,67 @@
+import asyncio
+import json
+import random
+import time
+
+import pytest
+
+from othello_MCTS import Bitboard
+from othello_MCTS.bitboard import legal_moves
+from othello_MCTS.server import AnalysisServer, parse_request
+
+
+def passing_state(seed = 3):
+    """
+    Returns a state of a random game whose player to move has no legal move but the opponent has.
+    """
+    random.seed(seed)
+    while True:
+        bitboard = Bitboard()
+        while bitboard.winner is None:
+            bitboard.play(72)
+            player, opponent, turn, _ = bitboard.get_state()
+            if bitboard.winner is None and not legal_moves(opponent, player):
+                return [opponent, player, -turn, False]
+
+
+@pytest.mark.parametrize('fields, error', [({'max_iter': 0}, 'max_iter'),
+                                           ({'time': 0}, 'time'),
+                                           ({'time': -1}, 'time'),
+                                           ({'interval': 0}, 'interval')])
+def test_parse_request_rejects_empty_budgets(fields, error):
+    line = json.dumps(dict(fields, state = list(Bitboard().get_state())))
+    with pytest.raises(ValueError, match = error):
+        parse_request(line)
+
+
+def test_parse_request_rejects_a_player_who_must_pass():
+    with pytest.raises(ValueError, match = 'pass'):
+        parse_request(json.dumps({'state': passing_state()}))
+
+
+def test_close_with_requests_in_flight():
+    async def run():
+        server = AnalysisServer(n_workers = 1)
+        listening = await server.start(port = 0)
+        reader, writer = await asyncio.open_connection('127.0.0.1', listening.sockets[0].getsockname()[1])
+        for request_id in range(3):
+            request = {'id': request_id, 'state': list(Bitboard().get_state()), 'time': 0.5, 'early_stop': False}
+            writer.write(json.dumps(request).encode() + b'\n')
+        await writer.drain()
+        await asyncio.sleep(0.2)
+
+        ticks = []
+        async def tick():
+            while True:
+                ticks.append(time.time())
+                await asyncio.sleep(0.02)
+        ticker = asyncio.ensure_future(tick())
+        await server.close()
+        ticker.cancel()
+        writer.close()
+        return len(ticks), server.connections
+
+    ticks, connections = asyncio.run(run())
+    # the loop kept running while the pool waited for the search in flight
+    assert ticks > 5
+    assert not connections
@@ -0,0 +1,104 @@
+from concurrent.futures import Future
+import json
+
+import pytest
+
+from othello_MCTS import MCTS
+from othello_MCTS import simulation
+
+
+class FakeEngine:
+    """
+    Stands in for a TournamentEngine: the stronger configuration always wins and equal ones draw.
+    """
+
+    max_workers = 2
+
+    def __init__(self):
+        self.games = 0
+
+    def submit(self, player1, player2):
+        self.games += 1
+        future = Future()
+        strength = player1['strength'] - player2['strength']
+        future.set_result((1 if strength > 0 else -1 if strength < 0 else 0, 0.0))
+        return future
+
+    def stats(self):
+        return {'games': self.games, 'games_per_hour': 0, 'mean_game_time': 0, 'dispatch_overhead': 0}
+
+
+def test_show_match_returns_the_winner(monkeypatch):
+    gui = pytest.importorskip('othello_MCTS.gui')
+    calls = []
+
+    def show_match(player1, player2, ponder = True):
+        calls.append((player1, player2, ponder))
+        return -1
+
+    monkeypatch.setattr(gui, 'show_match', show_match)
+    player = MCTS(max_iter = 5)
+    assert simulation.show_match(player, 'user', ponder = False) == -1
+    assert calls == [(player, 'user', False)]
+
+
+def test_adaptive_tournament_moves_games_to_undecided_pairs(tmp_path, monkeypatch):
+    pytest.importorskip('numpy')
+    monkeypatch.chdir(tmp_path)
+    players = [{'strength': strength} for strength in range(3)]
+    engine = FakeEngine()
+    simulation.tournament(players, games_per_pair = 10, engine = engine, adaptive = True)
+
+    with open('pair_status.json') as file:
+        status = {(pair['i'], pair['j']): pair for pair in json.load(file)}
+    for (i, j), pair in status.items():
+        if i != j:
+            assert pair['reason'] == ('player1' if i > j else 'player2')
+            assert pair['games'] == 4
+        else:
+            assert pair['games'] > 10
+    assert engine.games <= 9*10
+
+
+def test_tournament_resumes_from_a_truncated_log(tmp_path, monkeypatch):
+    pytest.importorskip('numpy')
+    monkeypatch.chdir(tmp_path)
+    players = [{'strength': strength} for strength in range(2)]
+    simulation.tournament(players, games_per_pair = 2, engine = FakeEngine())
+    with open('tournament_results.jsonl') as file:
+        lines = file.read().splitlines()
+    assert len(lines) == 1 + 4*2
+
+    # an interrupted run: the last two games are lost, the one before is half written
+    with open('tournament_results.jsonl', 'w') as file:
+        file.write('\n'.join(lines[:-3]) + '\n' + lines[-3][:10])
+    engine = FakeEngine()
+    simulation.tournament(players, games_per_pair = 2, engine = engine)
+    assert engine.games == 3
+
+    games = simulation.read_results_log('tournament_results.jsonl', players)
+    expected = [(i, j, game) for i in range(2) for j in range(2) for game in range(2)]
+    assert sorted((game['i'], game['j'], game['game']) for game in games) == expected
+
+
+def test_show_match_ends_when_a_search_fails(monkeypatch):
+    monkeypatch.setenv('SDL_VIDEODRIVER', 'dummy')
+    gui = pytest.importorskip('othello_MCTS.gui')
+
+    class FailingMCTS(MCTS):
+        def run_mcts(self, state):
+            raise ValueError("search failed")
+
+    with pytest.raises(RuntimeError) as error:
+        gui.show_match(FailingMCTS(max_iter = 5), MCTS(max_iter = 5))
+    assert isinstance(error.value.__cause__, ValueError)
+
+
+def test_pair_status_is_only_saved_in_adaptive_mode(tmp_path, monkeypatch):
+    pytest.importorskip('numpy')
+    monkeypatch.chdir(tmp_path)
+    players = [{'strength': strength} for strength in range(2)]
+    simulation.tournament(players, games_per_pair = 2, engine = FakeEngine())
+    expected = ['draws.npy', 'draws.txt', 'tournament_results.jsonl', 'wins_player1.npy', 'wins_player1.txt',
+                'wins_player2.npy', 'wins_player2.txt']
+    assert sorted(path.name for path in tmp_path.iterdir()) == expected
@@ -0,0 +1,60 @@
+from math import log
+
+import pytest
+
+from othello_MCTS.sprt import PairTest, log_likelihood_ratio
+
+
+def test_log_likelihood_ratio_without_games():
+    assert log_likelihood_ratio(0, 0, 0, -20, 20) == 0
+
+
+def test_log_likelihood_ratio_sign_and_symmetry():
+    favour_h1 = log_likelihood_ratio(30, 10, 10, -20, 20)
+    assert favour_h1 > 0
+    assert log_likelihood_ratio(10, 10, 30, -20, 20) == pytest.approx(-favour_h1)
+    assert log_likelihood_ratio(10, 10, 10, -20, 20) == pytest.approx(0)
+
+
+def test_log_likelihood_ratio_grows_with_the_games():
+    assert log_likelihood_ratio(60, 20, 20, -20, 20) == pytest.approx(2*log_likelihood_ratio(30, 10, 10, -20, 20))
+
+
+def test_status_waits_for_min_games():
+    test = PairTest(max_games = 100, min_games = 4)
+    for _ in range(3):
+        test.add(1)
+        assert test.status() is None
+    test.add(1)
+    assert test.llr() >= test.upper
+    assert test.status() == 'player1'
+
+
+def test_status_decides_for_player2():
+    test = PairTest(max_games = 100, min_games = 4)
+    for _ in range(4):
+        test.add(-1)
+    assert test.status() == 'player2'
+
+
+def test_status_stops_undecided_pairs_at_max_games():
+    test = PairTest(max_games = 6, min_games = 4)
+    for _ in range(6):
+        assert test.status() is None
+        test.add(0)
+    assert test.status() == 'max_games'
+
+
+def test_status_without_sequential_test():
+    test = PairTest(max_games = 6, min_games = 4, sequential = False)
+    for _ in range(5):
+        test.add(1)
+        assert test.status() is None
+    test.add(1)
+    assert test.status() == 'max_games'
+
+
+def test_bounds():
+    test = PairTest(max_games = 10, alpha = 0.05, beta = 0.05)
+    assert test.upper == pytest.approx(log(19))
+    assert test.lower == pytest.approx(-log(19))
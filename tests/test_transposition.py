@@ -0,0 +1,52 @@
+import pytest
+
+from othello_MCTS.transposition import TranspositionTable
+
+
+def small_table(n_entries, replacement):
+    table = TranspositionTable(n_entries*TranspositionTable.ENTRY_BYTES/2**20, replacement)
+    assert table.max_entries == n_entries
+    return table
+
+
+def test_lookup_hits_and_misses():
+    table = small_table(4, 'lru')
+    entry, hit = table.lookup(1)
+    assert not hit
+    entry[0] += 1
+    assert table.lookup(1) == ([1, 0], True)
+    assert (table.hits, table.misses) == (1, 1)
+
+
+def test_lru_evicts_the_least_recently_used_entry():
+    table = small_table(3, 'lru')
+    for key in (1, 2, 3):
+        table.lookup(key)
+    table.lookup(1)
+    table.lookup(4)
+    assert list(table.entries) == [3, 1, 4]
+
+
+def test_depth_evicts_the_least_visited_old_entry():
+    table = small_table(3, 'depth')
+    for key, n_visits in ((1, 5), (2, 1), (3, 7)):
+        table.lookup(key)[0][0] = n_visits
+    table.lookup(4)
+    assert sorted(table.entries) == [1, 3, 4]
+    assert len(table) == 3
+
+
+def test_depth_only_compares_the_oldest_entries():
+    table = small_table(TranspositionTable.DEPTH_SAMPLE + 1, 'depth')
+    for key in range(TranspositionTable.DEPTH_SAMPLE + 1):
+        table.lookup(key)[0][0] = 10 + key
+    # the least visited entry is the most recent one, outside the sample
+    table.entries[TranspositionTable.DEPTH_SAMPLE][0] = 0
+    table.lookup('new')
+    assert 0 not in table.entries
+    assert TranspositionTable.DEPTH_SAMPLE in table.entries
+
+
+def test_unknown_replacement_policy():
+    with pytest.raises(ValueError):
+        TranspositionTable(1, 'fifo')